@@ -1,8 +1,28 @@
 import { NextResponse } from 'next/server';
 import { ingestFromDrive } from '@/lib/integrations/drive-ingest';
 
-export async function POST() {
+// When set, runs are queued for the Python ingestion worker
+// (`python tools/run_ingestion.py worker --http-port 8502`) instead of ingesting inline.
+const WORKER_URL = process.env.INGESTION_WORKER_URL;
+
+async function enqueueWithWorker(request: Request) {
+  const token = process.env.INGEST_TRIGGER_TOKEN;
+  const response = await fetch(`${WORKER_URL!.replace(/\/$/, '')}/api/ingest`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: (await request.text()) || '{}',
+  });
+  return NextResponse.json(await response.json(), { status: response.status });
+}
+
+export async function POST(request: Request) {
   try {
+    if (WORKER_URL) {
+      return await enqueueWithWorker(request);
+    }
     await ingestFromDrive();
     return NextResponse.json({ success: true });
   } catch (error) {
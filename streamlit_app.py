@@ -1,20 +1,17 @@
 """ABACO Financial Intelligence Platform - Streamlit Dashboard"""
 
-import io
-import json
-import re
-from datetime import datetime, timezone
+import os
 import warnings
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from supabase import create_client
 import streamlit as st
 
+from streamlit_app.components.ingestion_jobs import render_ingestion_jobs
+from streamlit_app.utils.ingestion_jobs import IngestionJobQueue
+
 warnings.filterwarnings("ignore")
 
 # 
@@ -45,31 +42,10 @@ FONT_COLOR = "white"
 HOVERMODE_UNIFIED = "x unified"
 HOVERMODE_CLOSEST = "closest"
 
-# Google Drive Configuration
-GDRIVE_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
-GDRIVE_API_VERSION = "v3"
-
-# Table Mapping for Data Ingestion
-TABLE_MAP = {
-    "portfolio": "raw_portfolios",
-    "facility": "raw_facilities",
-    "customer": "raw_customers",
-    "payment": "raw_payments",
-    "risk": "raw_risk_events",
-}
-
-# Primary Keys for Conflict Resolution
-PRIMARY_KEYS = {
-    "raw_portfolios": ["workbook_name", "portfolio_name"],
-    "raw_facilities": ["facility_code"],
-    "raw_customers": ["customer_code"],
-    "raw_payments": ["payment_code"],
-    "raw_risk_events": ["customer_code", "event_date", "event_type"],
-}
+# Ingestion Jobs (queue shared with `python tools/run_ingestion.py worker`)
+JOB_QUEUE_PATH = os.environ.get("ABACO_JOB_QUEUE", "abaco_runtime/exports/jobs/ingestion.sqlite3")
 
 # Column Names
-COL_WORKBOOK_NAME = "workbook_name"
-COL_REFRESH_DATE = "refresh_date"
 COL_AVG_DPD = "avg_dpd"
 COL_LTV = "ltv"
 COL_COLLECTION_RATE = "collection_rate"
@@ -106,12 +82,12 @@ st.set_page_config(
 
 st.markdown(
     f"""
-    style
+    <style>
         body {{ background: {ABACO_THEME['colors']['dark']}; color: {FONT_COLOR}; }}
-        .stButtonbutton {{ background: {ABACO_THEME['colors']['primary']}; color: {FONT_COLOR}; border: none; }}
+        .stButton>button {{ background: {ABACO_THEME['colors']['primary']}; color: {FONT_COLOR}; border: none; }}
         .metric-number {{ font-size: 2rem; font-weight: 700; }}
         .stMetric {{ background: rgba({int('C1', 16)}, {int('A6', 16)}, {int('FF', 16)}, 0.1); padding: 1rem; border-radius: 0.5rem; }}
-    /style
+    </style>
     """,
     unsafe_allow_html=True,
 )
@@ -127,7 +103,6 @@ def get_configs():
     return {
         "SUPABASE_URL": st.secrets["SUPABASE_URL"],
         "SUPABASE_KEY": st.secrets["SUPABASE_SERVICE_KEY"],
-        "GDRIVE_SERVICE_ACCOUNT": json.loads(st.secrets["GDRIVE_SERVICE_ACCOUNT"]),
         "GDRIVE_FOLDER_ID": st.secrets["GDRIVE_FOLDER_ID"],
     }
 
@@ -137,126 +112,25 @@ configs = get_configs()
 
 @st.cache_resource
 def init_clients():
-    """Initialize Supabase and Google Drive clients."""
+    """Initialize the Supabase client and the ingestion job queue."""
     supabase_client = create_client(configs["SUPABASE_URL"], configs["SUPABASE_KEY"])
-    credentials = service_account.Credentials.from_service_account_info(
-        configs["GDRIVE_SERVICE_ACCOUNT"],
-        scopes=GDRIVE_SCOPES,
-    )
-    drive_client = build("drive", GDRIVE_API_VERSION, credentials=credentials)
-    return supabase_client, drive_client
-
-
-supabase, drive = init_clients()
-
-# 
-# Data Processing Functions
-# 
-
-
-def normalize_df(df: pd.DataFrame, source: str) -> pd.DataFrame:
-    """Normalize DataFrame column names and data types."""
-    df.columns = [
-        re.sub(r"[^a-z0-9_]", "_", col.strip().lower().replace(" ", "_")) for col in df.columns
-    ]
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(r"[\$,₡,€,%]", "", regex=True)
-                .str.replace(",", "", regex=True)
-                .str.strip()
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        if "date" in col and df[col].dtype == "object":
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-    df[COL_WORKBOOK_NAME] = source
-    df[COL_REFRESH_DATE] = datetime.now(timezone.utc)
-    return df.drop_duplicates()
-
-
-def ingest_from_drive():
-    """Ingest files from Google Drive and upsert to Supabase."""
-    try:
-        query = (
-            f"'{configs['GDRIVE_FOLDER_ID']}' in parents "
-            "and mimeType ! 'application/vnd.google-apps.folder' "
-            "and trashed  false"
-        )
-        results = drive.files().list(q=query, fields="files(id, name, mimeType)").execute()
-        files = results.get("files", [])
-
-        if not files:
-            st.warning("No files found in shared folder.")
-            return
-
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        for idx, file in enumerate(files):
-            file_id, file_name, mime_type = file["id"], file["name"], file["mimeType"]
-            status_text.text(f"Processing: {file_name}")
-
-            # Download file from Google Drive
-            request = drive.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            fh.seek(0)
-
-            # Read file based on type
-            if mime_type.endswith("sheet") or file_name.endswith(".xlsx"):
-                df = pd.read_excel(fh)
-            elif mime_type == "text/csv" or file_name.endswith(".csv"):
-                df = pd.read_csv(fh)
-            else:
-                st.warning(f"Skipping unsupported file: {file_name}")
-                continue
-
-            # Normalize and determine destination table
-            df = normalize_df(df, file_name)
-            table = next(
-                (dest for key, dest in TABLE_MAP.items() if key in file_name.lower()),
-                None,
-            )
-            if not table:
-                st.warning(f"No staging table mapping for file: {file_name}")
-                continue
-
-            # Upsert to Supabase with conflict resolution
-            key_cols = PRIMARY_KEYS.get(table, ["id"])
-            data = df.to_dict(orient="records")
-            supabase.table(table).upsert(
-                data, returning="minimal", on_conflict=",".join(key_cols)
-            ).execute()
-            st.success(f"✓ {file_name}: upserted {len(data)} rows into {table}")
-
-            progress_bar.progress((idx + 1) / len(files))
-
-        # Refresh ML features after all ingestion
-        supabase.rpc("refresh_ml_features").execute()
-        st.success("✓ ML features refreshed successfully.")
+    return supabase_client, IngestionJobQueue(JOB_QUEUE_PATH)
 
-    except Exception as exc:
-        st.error(f"Ingestion failed: {exc}")
 
+supabase, job_queue = init_clients()
 
 # 
 # Sidebar: Ingestion Control
 # 
 
 st.sidebar.header("🔄 Data Management")
-if st.sidebar.button("▶ Run Google Drive Ingestion", use_container_width=True):
-    with st.spinner("Ingesting from Google Drive..."):
-        ingest_from_drive()
+render_ingestion_jobs(job_queue, configs["GDRIVE_FOLDER_ID"], st.sidebar, "▶ Run Google Drive Ingestion")
 
 st.sidebar.markdown("---")
 st.sidebar.info(
-    "**Cron Scheduler**: Configure in Supabase SQL editor:\n"
-    "`SELECT cron.schedule('daily-ingest', '0 6 * * *', 'SELECT refresh_ml_features();');`"
+    "**Cron Scheduler**: pg_cron posts to `/api/ingest`, which queues a job for the "
+    "ingestion worker:\n"
+    "`python tools/run_ingestion.py worker --http-port 8502`"
 )
 
 # 
@@ -397,7 +271,7 @@ try:
             hovermode=HOVERMODE_CLOSEST,
             plot_bgcolor=PLOT_BG_COLOR,
             paper_bgcolor=PLOT_BG_COLOR,
-            font{"color": FONT_COLOR},
+            font={"color": FONT_COLOR},
         )
         st.plotly_chart(fig_scatter, use_container_width=True)
 
@@ -408,9 +282,9 @@ except Exception as e:
 st.markdown("---")
 st.markdown(
     """
-    div style"text-align: center; color: #6D7D8E; font-size: 0.85rem;"
+    <div style="text-align: center; color: #6D7D8E; font-size: 0.85rem;">
     ABACO Financial Intelligence Platform | Powered by Next.js, Supabase & Streamlit
-    /div
+    </div>
     """,
     unsafe_allow_html=True,
 )
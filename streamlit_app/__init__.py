@@ -0,0 +1 @@
+"""ABACO Financial Intelligence Platform - Streamlit application package"""
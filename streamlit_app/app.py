@@ -5,7 +5,7 @@ Production-ready Google Drive → Supabase ingestion pipeline
 
 """
 
-import json
+import os
 import warnings
 from datetime import datetime
 
@@ -13,11 +13,11 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 import plotly.express as px
-from google.oauth2 import service_account
 from supabase import create_client
 
-from abaco_runtime.agent_orchestrator import DataIngestionEngine
+from streamlit_app.components.ingestion_jobs import render_ingestion_jobs
 from streamlit_app.config.theme import ABACO_THEME, PLOTLY_LAYOUT_4K, CUSTOM_CSS, PLOTLY_CONFIG_4K
+from streamlit_app.utils.ingestion_jobs import IngestionJobQueue
 
 warnings.filterwarnings("ignore")
 
@@ -76,25 +76,14 @@ def init_supabase():
     return create_client(configs["SUPABASE_URL"], configs["SUPABASE_KEY"])
 
 
-def init_drive():
-    """Initialize Google Drive client"""
-    gdrive_creds = configs.get("GDRIVE_SERVICE_ACCOUNT")
-    if not gdrive_creds:
-        st.warning("Google Drive credentials not configured.")
-        return None
-    try:
-        credentials_dict = json.loads(gdrive_creds)
-        credentials = service_account.Credentials.from_service_account_info(
-            credentials_dict, scopes=["https://www.googleapis.com/auth/drive.readonly"]
-        )
-        return None  # build('drive', 'v3', credentials=credentials)
-    except Exception as e:
-        st.error(f"Failed to initialize Google Drive: {str(e)}")
-        return None
+@st.cache_resource
+def init_job_queue():
+    """Ingestion job queue shared with `python tools/run_ingestion.py worker`"""
+    return IngestionJobQueue(os.environ.get("ABACO_JOB_QUEUE", "abaco_runtime/exports/jobs/ingestion.sqlite3"))
 
 
 supabase = init_supabase()
-drive = init_drive()
+job_queue = init_job_queue()
 
 
 #  SIDEBAR NAVIGATION 
@@ -188,21 +177,6 @@ def _display_ingestion_report(report: dict):
         st.dataframe(quality_df, use_container_width=True)
 
 
-def _run_ingestion():
-    """Initializes and runs the data ingestion engine."""
-    with st.spinner("🔄 Ingesting data from Google Drive..."):
-        try:
-            ingestion_engine = DataIngestionEngine(
-                supabase_url=configs["SUPABASE_URL"],
-                supabase_key=configs["SUPABASE_KEY"],
-                gdrive_credentials=json.loads(configs["GDRIVE_SERVICE_ACCOUNT"]),
-            )
-            report = ingestion_engine.ingest_from_drive(configs["GDRIVE_FOLDER_ID"])
-            _display_ingestion_report(report)
-        except Exception as e:
-            st.error(f"❌ Ingestion failed: {str(e)}")
-
-
 #  INGESTION MODULE 
 if "📥 Data Ingestion" in page:
     st.header("📥 Google Drive → Supabase Ingestion")
@@ -224,11 +198,10 @@ if "📥 Data Ingestion" in page:
     with col1:
         st.subheader("Manual Ingestion")
 
-        if st.button("🚀 Run Ingestion Now", type="primary", use_container_width=True):
-            if not supabase or not drive:
-                st.error("Services not initialized. Check configuration.")
-            else:
-                _run_ingestion()
+        if not supabase or not configs.get("GDRIVE_FOLDER_ID"):
+            st.error("Services not initialized. Check configuration.")
+        else:
+            render_ingestion_jobs(job_queue, configs["GDRIVE_FOLDER_ID"], on_report=_display_ingestion_report)
 
     with col2:
         st.subheader("Configuration")
@@ -266,7 +239,9 @@ SELECT cron.schedule(
         headers:=jsonb_build_object(
             'Authorization', 'Bearer ' || current_setting('app.supabase_service_key'),
             'Content-Type', 'application/json'
+        )
     );
+    $$
 );
 -- Verify cron job
 SELECT * FROM cron.job;
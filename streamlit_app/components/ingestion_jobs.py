@@ -0,0 +1,93 @@
+"""
+Ingestion Jobs Component
+Queues Google Drive ingestions for the background worker and follows their progress
+"""
+
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+from ..utils.ingestion_jobs import IngestionJobQueue
+
+# Seconds between status refreshes while this session's job is queued or running
+POLL_SECONDS = 2
+
+# Session key of the job this session queued
+JOB_KEY = 'ingestion_job_id'
+
+STATUS_ICONS = {
+    'queued': '⏳',
+    'running': '🔄',
+    'succeeded': '✅',
+    'failed': '❌',
+    'cancelled': '⏹️',
+}
+
+def _session_job(queue: IngestionJobQueue) -> Optional[Dict]:
+    job_id = st.session_state.get(JOB_KEY)
+    return queue.get(job_id) if job_id else None
+
+def render_ingestion_jobs(
+    queue: IngestionJobQueue,
+    folder_id: str,
+    container=None,
+    button_label: str = "🚀 Run Ingestion Now",
+    on_report: Optional[Callable[[Dict], None]] = None
+):
+    """
+    Run button plus the status of the ingestion job this session queued
+    
+    The button only enqueues; the worker (``python tools/run_ingestion.py
+    worker``) does the work, so reruns and closed tabs do not interrupt it.
+    While the job is queued or running only this fragment refreshes, every
+    POLL_SECONDS; the page reruns once when it finishes. Jobs queued by
+    other sessions, pg_cron or the HTTP trigger are not followed.
+    
+    Args:
+        container: Where to render (e.g. ``st.sidebar``; the main area by default)
+        on_report: Renders the report of a finished job
+    """
+    job = _session_job(queue)
+    polling = job is not None and job['status'] in queue.ACTIVE
+    
+    @st.fragment(run_every=POLL_SECONDS if polling else None)
+    def _panel():
+        if st.button(button_label, type="primary", use_container_width=True):
+            st.session_state[JOB_KEY] = queue.enqueue(folder_id, source='ui')['id']
+            # Full rerun, so the fragment starts polling the new job
+            st.rerun()
+        
+        job = _session_job(queue)
+        if job is None:
+            st.caption("No ingestion job queued from this session.")
+            return
+        if polling and job['status'] not in queue.ACTIVE:
+            # Finished: stop polling and refresh the page's data once
+            st.rerun()
+        
+        st.markdown(f"{STATUS_ICONS.get(job['status'], '')} **Job {job['id']}** · {job['status']}")
+        if job['files_total']:
+            st.progress(
+                min(job['files_done'] / job['files_total'], 1.0),
+                text=f"{job['files_done']}/{job['files_total']} files"
+            )
+        if job['message']:
+            st.caption(job['message'])
+        
+        if job['status'] == 'queued':
+            st.caption("Waiting for an ingestion worker: `python tools/run_ingestion.py worker`")
+        if job['status'] in queue.ACTIVE and not job['cancel_requested']:
+            if st.button("⏹️ Cancel ingestion", key=f"cancel_{job['id']}", use_container_width=True):
+                queue.cancel(job['id'])
+                st.rerun()
+        elif job['status'] == 'running':
+            st.caption("Cancelling after the files in flight…")
+        
+        if on_report is not None and job['report']:
+            on_report(job['report'])
+    
+    if container is None:
+        _panel()
+    else:
+        with container:
+            _panel()
@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from streamlit_app.utils.ingestion import DataIngestionEngine
+
+
+class _Result:
+    def __init__(self, data=None):
+        self.data = data
+
+
+class _Table:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self._payload = None
+
+    def upsert(self, data, **kwargs):
+        self._payload = (data, kwargs)
+        return self
+
+    def insert(self, data, **kwargs):
+        self._payload = ([data], kwargs)
+        return self
+
+    def execute(self):
+        data, kwargs = self._payload
+        with self.client.lock:
+            if self.name == 'ingestion_logs':
+                self.client.logs.extend(data)
+            else:
+                self.client.upserts.append((self.name, list(data), kwargs))
+        return _Result(data)
+
+
+class _Rpc:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def execute(self):
+        self.client.rpcs.append(self.name)
+        return _Result()
+
+
+class FakeSupabase:
+    """In-memory stand-in for the supabase client used by the ingestion engine"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.upserts = []
+        self.logs = []
+        self.rpcs = []
+
+    def table(self, name):
+        return _Table(self, name)
+
+    def rpc(self, name, params=None):
+        return _Rpc(self, name)
+
+
+class _Request:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def execute(self):
+        return self.payload
+
+
+class _Files:
+    def __init__(self, drive):
+        self.drive = drive
+
+    def list(self, q=None, fields=None, **kwargs):
+        return _Request({'files': list(self.drive.listing)})
+
+
+class FakeDrive:
+    """Drive stand-in: ``files`` maps file id -> (metadata, raw bytes)"""
+
+    def __init__(self, files):
+        self.listing = [meta for meta, _ in files.values()]
+        self.contents = {file_id: raw for file_id, (_, raw) in files.items()}
+        self.downloaded = {}
+        self.head_requests = []
+
+    def files(self):
+        return _Files(self)
+
+
+class FakeDriveEngine(DataIngestionEngine):
+    """Engine that reads file bytes from FakeDrive instead of the Drive media API"""
+
+    download_delays = {}
+    piece_bytes = 64
+
+    def _iter_download_chunks(self, file_id, size=None):
+        delay = self.download_delays.get(file_id)
+        if delay:
+            threading.Event().wait(delay)
+        raw = self.drive.contents[file_id]
+        self.drive.downloaded[file_id] = 0
+        for start in range(0, len(raw), self.piece_bytes):
+            self.drive.downloaded[file_id] += len(raw[start:start + self.piece_bytes])
+            yield raw[start:start + self.piece_bytes]
+
+    def _fetch_head(self, file_id, nbytes):
+        self.drive.head_requests.append((file_id, nbytes))
+        return self.drive.contents[file_id][:nbytes]
+
+
+def csv_file(file_id, name, text, modified='2025-11-14T06:00:00.000Z'):
+    raw = text.encode('utf-8')
+    meta = {
+        'id': file_id,
+        'name': name,
+        'mimeType': 'text/csv',
+        'modifiedTime': modified,
+        'size': str(len(raw)),
+    }
+    return file_id, (meta, raw)
+
+
+@pytest.fixture
+def make_engine():
+    def _make(files, **options):
+        return FakeDriveEngine.from_clients(FakeSupabase(), FakeDrive(dict(files)), **options)
+    return _make
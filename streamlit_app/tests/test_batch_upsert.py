@@ -0,0 +1,91 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from conftest import FakeSupabase
+from streamlit_app.utils.batch_upsert import BatchUpserter
+
+
+class FlakySupabase(FakeSupabase):
+    """Fails the first ``failures`` calls for batches starting with ``row_id``"""
+
+    def __init__(self, failures, row_id):
+        super().__init__()
+        self.failures = failures
+        self.row_id = row_id
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def table(self, name):
+        table = super().table(name)
+        execute = table.execute
+
+        def flaky_execute():
+            with self.lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                threading.Event().wait(0.01)
+                records = table._payload[0]
+                if records[0]['id'] == self.row_id and self.failures > 0:
+                    self.failures -= 1
+                    raise RuntimeError('502 Bad Gateway')
+                return execute()
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+        table.execute = flaky_execute
+        return table
+
+
+def _frame(rows):
+    return pd.DataFrame({
+        'id': range(rows),
+        'amount': np.where(np.arange(rows) % 7 == 0, np.nan, 10.5),
+        'date': pd.Timestamp('2025-01-31'),
+    })
+
+
+def test_batches_cover_every_row_with_bounded_in_flight():
+    client = FlakySupabase(failures=0, row_id=None)
+    upserter = BatchUpserter(client, batch_size=100, max_in_flight=3)
+    report = upserter.upsert('raw_payments', _frame(1050), on_conflict='payment_code')
+
+    assert report['rows_upserted'] == 1050
+    assert [b['rows'] for b in report['batches']] == [100] * 10 + [50]
+    assert [b['offset'] for b in report['batches']] == list(range(0, 1050, 100))
+    assert client.peak_in_flight <= 3
+    sent = sorted(row['id'] for _, rows, _ in client.upserts for row in rows)
+    assert sent == list(range(1050))
+    _, rows, options = next(call for call in client.upserts if call[1][0]['id'] == 0)
+    assert options == {'returning': 'minimal', 'on_conflict': 'payment_code'}
+    assert rows[0]['amount'] is None and rows[0]['date'].startswith('2025-01-31')
+
+
+def test_failed_batch_is_retried_then_reported():
+    client = FlakySupabase(failures=2, row_id=200)
+    upserter = BatchUpserter(client, batch_size=100, max_retries=3, retry_backoff=0)
+    report = upserter.upsert('raw_payments', _frame(300))
+    assert report['failed_batches'] == 0
+    assert report['batches'][2]['attempts'] == 3
+
+    client = FlakySupabase(failures=5, row_id=100)
+    upserter = BatchUpserter(client, batch_size=100, max_retries=1, retry_backoff=0)
+    report = upserter.upsert('raw_payments', _frame(300))
+    assert report['failed_batches'] == 1
+    assert report['rows_upserted'] == 200
+    assert report['batches'][1]['status'] == 'failed'
+    assert '502' in report['batches'][1]['error']
+
+
+def test_on_commit_reports_contiguous_prefix_only():
+    client = FlakySupabase(failures=5, row_id=200)
+    upserter = BatchUpserter(client, batch_size=100, max_in_flight=3, max_retries=0)
+    commits = []
+    report = upserter.upsert('raw_payments', _frame(500), on_commit=commits.append)
+
+    assert report['failed_batches'] == 1
+    assert report['committed_rows'] == 200
+    assert commits == sorted(commits) and commits[-1] == 200
@@ -0,0 +1,35 @@
+import importlib.util
+import json
+from pathlib import Path
+
+TOOL = Path(__file__).resolve().parents[2] / 'tools' / 'benchmark_ingestion.py'
+
+
+def _load_tool():
+    spec = importlib.util.spec_from_file_location('benchmark_ingestion', TOOL)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark_reports_stage_timings(tmp_path, capsys):
+    tool = _load_tool()
+    output = tmp_path / 'bench.json'
+    exit_code = tool.main(['--rows', '2000', '--sources', 'payment', '--formats', 'csv',
+                           '--no-isolate', '--output', str(output)])
+    assert exit_code == 0
+
+    report = json.loads(output.read_text())
+    assert json.loads(capsys.readouterr().out) == report
+    (result,) = report['results']
+    assert result['status'] == 'success'
+    # 1% of the synthetic rows are exact duplicates
+    assert result['rows_upserted'] == 1980
+    assert {'parse', 'normalize', 'validate', 'quality', 'upsert'} <= set(result['stages'])
+    assert result['rows_per_s'] > 0 and result['peak_rss_mb'] > 0
+
+
+def test_xlsx_sizes_above_sheet_limit_are_skipped():
+    tool = _load_tool()
+    result = tool.run_scenario('payment', 'xlsx', tool.XLSX_MAX_ROWS + 1, {})
+    assert result['status'] == 'skipped'
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import csv_file
+from streamlit_app.utils.compaction import FrameCompactor
+
+PAYMENT_CSV = "Payment ID,Customer ID,Amount,Channel,Date\n" + "".join(
+    f"P{i},C{i % 50},{i % 90}.25,{['web', 'branch', 'agent'][i % 3]},2025-02-01\n" for i in range(3000)
+)
+
+
+def test_compaction_is_lossless_and_smaller():
+    rows = 2000
+    df = pd.DataFrame({
+        'payment_id': [f'P{i}' for i in range(rows)],
+        'channel': np.array(['web', 'branch', 'agent', None], dtype=object)[np.arange(rows) % 4],
+        'amount': np.arange(rows) * 0.25,
+        'rate': np.full(rows, 0.1),
+        'days': np.arange(rows) % 120,
+        'workbook_name': 'pagos.csv',
+        'refresh_date': pd.Timestamp('2025-02-01 06:00:00'),
+    })
+    compact, report = FrameCompactor().compact(df)
+
+    # Metadata stamps are stored once; data dates and identifiers keep their dtype even when constant
+    assert report['constant'] == ['workbook_name', 'refresh_date']
+    assert report['categorical'] == ['channel']
+    assert compact['refresh_date'].cat.categories.dtype == df['refresh_date'].dtype
+    dates, date_report = FrameCompactor().compact(pd.DataFrame({'date': [pd.Timestamp('2025-02-01')] * 10}))
+    assert date_report['constant'] == [] and dates['date'].dtype == 'datetime64[ns]'
+    ids, id_report = FrameCompactor().compact(pd.DataFrame({'customer_id': ['C1'] * 10, 'id': ['X'] * 10}))
+    assert id_report['constant'] == [] and (ids.dtypes == object).all()
+    assert report['downcast'] == ['amount', 'days']
+    assert compact['days'].dtype == np.int8 and compact['rate'].dtype == np.float64
+    assert report['bytes_after'] < report['bytes_before'] / 2
+    pd.testing.assert_frame_equal(compact.astype(object), df.astype(object).where(df.notna(), np.nan),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('stream_csv', [False, True])
+def test_engine_compacts_without_changing_upserted_rows(make_engine, stream_csv):
+    files = [csv_file('f1', 'pagos.csv', PAYMENT_CSV)]
+    upserted = {}
+    for compact_frames in (False, True):
+        engine = make_engine(files, compact_frames=compact_frames, stream_csv=stream_csv,
+                             csv_chunk_rows=1000, max_in_flight=1)
+        report = engine.ingest_from_drive('folder')
+        upserted[compact_frames] = [
+            {key: value for key, value in row.items() if key != 'refresh_date'}
+            for _, rows, _ in engine.supabase.upserts for row in rows
+        ]
+
+    assert upserted[True] == upserted[False]
+    summary = report['compaction']
+    assert summary['files'] == 1 and summary['bytes_after'] < summary['bytes_before']
+    assert 'channel' in report['details'][0]['compaction']['categorical']
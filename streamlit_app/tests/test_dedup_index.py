@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from conftest import csv_file
+from streamlit_app.utils.dedup_index import RowFingerprintIndex
+
+PAYMENT_CSV = "Payment ID,Customer ID,Amount,Date\nP1,C1,100,2025-02-01\nP2,C1,50,2025-02-02\nP2,C1,50,2025-02-02\n"
+
+
+def test_index_drops_unchanged_rows_and_keeps_corrections(tmp_path):
+    index = RowFingerprintIndex(str(tmp_path))
+    df = pd.DataFrame({'payment_id': ['P1', 'P2'], 'amount': [100.0, 50.0], 'refresh_date': ['t1', 't1']})
+    fresh, counters, pending = index.filter('raw_payments', df, ['payment_id'])
+    assert len(fresh) == 2 and counters == {'cross_run': 0, 'changed': 0}
+    # Only rows of successful batches are remembered
+    index.mark('raw_payments', pending, [{'offset': 0, 'rows': 1, 'status': 'success'},
+                                         {'offset': 1, 'rows': 1, 'status': 'failed'}])
+    index.save()
+
+    reloaded = RowFingerprintIndex(str(tmp_path))
+    rerun = pd.DataFrame({'payment_id': ['P1', 'P2', 'P1'], 'amount': [100.0, 50.0, 90.0],
+                          'refresh_date': ['t2', 't2', 't2']})
+    fresh, counters, _ = reloaded.filter('raw_payments', rerun, ['payment_id'])
+    assert fresh['amount'].tolist() == [50.0, 90.0]
+    assert counters == {'cross_run': 1, 'changed': 1}
+
+
+def test_engine_reports_within_file_and_cross_run_counters(make_engine, tmp_path):
+    index_path = str(tmp_path / 'dedup')
+    files = [csv_file('f1', 'pagos_febrero.csv', PAYMENT_CSV)]
+    first = make_engine(files, dedup_index_path=index_path).ingest_from_drive('folder')
+    assert first['dedup'] == {'within_file': 1, 'cross_run': 0, 'changed': 0}
+
+    # Same rows re-exported in another file on a later day
+    later = [csv_file('f2', 'pagos_marzo.csv', PAYMENT_CSV + "P3,C2,75,2025-03-01\n")]
+    engine = make_engine(later, dedup_index_path=index_path)
+    report = engine.ingest_from_drive('folder')
+    assert report['dedup'] == {'within_file': 1, 'cross_run': 2, 'changed': 0}
+    assert report['details'][0]['rows_processed'] == 1
+    (_, rows, _), = engine.supabase.upserts
+    assert [row['payment_id'] for row in rows] == ['P3']
+
+
+@pytest.mark.parametrize('stream_csv', [False, True])
+def test_columns_constant_in_one_file_keep_their_fingerprints(make_engine, tmp_path, stream_csv):
+    index_path = str(tmp_path / 'dedup')
+    # Customer ID and Date are constant in the first file (and in its stream chunks) but not the second
+    first = "Payment ID,Customer ID,Amount,Date\nP1,C1,100,2025-02-01\nP2,C1,50,2025-02-01\n"
+    second = first + "P3,C2,75,2025-03-01\nP4,C3,20,2025-03-02\n"
+    options = dict(dedup_index_path=index_path, stream_csv=stream_csv, csv_chunk_rows=2)
+    make_engine([csv_file('f1', 'pagos_febrero.csv', first)], **options).ingest_from_drive('folder')
+
+    engine = make_engine([csv_file('f2', 'pagos_marzo.csv', second)], **options)
+    report = engine.ingest_from_drive('folder')
+    assert report['dedup'] == {'within_file': 0, 'cross_run': 2, 'changed': 0}
+    assert [row['payment_id'] for _, rows, _ in engine.supabase.upserts for row in rows] == ['P3', 'P4']
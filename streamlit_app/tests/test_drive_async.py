@@ -0,0 +1,127 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from conftest import FakeDrive, FakeSupabase, csv_file
+from streamlit_app.utils.drive_async import AsyncDriveDownloader
+from streamlit_app.utils.ingestion import DataIngestionEngine
+
+
+class FakeDriveServer(ThreadingHTTPServer):
+    """Local Drive media endpoint: GET /files/<id>?alt=media with Range support"""
+
+    daemon_threads = True
+
+    def __init__(self, contents):
+        super().__init__(('127.0.0.1', 0), _MediaHandler)
+        self.contents = contents
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        file_id = urlparse(self.path).path.rsplit('/', 1)[-1]
+        byte_range = self.headers.get('Range')
+        with server.lock:
+            server.requests.append((file_id, byte_range))
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            fail = server.failures.get(file_id, 0) > 0
+            if fail:
+                server.failures[file_id] -= 1
+        try:
+            threading.Event().wait(0.01)
+            if fail:
+                self._reply(503, b'busy')
+                return
+            raw = server.contents[file_id]
+            if byte_range:
+                start, _, end = byte_range[len('bytes='):].partition('-')
+                end = int(end) if end else len(raw) - 1
+                self._reply(206, raw[int(start):end + 1])
+            else:
+                self._reply(200, raw)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def drive_server():
+    contents = {'big': bytes(range(256)) * 400, 'small': b'Customer ID,Date\nC1,2025-01-31\n'}
+    server = FakeDriveServer(contents)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_large_files_download_as_parallel_ranges_in_order(drive_server):
+    raw = drive_server.contents['big']
+    with AsyncDriveDownloader(base_url=drive_server.url, chunk_bytes=10_000, parallel_ranges=4) as downloader:
+        chunks = list(downloader.iter_chunks('big', len(raw)))
+        assert b''.join(chunks) == raw
+        assert [len(chunk) for chunk in chunks] == [10_000] * 10 + [2_400]
+        assert downloader.download('small') == drive_server.contents['small']
+        assert downloader.read_range('big', 0, 99) == raw[:100]
+
+    assert drive_server.requests[0] == ('big', 'bytes=0-9999')
+    assert drive_server.requests[-2:] == [('small', None), ('big', 'bytes=0-99')]
+    assert 1 < drive_server.peak_in_flight <= 4
+    # Keep-alive: twelve requests over at most parallel_ranges connections
+    assert len(drive_server.connections) <= 4
+
+
+def test_transient_errors_are_retried_with_backoff(drive_server):
+    drive_server.failures = {'big': 3, 'small': 2}
+    raw = drive_server.contents['big']
+    with AsyncDriveDownloader(base_url=drive_server.url, chunk_bytes=25_000, retry_backoff=0.01) as downloader:
+        assert downloader.download('big', len(raw)) == raw
+        assert downloader.download('small') == drive_server.contents['small']
+
+    drive_server.failures = {'small': 5}
+    with AsyncDriveDownloader(base_url=drive_server.url, max_retries=1, retry_backoff=0) as downloader:
+        with pytest.raises(Exception, match='503'):
+            downloader.download('small')
+
+
+def test_engine_downloads_through_the_async_layer(drive_server):
+    text = "Payment ID,Customer ID,Amount,Date\n" + "".join(f"P{i},C{i},{i},2025-02-01\n" for i in range(3000))
+    file_id, (meta, raw) = csv_file('pagos', 'pagos_febrero.csv', text)
+    drive_server.contents[file_id] = raw
+
+    with AsyncDriveDownloader(base_url=drive_server.url, chunk_bytes=8192) as downloader:
+        for stream_csv in (False, True):
+            engine = DataIngestionEngine.from_clients(
+                FakeSupabase(), FakeDrive({file_id: (meta, raw)}),
+                drive_downloader=downloader, stream_csv=stream_csv, csv_chunk_rows=500
+            )
+            report = engine.ingest_from_drive('folder')
+            assert report['details'][0]['status'] == 'success'
+            assert report['details'][0]['rows_processed'] == 3000
+    assert sum(1 for _, byte_range in drive_server.requests if byte_range) > 2
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_app.utils.feature_engineering import DPDStatsAccumulator, FeatureEngineer
+
+AS_OF = pd.Timestamp('2025-06-30')
+
+
+def _raw_frames(customers=200, seed=7):
+    rng = np.random.default_rng(seed)
+    ids = np.array([f'C{i}' for i in range(customers)], dtype=object)
+
+    def pick(rows):
+        return ids[rng.integers(0, customers, rows)]
+
+    names = np.array(['Empresa Andina', 'Municipal de Lima', 'Juan Perez', 'Gobierno Business', None], dtype=object)
+    return {
+        'portfolios': pd.DataFrame({'customer_id': pick(600), 'balance': rng.gamma(2, 5000, 600).round(2)}),
+        'payments': pd.DataFrame({
+            'customer_id': pick(500),
+            'amount': rng.gamma(2, 900, 500).round(2),
+            'payment_date': (AS_OF - pd.to_timedelta(rng.integers(0, 500, 500), 'D')).astype(str)
+        }),
+        'facilities': pd.DataFrame({
+            'customer_id': pick(250),
+            'limit_amount': np.where(rng.random(250) < 0.1, 0, rng.gamma(2, 20000, 250).round(2))
+        }),
+        'risk_events': pd.DataFrame({
+            'customer_id': pick(300),
+            'dpd': rng.choice([0, 0, 0, 5, 14, 15, 29, 45, 90, 179, 180, 250], 300),
+            'risk_severity': rng.random(300).round(2)
+        }),
+        'revenue': pd.DataFrame({'customer_id': pick(300), 'revenue': rng.gamma(2, 200, 300).round(2)}),
+        'collections': pd.DataFrame({'customer_id': pick(100), 'collected_amount': rng.gamma(2, 500, 100).round(2)}),
+        'marketing': pd.DataFrame({
+            'customer_id': pick(150),
+            'channel': rng.choice(['web', 'agent', 'branch'], 150),
+            'acquisition_date': AS_OF - pd.to_timedelta(rng.integers(30, 900, 150), 'D'),
+            'acquisition_cost': rng.gamma(2, 50, 150).round(2)
+        }),
+        'customers': pd.DataFrame({
+            'customer_id': ids[:180],
+            'name': names[np.arange(180) % len(names)],
+            'industry_code': np.where(np.arange(180) % 3 == 0, None, 'G47')
+        }),
+        'industry': pd.DataFrame({'customer_id': ids, 'industry_code': 'C10'}),
+    }
+
+
+def test_snapshots_match_scalar_helpers():
+    frames = _raw_frames()
+    engineer = FeatureEngineer()
+    snapshots = engineer.build_feature_snapshots(**frames, as_of=AS_OF)
+
+    assert list(snapshots.columns) == FeatureEngineer.SNAPSHOT_COLUMNS
+    assert snapshots['customer_id'].is_unique and len(snapshots) == 200
+    rows = snapshots.set_index('customer_id')
+
+    portfolios, risk_events = frames['portfolios'], frames['risk_events']
+    for customer_id, row in rows.iterrows():
+        balances = portfolios.loc[portfolios['customer_id'] == customer_id, 'balance']
+        limits = frames['facilities'].loc[frames['facilities']['customer_id'] == customer_id, 'limit_amount']
+        payments = frames['payments'].loc[frames['payments']['customer_id'] == customer_id, 'amount']
+        dpd = risk_events.loc[risk_events['customer_id'] == customer_id, 'dpd']
+
+        assert row['total_balance'] == pytest.approx(balances.sum())
+        assert row['num_facilities'] == len(limits) and row['num_payments'] == len(payments)
+        assert row['utilization'] == pytest.approx(engineer.calculate_utilization(balances.sum(), limits.sum()))
+
+        expected = engineer.calculate_dpd_statistics(dpd)
+        for stat, value in expected.items():
+            assert row[stat] == pytest.approx(value, nan_ok=True)
+        assert row['dpd_bucket'] == engineer.bucket_dpd(expected['dpd_max'])
+        assert row['segment'] == engineer.calculate_segmentation({
+            'avg_dpd': row['dpd_mean'], 'utilization': row['utilization'], 'payment_ratio': row['payment_ratio']
+        })
+        if isinstance(row['name'], str):
+            assert row['customer_type'] == engineer.classify_customer_type(row['name'], {})
+
+    reference = engineer.calculate_z_scores(rows.reset_index()[FeatureEngineer.ZSCORE_METRICS].copy(),
+                                            FeatureEngineer.ZSCORE_METRICS)
+    for metric in FeatureEngineer.ZSCORE_METRICS:
+        np.testing.assert_allclose(snapshots[f'{metric}_zscore'], reference[f'{metric}_zscore'])
+
+
+def test_snapshot_edge_cases():
+    frames = _raw_frames()
+    snapshots = FeatureEngineer().build_feature_snapshots(**frames, as_of=AS_OF).set_index('customer_id')
+
+    # Customers without a name default to B2C; 'Gobierno Business' hits B2B first, like the scalar loop
+    assert set(snapshots.loc[['C4', 'C184'], 'customer_type']) == {'B2C'}
+    assert snapshots.loc['C3', 'customer_type'] == 'B2B'
+    assert snapshots.loc['C1', ['customer_type', 'is_b2g']].tolist() == ['B2G', 1]
+    # customers.industry_code wins, raw_industry fills the gaps
+    assert snapshots.loc['C0', 'industry_code'] == 'C10' and snapshots.loc['C1', 'industry_code'] == 'G47'
+
+    earliest = frames['marketing'].sort_values('acquisition_date').drop_duplicates('customer_id')
+    first = earliest.iloc[0]
+    assert snapshots.loc[first['customer_id'], 'channel'] == first['channel']
+    assert snapshots.loc[first['customer_id'], 'ltv'] == pytest.approx(
+        snapshots.loc[first['customer_id'], 'total_revenue'] - first['acquisition_cost']
+    )
+    for score in ('payment_ratio', 'collection_rate', 'churn_risk_score', 'default_risk_score', 'activity_score'):
+        assert snapshots[score].between(0, 1).all()
+
+
+def test_customers_only_in_one_table_get_neutral_features():
+    snapshots = FeatureEngineer().build_feature_snapshots(
+        portfolios=pd.DataFrame({'customer_id': ['A'], 'balance': [100.0]}),
+        facilities=pd.DataFrame({'customer_id': ['B'], 'limit_amount': [500.0]}),
+        as_of=AS_OF
+    ).set_index('customer_id')
+
+    assert snapshots.loc['A', ['utilization', 'dpd_max', 'dpd_bucket', 'churn_risk_score']].tolist() == [0.0, 0.0, 'Current', 1.0]
+    assert snapshots.loc['B', ['total_balance', 'num_facilities', 'collection_rate']].tolist() == [0.0, 1, 1.0]
+    assert snapshots['segment'].tolist() == ['F', 'F']
+
+
+def _loop_bucket(dpd):
+    for i, threshold in enumerate(FeatureEngineer.DPD_BUCKETS[1:]):
+        if dpd < threshold:
+            return FeatureEngineer.DPD_LABELS[i]
+    return FeatureEngineer.DPD_LABELS[-1]
+
+
+def _loop_segment(dpd, utilization, payment_ratio):
+    for segment, t in FeatureEngineer.SEGMENTATION_THRESHOLDS.items():
+        if dpd <= t['dpd_max'] and utilization >= t['utilization_min'] and payment_ratio >= t['payment_ratio_min']:
+            return segment
+    return 'F'
+
+
+def test_searchsorted_lookups_match_the_threshold_loops():
+    engineer = FeatureEngineer()
+    edges = [-1, 0, 0.5, 1, 14, 14.99, 15, 29, 30, 59, 60, 90, 119, 120, 179.5, 180, 5000, np.inf, np.nan]
+    assert list(engineer.bucket_dpd_values(edges)) == [_loop_bucket(v) for v in edges]
+    assert [engineer.bucket_dpd(v) for v in edges] == [_loop_bucket(v) for v in edges]
+
+    ratios = [-0.1, 0, 0.05, 0.1, 0.2, 0.25, 0.3, 0.5, 0.75, 0.9, 1.0, 1.2, np.nan]
+    grid = np.array(np.meshgrid(edges, ratios, ratios)).reshape(3, -1)
+    expected = [_loop_segment(*values) for values in grid.T]
+    assert list(engineer.calculate_segmentations(*grid)) == expected
+    assert engineer.calculate_segmentation({'avg_dpd': 0, 'utilization': 0.6, 'payment_ratio': 1.0}) == 'A'
+    assert engineer.calculate_segmentation({}) == 'F'
+
+
+def test_segment_table_requires_monotone_thresholds():
+    class Inverted(FeatureEngineer):
+        SEGMENTATION_THRESHOLDS = {
+            'A': {'dpd_max': 30, 'utilization_min': 0.5, 'payment_ratio_min': 1.0},
+            'B': {'dpd_max': 15, 'utilization_min': 0.3, 'payment_ratio_min': 0.9},
+        }
+
+    with pytest.raises(ValueError):
+        Inverted().calculate_segmentation({})
+
+
+@pytest.mark.parametrize('size', [0, 1, 7, 40, 200_000])
+def test_streaming_dpd_statistics_match_the_in_memory_helper(size):
+    dpd = pd.Series(np.random.default_rng(size).gamma(1.5, 20, size).round())
+    engineer = FeatureEngineer()
+    expected = engineer.calculate_dpd_statistics(dpd)
+
+    # Two workers over interleaved chunks, merged through their serialized form
+    workers = [DPDStatsAccumulator(), DPDStatsAccumulator()]
+    for i, chunk in enumerate(np.array_split(dpd.to_numpy(), 6)):
+        workers[i % 2].update(pd.DataFrame({'dpd': chunk}))
+    merged = DPDStatsAccumulator.from_dict(workers[0].to_dict()).merge(workers[1])
+    streamed = engineer.calculate_dpd_statistics_streaming(np.array_split(dpd.to_numpy(), 5))
+
+    for result in (merged.result(), streamed):
+        assert result['dpd_max'] == expected['dpd_max']
+        assert result['dpd_mean'] == pytest.approx(expected['dpd_mean'], rel=1e-12)
+        assert result['dpd_std'] == pytest.approx(expected['dpd_std'], rel=1e-9, nan_ok=True)
+        if size <= 40:
+            assert result['dpd_median'] == expected['dpd_median']
+        else:
+            assert result['dpd_median'] == pytest.approx(expected['dpd_median'], rel=0.02)
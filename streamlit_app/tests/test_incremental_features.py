@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from test_feature_engineering import AS_OF, _raw_frames
+from streamlit_app.utils.feature_engineering import FeatureEngineer
+from streamlit_app.utils.incremental_features import IncrementalFeatureEngine
+
+LABELS = ['customer_id', 'name', 'customer_type', 'segment', 'dpd_bucket', 'channel', 'industry_code',
+          'is_b2g', 'is_delinquent', 'num_facilities', 'num_payments', 'acquisition_date', 'feature_snapshot_date']
+
+
+def _split(frames, fraction=0.1, seed=3):
+    """(base, delta) row split of every raw frame; the delta touches a few customers"""
+    rng = np.random.default_rng(seed)
+    touched = set(rng.choice(frames['customers']['customer_id'], 15, replace=False))
+    base, delta = {}, {}
+    for name, frame in frames.items():
+        in_delta = frame['customer_id'].isin(touched) & (rng.random(len(frame)) < 0.5)
+        base[name], delta[name] = frame[~in_delta], frame[in_delta]
+    return base, delta
+
+
+def _assert_same_rows(actual, expected):
+    actual = actual.set_index('customer_id').sort_index()
+    expected = expected.set_index('customer_id').loc[actual.index]
+    labels = [column for column in LABELS if column != 'customer_id']
+    pd.testing.assert_frame_equal(actual[labels].fillna(-1), expected[labels].fillna(-1), check_dtype=False)
+    numbers = [column for column in FeatureEngineer.SNAPSHOT_COLUMNS if column not in LABELS]
+    np.testing.assert_allclose(actual[numbers].to_numpy(dtype=float), expected[numbers].to_numpy(dtype=float),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_delta_updates_match_a_full_rebuild(tmp_path):
+    frames = _raw_frames()
+    base, delta = _split(frames)
+    full = FeatureEngineer().build_feature_snapshots(**frames, as_of=AS_OF)
+
+    engine = IncrementalFeatureEngine()
+    _assert_same_rows(engine.rebuild(AS_OF, **base),
+                      FeatureEngineer().build_feature_snapshots(**base, as_of=AS_OF))
+
+    engine.save(str(tmp_path))
+    engine = IncrementalFeatureEngine.load(str(tmp_path))
+    changed = engine.apply(AS_OF, **delta)
+
+    touched = pd.unique(pd.concat([frame['customer_id'] for frame in delta.values()]))
+    assert sorted(changed['customer_id']) == sorted(touched)
+    _assert_same_rows(changed, full)
+    _assert_same_rows(engine.snapshots(as_of=AS_OF), full)
+
+
+def test_large_customers_fall_back_to_the_digest():
+    engine = IncrementalFeatureEngine(compression=40)
+    rng = np.random.default_rng(5)
+    dpd = rng.integers(0, 120, 400)
+    for part in np.array_split(dpd, 8):
+        engine.apply(AS_OF, risk_events=pd.DataFrame({'customer_id': 'C1', 'dpd': part}))
+
+    row = engine.snapshots(as_of=AS_OF).iloc[0]
+    assert row['dpd_max'] == dpd.max() and row['dpd_mean'] == pytest.approx(dpd.mean())
+    assert row['dpd_std'] == pytest.approx(pd.Series(dpd).std())
+    assert abs(row['dpd_median'] - np.median(dpd)) <= 3
+    assert len(engine.centroids) < 100
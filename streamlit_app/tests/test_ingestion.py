@@ -0,0 +1,290 @@
+import io
+import re
+from dataclasses import replace
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import FakeDriveEngine, csv_file
+from streamlit_app.utils.schema_registry import DEFAULT_SCHEMAS, SchemaRegistry
+
+PORTFOLIO_CSV = "Customer ID,Balance,Date\nC1,\"$1,000\",2025-01-31\nC2,250,2025-01-31\n"
+PAYMENT_CSV = "Payment ID,Customer ID,Amount,Date\nP1,C1,100,2025-02-01\n"
+
+
+def _folder():
+    return [
+        csv_file('f1', 'cartera_enero.csv', PORTFOLIO_CSV),
+        csv_file('f2', 'pagos_enero.csv', PAYMENT_CSV),
+        csv_file('f3', 'riesgo_enero.csv', "Customer ID,Date\nC1,2025-01-31\n"),
+        ('f4', ({'id': 'f4', 'name': 'notes.pdf', 'mimeType': 'application/pdf'}, b'')),
+    ]
+
+
+def test_sequential_ingestion_report(make_engine):
+    engine = make_engine(_folder())
+    report = engine.ingest_from_drive('folder')
+
+    assert report['total_files'] == 4
+    assert (report['successful'], report['failed'], report['skipped']) == (2, 1, 1)
+    assert [d['status'] for d in report['details']] == ['success', 'success', 'failed', 'skipped']
+    assert report['ml_features_refreshed'] is True
+    tables = [name for name, _, _ in engine.supabase.upserts]
+    assert tables == ['raw_portfolios', 'raw_payments']
+
+
+def test_concurrent_report_matches_sequential_order(make_engine, monkeypatch):
+    # Make the first file finish last so completion order differs from listing order
+    monkeypatch.setattr(FakeDriveEngine, 'download_delays', {'f1': 0.2, 'f2': 0.1})
+    sequential = make_engine(_folder()).ingest_from_drive('folder')
+    engine = make_engine(_folder(), max_workers=4, parse_workers=2)
+    concurrent = engine.ingest_from_drive('folder')
+
+    # Everything but wall-clock timings must match
+    untimed = lambda report: [{k: v for k, v in d.items() if k not in ('reader', 'spans')} for d in report['details']]
+    assert untimed(concurrent) == untimed(sequential)
+    assert list(concurrent['quality_scores']) == list(sequential['quality_scores'])
+    assert len(engine.supabase.upserts) == 2
+
+
+def test_manifest_skips_unchanged_files(make_engine, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.json')
+    first = make_engine(_folder(), manifest_path=manifest_path)
+    assert first.ingest_from_drive('folder')['successful'] == 2
+
+    second = make_engine(_folder(), manifest_path=manifest_path)
+    report = second.ingest_from_drive('folder')
+    assert report['skipped_unchanged'] == 2
+    assert report['successful'] == 0
+    # The failed file is retried on every run and nothing is re-upserted
+    assert report['failed'] == 1
+    assert second.supabase.upserts == []
+    assert 'ml_features_refreshed' not in report
+
+
+def test_manifest_compares_content_hash_when_metadata_changes(make_engine, tmp_path):
+    manifest_path = str(tmp_path / 'manifest.json')
+    make_engine(_folder(), manifest_path=manifest_path).ingest_from_drive('folder')
+
+    touched = [csv_file('f1', 'cartera_enero.csv', PORTFOLIO_CSV, modified='2025-11-15T06:00:00.000Z')]
+    report = make_engine(touched, manifest_path=manifest_path).ingest_from_drive('folder')
+    assert report['details'][0]['status'] == 'skipped_unchanged'
+    # The matching hash refreshed the stored metadata: no download next time
+    rerun = make_engine(touched, manifest_path=manifest_path)
+    assert rerun.ingest_from_drive('folder')['details'][0]['message'] == 'Unchanged since last ingestion'
+    assert 'f1' not in rerun.drive.downloaded
+
+    edited = [csv_file('f1', 'cartera_enero.csv', PORTFOLIO_CSV + "C3,10,2025-01-31\n",
+                       modified='2025-11-16T06:00:00.000Z')]
+    report = make_engine(edited, manifest_path=manifest_path).ingest_from_drive('folder')
+    assert report['details'][0]['rows_processed'] == 3
+
+    forced = make_engine(edited, manifest_path=manifest_path)
+    assert forced.ingest_from_drive('folder', force=True)['successful'] == 1
+
+
+def test_resumed_stream_is_validated_before_upserting(make_engine, tmp_path):
+    files = [csv_file('f1', 'pagos_febrero.csv', _payments_csv(1000))]
+    options = dict(checkpoint_path=str(tmp_path / 'checkpoint.json'), stream_csv=True, csv_chunk_rows=400,
+                   batch_size=100, max_in_flight=1, preflight_bytes=0)
+    engine = make_engine(files, upsert_retries=0, **options)
+    _fail_payment(engine, 'P650')
+    assert engine.ingest_from_drive('folder')['failed'] == 1
+
+    # The contract now requires a column the file lacks: resuming at chunk 1 must not skip validation
+    payment = DEFAULT_SCHEMAS['payment']
+    schemas = SchemaRegistry({'payment': replace(payment, required=payment.required + ('payment_type',))})
+    rerun = make_engine(files, schemas=schemas, **options)
+    detail = rerun.ingest_from_drive('folder', resume_only=True)['details'][0]
+    assert detail['resumed_from'] == {'chunk': 1, 'rows': 200}
+    assert (detail['status'], detail['message']) == ('failed', 'Missing required columns: payment_type')
+    assert rerun.supabase.upserts == []
+
+
+def _payments_csv(rows):
+    lines = ["Payment ID,Customer ID,Amount,Date"]
+    lines += [f"P{i},C{i % 50},\"${i},00\",2025-02-01" for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def test_streamed_csv_matches_buffered_ingestion(make_engine, tmp_path):
+    files = [csv_file('f1', 'pagos_febrero.csv', _payments_csv(2500))]
+    buffered = make_engine(files).ingest_from_drive('folder')
+
+    manifest_path = str(tmp_path / 'manifest.json')
+    engine = make_engine(files, stream_csv=True, csv_chunk_rows=400, batch_size=150,
+                         manifest_path=manifest_path)
+    streamed = engine.ingest_from_drive('folder')
+
+    detail = streamed['details'][0]
+    assert detail['status'] == 'success'
+    assert detail['chunks'] == 7
+    assert detail['rows_processed'] == buffered['details'][0]['rows_processed'] == 2500
+    assert [b['offset'] for b in detail['upsert_batches']][:4] == [0, 150, 300, 400]
+    # Chunk profiles merge to the buffered score; quantiles are approximate
+    streamed_quality = dict(streamed['quality_scores']['pagos_febrero.csv'])
+    buffered_quality = dict(buffered['quality_scores']['pagos_febrero.csv'])
+    streamed_columns, buffered_columns = streamed_quality.pop('columns'), buffered_quality.pop('columns')
+    assert streamed_quality == buffered_quality
+    for name in ('payment_id', 'customer_id', 'amount', 'date'):
+        streamed_quantiles = streamed_columns[name].pop('quantiles', {})
+        buffered_quantiles = buffered_columns[name].pop('quantiles', {})
+        assert streamed_columns[name] == buffered_columns[name]
+        assert streamed_quantiles == pytest.approx(buffered_quantiles, rel=0.02)
+    sent = sorted(int(row['payment_id'][1:]) for _, rows, _ in engine.supabase.upserts for row in rows)
+    assert sent == list(range(2500))
+
+    # The streamed content hash lets the manifest recognise the file next time
+    rerun = make_engine(files, manifest_path=manifest_path, stream_csv=True)
+    assert rerun.ingest_from_drive('folder')['skipped_unchanged'] == 1
+
+
+def test_streamed_csv_rejects_bad_header_without_full_download(make_engine):
+    raw = "Customer ID,Date\n" + "C1,2025-01-31\n" * 20000
+    engine = make_engine([csv_file('f1', 'pagos.csv', raw)], stream_csv=True, csv_chunk_rows=100,
+                         preflight_bytes=0)
+    report = engine.ingest_from_drive('folder')
+    assert report['details'][0]['message'].startswith('Missing required columns')
+    assert engine.drive.downloaded['f1'] < len(raw)
+
+
+@pytest.mark.parametrize('stream_csv', [False, True])
+def test_preflight_rejects_bad_header_from_a_range_request(make_engine, stream_csv):
+    bad = "Customer ID,Date\n" + "C1,2025-01-31\n" * 20000
+    good = _payments_csv(8000)
+    files = [csv_file('f1', 'pagos_malos.csv', bad), csv_file('f2', 'pagos_buenos.csv', good)]
+    engine = make_engine(files, preflight_bytes=4096, stream_csv=stream_csv)
+    report = engine.ingest_from_drive('folder')
+
+    rejected, passed = report['details']
+    assert rejected['message'].startswith('Missing required columns: payment_id, amount')
+    assert rejected['preflight']['status'] == 'rejected'
+    assert passed['status'] == 'success' and passed['preflight']['status'] == 'passed'
+    assert engine.drive.head_requests == [('f1', 4096), ('f2', 4096)]
+    assert 'f1' not in engine.drive.downloaded
+
+    summary = report['preflight']
+    assert (summary['checked'], summary['rejected']) == (2, 1)
+    assert summary['bytes_saved'] == len(bad) - 4096
+    assert summary['rows_saved_estimate'] == pytest.approx(20000, rel=0.01)
+    assert summary['cpu_seconds_saved_estimate'] is not None
+    assert engine.supabase.logs[0]['details']['preflight'] == summary
+
+
+def _fail_payment(engine, payment_id):
+    """Make every upsert batch containing ``payment_id`` fail"""
+    table = engine.supabase.table
+
+    def failing_table(name):
+        result = table(name)
+        execute = result.execute
+
+        def maybe_fail():
+            if any(row.get('payment_id') == payment_id for row in result._payload[0]):
+                raise RuntimeError('503 Service Unavailable')
+            return execute()
+
+        result.execute = maybe_fail
+        return result
+
+    engine.supabase.table = failing_table
+
+
+@pytest.mark.parametrize('options', [{}, {'stream_csv': True, 'csv_chunk_rows': 400}])
+def test_failed_upsert_resumes_from_checkpoint(make_engine, tmp_path, options):
+    files = [csv_file('f1', 'pagos_febrero.csv', _payments_csv(1000))]
+    checkpoint_path = str(tmp_path / 'checkpoint.json')
+    engine = make_engine(files, checkpoint_path=checkpoint_path, batch_size=100,
+                         max_in_flight=1, upsert_retries=0, **options)
+    _fail_payment(engine, 'P650')
+    assert engine.ingest_from_drive('folder')['failed'] == 1
+    # Later batches may still land, but only the unbroken prefix is committed
+    first_sent = {row['payment_id'] for _, rows, _ in engine.supabase.upserts for row in rows}
+    assert first_sent >= {f'P{i}' for i in range(600)} and 'P650' not in first_sent
+
+    rerun = make_engine(files, checkpoint_path=checkpoint_path, batch_size=100, max_in_flight=1, **options)
+    report = rerun.ingest_from_drive('folder', resume_only=True)
+    assert report['successful'] == 1
+    expected = {'chunk': 1, 'rows': 200} if options else {'chunk': 0, 'rows': 600}
+    assert report['details'][0]['resumed_from'] == expected
+    resent = [row['payment_id'] for _, rows, _ in rerun.supabase.upserts for row in rows]
+    assert resent == [f'P{i}' for i in range(600, 1000)]
+
+    # Nothing left to resume; a plain rerun starts from the beginning
+    done = make_engine(files, checkpoint_path=checkpoint_path, **options)
+    assert done.ingest_from_drive('folder', resume_only=True)['total_files'] == 0
+    restart = make_engine(files, checkpoint_path=checkpoint_path).ingest_from_drive('folder')
+    assert 'resumed_from' not in restart['details'][0]
+
+
+def _workbook(file_id, name):
+    fh = io.BytesIO()
+    with pd.ExcelWriter(fh) as writer:
+        pd.DataFrame({'Customer ID': ['C1', 'C2'], 'Balance': [100, 250], 'Date': ['2025-01-31'] * 2}).to_excel(
+            writer, sheet_name='Lima', index=False)
+        pd.DataFrame({'Customer ID': ['C3', 'C2'], 'Balance': [75, 250], 'Date': ['2025-01-31'] * 2}).to_excel(
+            writer, sheet_name='Cusco', index=False)
+        pd.DataFrame({'Payment ID': ['P1'], 'Customer ID': ['C1'], 'Amount': [10], 'Date': ['2025-02-01']}).to_excel(
+            writer, sheet_name='Pagos', index=False)
+        pd.DataFrame({'Nota': ['Cifras en USD']}).to_excel(writer, sheet_name='Notas', index=False)
+    raw = fh.getvalue()
+    meta = {
+        'id': file_id,
+        'name': name,
+        'mimeType': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'modifiedTime': '2025-11-14T06:00:00.000Z',
+        'size': str(len(raw)),
+    }
+    return file_id, (meta, raw)
+
+
+@pytest.mark.parametrize('sheet_workers', [1, 2])
+def test_multi_sheet_workbook_batches_compatible_sheets(make_engine, sheet_workers):
+    engine = make_engine([_workbook('w1', 'cartera_sucursales.xlsx')], sheet_workers=sheet_workers)
+    report = engine.ingest_from_drive('folder')
+    detail = report['details'][0]
+
+    assert detail['status'] == 'success'
+    assert detail['reader']['sheets'] == 4
+    # Lima + Cusco share a table and columns: one upsert, cross-sheet duplicate dropped
+    assert [(table, len(rows)) for table, rows, _ in engine.supabase.upserts] == [
+        ('raw_portfolios', 3), ('raw_payments', 1)
+    ]
+    assert detail['rows_processed'] == 4
+    assert detail['duplicates_removed'] == 1
+    sheets = {sheet['sheet']: sheet for sheet in detail['sheets']}
+    assert [sheets[name]['status'] for name in ('Lima', 'Cusco', 'Pagos', 'Notas')] == [
+        'parsed', 'parsed', 'parsed', 'skipped'
+    ]
+    assert sheets['Lima']['group'] == sheets['Cusco']['group'] == 0
+    assert (sheets['Pagos']['source_type'], sheets['Pagos']['group']) == ('payment', 1)
+    quality = report['quality_scores']['cartera_sucursales.xlsx']
+    assert set(quality['sheets']) == {'Lima', 'Cusco', 'Pagos'}
+    assert quality['total_rows'] == 5
+
+
+@pytest.mark.parametrize('stream_csv', [False, True])
+def test_upserts_conflict_on_each_tables_keys(make_engine, stream_csv):
+    folder = _folder()[:2] + [csv_file('f5', 'ingresos_enero.csv', "Customer ID,Revenue,Date\nC1,10,2025-01-31\n")]
+    engine = make_engine(folder, stream_csv=stream_csv, conflict_keys={'raw_payments': ['payment_id', 'customer_id']})
+    report = engine.ingest_from_drive('folder')
+
+    assert [(table, kwargs.get('on_conflict')) for table, _, kwargs in engine.supabase.upserts] == [
+        ('raw_portfolios', 'customer_id,date'),
+        ('raw_payments', 'payment_id,customer_id'),
+        ('raw_revenue', None),
+    ]
+    # A frame without every key column is not upserted on a partial key
+    assert report['details'][2]['conflict_keys_missing'] == ['revenue_type']
+
+
+def test_conflict_keys_have_unique_indexes(make_engine):
+    sql = ''.join(path.read_text() for path in (Path(__file__).resolve().parents[2] / 'supabase' / 'migrations').glob('*.sql'))
+    indexes = {table: columns.split(', ') for table, columns in re.findall(r'CREATE UNIQUE INDEX .* ON (raw_\w+)\((.*)\);', sql)}
+    indexes['raw_customers'] = ['customer_id']  # UNIQUE column in 20241110_abaco_schema.sql
+    engine = make_engine([])
+
+    assert FakeDriveEngine.CONFLICT_KEYS == indexes
+    for source_type, schema in DEFAULT_SCHEMAS.items():
+        assert indexes[engine.get_table_name(source_type)] == list(schema.business_keys)
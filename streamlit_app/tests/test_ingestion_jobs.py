@@ -0,0 +1,142 @@
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+from conftest import csv_file
+from streamlit_app.utils.ingestion_jobs import IngestionJobQueue, IngestionTriggerServer, IngestionWorker
+
+PAYMENT_CSV = "Payment ID,Customer ID,Amount,Date\nP1,C1,100,2025-02-01\n"
+
+
+def _files(count=3):
+    return [csv_file(f'f{i}', f'pagos_{i}.csv', PAYMENT_CSV.replace('P1', f'P{i}')) for i in range(count)]
+
+
+def test_queue_dedupes_limits_concurrency_and_cancels(tmp_path):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'), max_concurrent=1)
+    first = queue.enqueue('folder')
+    assert queue.enqueue('folder')['id'] == first['id']
+    forced = queue.enqueue('folder', {'force': True}, source='cron')
+    assert forced['id'] != first['id'] and forced['source'] == 'cron'
+
+    # A second worker process sees the same queue and the same limit
+    other = IngestionJobQueue(queue.path, max_concurrent=1)
+    assert queue.claim('w1')['id'] == first['id']
+    assert other.claim('w2') is None
+
+    assert queue.cancel(forced['id'])
+    assert queue.get(forced['id'])['status'] == 'cancelled'
+    assert queue.cancel(first['id'])
+    assert queue.heartbeat(first['id'], 1, 3) is True
+    queue.finish(first['id'], {'total_files': 3, 'cancelled': 2, 'failed': 0})
+    job = queue.get(first['id'])
+    assert (job['status'], job['files_done'], job['message']) == ('cancelled', 3, 'Cancelled after 1 files')
+    assert not queue.cancel(first['id'])
+
+
+def test_stale_jobs_are_requeued(tmp_path):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'), stale_after=0)
+    job = queue.enqueue('folder')
+    queue.claim('dead-worker')
+    claimed = queue.claim('w2')
+    assert (claimed['id'], claimed['worker'], claimed['attempts']) == (job['id'], 'w2', 2)
+
+
+def _stopped():
+    stop = threading.Event()
+    stop.set()
+    return stop
+
+
+def test_worker_runs_jobs_with_progress(tmp_path, make_engine):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'))
+    job = queue.enqueue('folder')
+    worker = IngestionWorker(queue, lambda job: make_engine(_files()))
+    assert worker.poll() == [job['id']]
+    # A stopped worker claims nothing new but waits for its running jobs
+    worker.run_forever(_stopped())
+
+    done = queue.get(job['id'])
+    assert done['status'] == 'succeeded'
+    assert done['report']['successful'] == 3
+    assert (done['files_done'], done['files_total']) == (3, 3)
+    assert done['message'] == '3 succeeded, 0 failed, 0 skipped'
+    assert worker.running() == []
+
+
+def test_concurrent_jobs_never_share_a_folders_state(tmp_path, make_engine):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'), max_concurrent=3)
+    first = queue.enqueue('folder')
+    second = queue.enqueue('folder', {'max_workers': 1})
+    other = queue.enqueue('other')
+    release = threading.Event()
+
+    def engine_for(job):
+        release.wait(5)
+        return make_engine(_files(), manifest_path=str(tmp_path / f"{job['folder_id']}.json"))
+
+    worker = IngestionWorker(queue, engine_for)
+    # Below the concurrency limit, yet the second job of 'folder' waits for the first
+    assert worker.poll() == [first['id'], other['id']]
+    assert queue.get(second['id'])['status'] == 'queued'
+    release.set()
+    worker.run_forever(_stopped())
+
+    # It then runs alone and finds every file in the manifest the first job saved
+    assert worker.poll() == [second['id']]
+    worker.run_forever(_stopped())
+    assert [queue.get(job['id'])['status'] for job in (first, second, other)] == ['succeeded'] * 3
+    assert queue.get(second['id'])['report']['skipped_unchanged'] == 3
+
+
+def test_cancel_stops_before_the_next_file(tmp_path, make_engine):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'))
+    job = queue.enqueue('folder')
+    engine = make_engine(_files())
+    original = engine._process_file
+
+    def cancel_after_first(file_info, force=False):
+        outcome = original(file_info, force=force)
+        queue.cancel(job['id'])
+        return outcome
+
+    engine._process_file = cancel_after_first
+    worker = IngestionWorker(queue, lambda job: engine)
+    worker.run_job(queue.claim('w1'))
+
+    done = queue.get(job['id'])
+    assert done['status'] == 'cancelled'
+    assert [d['status'] for d in done['report']['details']] == ['success', 'cancelled', 'cancelled']
+    assert len(engine.supabase.upserts) == 1
+
+
+def test_trigger_endpoint_queues_and_reports_jobs(tmp_path):
+    queue = IngestionJobQueue(str(tmp_path / 'jobs.sqlite3'))
+    server = IngestionTriggerServer(queue, 'folder', token='secret', port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/api/ingest'
+
+    def call(method, path='', body=None, token='secret'):
+        request = urllib.request.Request(url + path, method=method, data=json.dumps(body).encode() if body else None)
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        assert call('POST', token='wrong')[0] == 401
+        status, payload = call('POST', body={'force': True, 'ignored': 1})
+        assert status == 202
+        job = payload['job']
+        assert (job['source'], job['options']) == ('cron', {'force': True})
+        assert call('GET', f"/{job['id']}")[1]['job']['status'] == 'queued'
+        assert call('DELETE', f"/{job['id']}")[0] == 202
+        assert queue.get(job['id'])['status'] == 'cancelled'
+        assert call('GET', '/missing')[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
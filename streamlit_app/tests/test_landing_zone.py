@@ -0,0 +1,72 @@
+import pandas as pd
+from datetime import date
+
+from conftest import FakeDriveEngine, FakeSupabase, csv_file
+from streamlit_app.utils.landing_zone import ParquetLandingZone
+
+PORTFOLIO_CSV = "Customer ID,Balance,Date\nC1,\"$1,000\",2025-01-31\nC2,250,2025-01-31\n"
+
+
+def test_landing_zone_round_trips_frame_and_metadata(tmp_path):
+    zone = ParquetLandingZone(str(tmp_path))
+    df = pd.DataFrame({'customer_id': ['C1', 'C2'], 'balance': [1000.0, 250.0]})
+    path = zone.write(df, 'portfolio', 'Cartera Enero.xlsx', {'table': 'raw_portfolios'},
+                      part=3, ingest_date=date(2025, 11, 14))
+
+    assert path.endswith('source_type=portfolio/ingest_date=2025-11-14/Cartera_Enero.xlsx-part-00003.parquet')
+    assert zone.list_files('portfolio', '2025-11-14') == [path]
+    assert zone.list_files('payment') == []
+    landed, metadata = zone.read(path)
+    pd.testing.assert_frame_equal(landed, df)
+    assert metadata == {'source_type': 'portfolio', 'file_name': 'Cartera Enero.xlsx', 'table': 'raw_portfolios'}
+
+
+def test_landed_files_are_keyed_by_name_extension_and_id(tmp_path):
+    zone = ParquetLandingZone(str(tmp_path))
+    df = pd.DataFrame({'customer_id': ['C1']})
+    paths = [
+        zone.write(df, 'portfolio', 'x.csv', file_id='a'),
+        zone.write(df, 'portfolio', 'x.xlsx', file_id='a'),
+        zone.write(df, 'portfolio', 'x.csv', file_id='b'),
+    ]
+    assert len(set(paths)) == 3
+    assert zone.list_files() == sorted(paths)
+
+
+def test_discard_drops_stale_parts_of_one_file(tmp_path):
+    zone = ParquetLandingZone(str(tmp_path))
+    df = pd.DataFrame({'customer_id': ['C1']})
+    parts = [zone.write(df, 'payment', 'pagos.csv', part=part, file_id='f1') for part in range(3)]
+    other = zone.write(df, 'payment', 'pagos.csv', part=2, file_id='f10')
+
+    # A resumed run keeps the parts it committed before
+    assert zone.discard('pagos.csv', 'f1', from_part=1) == parts[1:]
+    assert zone.list_files() == sorted([parts[0], other])
+    assert zone.discard('pagos.csv', 'f1') == parts[:1]
+
+
+def test_replay_re_upserts_landed_rows_without_drive(make_engine, tmp_path):
+    landing = str(tmp_path / 'landing')
+    engine = make_engine([csv_file('f1', 'cartera_enero.csv', PORTFOLIO_CSV)], landing_zone_path=landing)
+    assert engine.ingest_from_drive('folder')['details'][0]['landing_paths']
+
+    replayer = FakeDriveEngine.from_clients(FakeSupabase(), None, landing_zone_path=landing)
+    report = replayer.replay_from_landing_zone(source_type='portfolio')
+    assert (report['total_files'], report['successful']) == (1, 1)
+    assert report['ml_features_refreshed'] is True
+    (table, rows, kwargs), = replayer.supabase.upserts
+    (orig_table, orig_rows, orig_kwargs), = engine.supabase.upserts
+    assert (table, rows, kwargs) == (orig_table, orig_rows, orig_kwargs)
+
+
+def test_shorter_rerun_leaves_no_stale_parts(make_engine, tmp_path):
+    landing = str(tmp_path / 'landing')
+    rows = "\n".join(f"C{i},{i},2025-01-31" for i in range(5))
+    first = make_engine([csv_file('f1', 'cartera.csv', f"Customer ID,Balance,Date\n{rows}\n")],
+                        landing_zone_path=landing, stream_csv=True, csv_chunk_rows=2)
+    assert len(first.ingest_from_drive('folder')['details'][0]['landing_paths']) == 3
+
+    rerun = make_engine([csv_file('f1', 'cartera.csv', PORTFOLIO_CSV, modified='2025-11-15T06:00:00.000Z')],
+                        landing_zone_path=landing, stream_csv=True, csv_chunk_rows=2)
+    landed = rerun.ingest_from_drive('folder')['details'][0]['landing_paths']
+    assert ParquetLandingZone(landing).list_files() == landed
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from streamlit_app.utils import normalization
+from streamlit_app.utils.normalization import ColumnRole, NormalizationEngine
+
+
+def _legacy_numeric(series):
+    series = series.astype(str).str.replace(r'[\$,₡,€,%]', '', regex=True)
+    series = series.str.replace(',', '', regex=True).str.strip()
+    return pd.to_numeric(series, errors='coerce')
+
+
+VALUES = pd.Series(['$1,234.50', ' ₡ 99 ', '€-3', '15%', 'N/A', None, np.nan, '1e3', 7, 2.5, ''],
+                   dtype=object)
+
+
+def test_clean_numeric_matches_legacy_conversion(monkeypatch):
+    expected = _legacy_numeric(VALUES)
+    pd.testing.assert_series_equal(NormalizationEngine.clean_numeric(VALUES), expected,
+                                   check_dtype=False)
+
+    monkeypatch.setattr(normalization, 'pa', None)
+    pd.testing.assert_series_equal(NormalizationEngine.clean_numeric(VALUES), expected,
+                                   check_dtype=False)
+
+    ints = pd.Series(['1', '2', '3,000'], dtype=object)
+    assert NormalizationEngine.clean_numeric(ints).tolist() == [1, 2, 3000]
+    assert NormalizationEngine.clean_numeric(ints).dtype == np.int64
+
+
+def test_plan_infers_roles_once_per_source_type():
+    engine = NormalizationEngine()
+    df = pd.DataFrame({
+        'customer_id': ['C1', 'C2'],
+        'balance': ['$1,000', '250'],
+        'status': ['active', 'closed'],
+        'date': ['2025-01-31', '2025-02-28'],
+        'rate': [0.1, 0.2],
+    })
+    plan = engine.plan_for(df, 'portfolio')
+    assert plan.roles == {
+        'customer_id': ColumnRole.TEXT,
+        'balance': ColumnRole.NUMERIC,
+        'status': ColumnRole.TEXT,
+        'date': ColumnRole.DATE,
+        'rate': ColumnRole.PASSTHROUGH,
+    }
+    assert engine.plan_for(df.copy(), 'portfolio') is plan
+    assert engine.plan_for(df, 'facility') is not plan
+
+    out = engine.apply(df, plan)
+    assert out['balance'].tolist() == [1000, 250]
+    assert out['status'].tolist() == ['active', 'closed']
+    assert str(out['date'].dtype).startswith('datetime64')
+
+
+def test_apply_keeps_duplicate_column_names():
+    df = pd.DataFrame([['1', '2']], columns=['amount', 'amount'])
+    out = NormalizationEngine().normalize(df)
+    assert list(out.columns) == ['amount', 'amount']
+    assert out.iloc[0].tolist() == [1, 2]
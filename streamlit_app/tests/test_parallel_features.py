@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from streamlit_app.utils.feature_engineering import FeatureEngineer
+from streamlit_app.utils.parallel_features import ParallelFeatureRunner
+from test_feature_engineering import AS_OF, _raw_frames
+
+
+def _by_customer(snapshots):
+    return snapshots.sort_values('customer_id', key=lambda ids: ids.astype(str)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('workers, partitions, chunk_rows', [(1, 3, 128), (2, 5, ParallelFeatureRunner.CHUNK_ROWS)])
+def test_partitioned_build_matches_single_process(tmp_path, workers, partitions, chunk_rows):
+    frames = _raw_frames()
+    frames['payments'].loc[0, 'customer_id'] = None  # Rows without a customer are dropped either way
+    frames['revenue'].loc[0, 'customer_id'] = 42  # Mixed-type ids fall back from Arrow to pickle
+    expected = FeatureEngineer().build_feature_snapshots(**frames, as_of=AS_OF)
+
+    runner = ParallelFeatureRunner(workers, partitions, work_dir=str(tmp_path), chunk_rows=chunk_rows)
+    snapshots = runner.run(**frames, as_of=AS_OF)
+
+    assert list(snapshots.columns) == FeatureEngineer.SNAPSHOT_COLUMNS
+    # Z-scores come from merged partition moments, equal up to rounding
+    pd.testing.assert_frame_equal(_by_customer(snapshots), _by_customer(expected), check_exact=False, rtol=1e-9)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_partitions_are_stable_and_type_insensitive():
+    ids = pd.Series(['C1', None, 'C2', 'C1'], dtype=object)
+    partition = ParallelFeatureRunner.partition_ids(ids, 8)
+    assert partition[1] == -1 and partition[0] == partition[3]
+    assert (ParallelFeatureRunner.partition_ids(pd.Series([7, 8]), 8)
+            == ParallelFeatureRunner.partition_ids(pd.Series(['7', '8'], dtype=object), 8)).all()
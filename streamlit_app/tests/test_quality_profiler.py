@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_app.utils.quality_profiler import DataQualityProfiler
+from streamlit_app.utils.sketches import HyperLogLog, TDigest
+
+
+def _frame(rows=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    balance = rng.gamma(2.0, 500.0, rows)
+    balance[rng.random(rows) < 0.05] = np.nan
+    balance[:40] = 0
+    return pd.DataFrame({
+        'customer_id': pd.Series(rng.integers(0, 800, rows)).map('C{:04d}'.format),
+        'balance': balance,
+        'dpd': pd.array(np.where(np.arange(rows) < 40, 0, rng.integers(0, 120, rows)), dtype='Int32'),
+        'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+    })
+
+
+def test_profile_matches_multi_pass_counts():
+    df = _frame()
+    profile = DataQualityProfiler().profile(df)
+    numeric = df.select_dtypes(include=[np.number])
+    assert profile.rows == len(df)
+    assert profile.null_cells == int(df.isnull().sum().sum())
+    assert profile.zero_rows == int((numeric == 0).all(axis=1).sum()) == 40
+    assert profile.nulls_in(['customer_id', 'balance']) == int(df['balance'].isnull().sum())
+
+
+def test_chunk_profiles_merge_to_whole_frame_profile():
+    df = _frame()
+    profiler = DataQualityProfiler(max_workers=4)
+    whole = profiler.column_report(profiler.profile(df))
+    merged = None
+    for start in range(0, len(df), 700):
+        chunk = profiler.profile(df.iloc[start:start + 700])
+        merged = chunk if merged is None else merged.merge(chunk)
+    chunked = profiler.column_report(merged)
+
+    for name in df.columns:
+        whole[name].pop('quantiles', None)
+        chunked_quantiles = chunked[name].pop('quantiles', {})
+        assert chunked[name] == whole[name]
+        # Approximate quantiles are judged in rank space
+        values = df[name].dropna().to_numpy(dtype=float) if chunked_quantiles else None
+        for label, estimate in chunked_quantiles.items():
+            assert (values <= estimate).mean() == pytest.approx(int(label[1:]) / 100, abs=0.01)
+    assert whole['customer_id']['distinct_approx'] == pytest.approx(df['customer_id'].nunique(), rel=0.03)
+    assert whole['date']['min'] == df['date'].min().isoformat()
+    assert chunked['balance']['max'] == df['balance'].max()
+
+
+def test_mixed_kind_chunks_and_infinities_stay_json_safe():
+    profiler = DataQualityProfiler()
+    merged = profiler.profile(pd.DataFrame({'date': pd.to_datetime(['2025-01-31']), 'rate': [np.inf]}))
+    for chunk in ({'date': [np.nan], 'rate': [-np.inf]}, {'date': [1.5], 'rate': [2.0]}):
+        merged.merge(profiler.profile(pd.DataFrame(chunk)))
+    report = profiler.column_report(merged)
+
+    # Datetime in one chunk, numeric in another: no min/max across kinds
+    assert report['date']['kind'] == 'text' and 'min' not in report['date']
+    assert (report['rate']['min'], report['rate']['max']) == (None, None)
+    assert json.loads(json.dumps(report, allow_nan=False)) == report
+
+
+def test_sketches_are_accurate_and_mergeable():
+    values = np.random.default_rng(11).lognormal(3, 1, 200_000)
+    left, right = TDigest(), TDigest()
+    left.update(values[:120_000])
+    right.update(values[120_000:])
+    merged = TDigest.from_dict(left.merge(right).to_dict())
+    for q in (0.01, 0.5, 0.99):
+        assert merged.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    assert len(merged.means) <= 200
+
+    hll = HyperLogLog()
+    hll.update(pd.Series(np.arange(50_000)))
+    other = HyperLogLog()
+    other.update(pd.Series(np.arange(25_000, 75_000)))
+    assert hll.merge(other).estimate() == pytest.approx(75_000, rel=0.05)
@@ -0,0 +1,71 @@
+import io
+
+import pandas as pd
+import pytest
+
+from streamlit_app.utils.readers import ReaderRegistry
+
+CSV = b"customer_id,balance,status,date\nC1,100,,2025-01-31\nC2,250.5,active,2025-02-28\n"
+
+
+def _xlsx_bytes():
+    fh = io.BytesIO()
+    pd.DataFrame({'customer_id': ['C1', 'C2'], 'balance': [100, None]}).to_excel(fh, index=False)
+    fh.seek(0)
+    return fh
+
+
+@pytest.mark.parametrize('engine', ['pyarrow', 'pandas'])
+def test_csv_engines_agree(engine):
+    registry = ReaderRegistry({'*': {'csv': [engine]}})
+    df, stats = registry.read(io.BytesIO(CSV), 'csv')
+    assert stats['engine'] == engine
+    assert stats['bytes'] == len(CSV)
+    assert df['customer_id'].tolist() == ['C1', 'C2']
+    assert df['balance'].tolist() == [100, 250.5]
+    assert df['status'].isna().tolist() == [True, False]
+
+
+@pytest.mark.parametrize('engine', ['calamine', 'openpyxl'])
+def test_excel_engines_agree(engine):
+    registry = ReaderRegistry({'portfolio': {'xlsx': [engine]}})
+    if not registry.candidates('xlsx', 'portfolio'):
+        pytest.skip(f'{engine} not installed')
+    df, stats = registry.read(_xlsx_bytes(), 'xlsx', 'portfolio')
+    assert stats['engine'] == engine
+    assert df['customer_id'].tolist() == ['C1', 'C2']
+    assert df['balance'].iloc[0] == 100 and pd.isna(df['balance'].iloc[1])
+
+
+def test_fallback_when_engine_missing_or_failing(monkeypatch):
+    registry = ReaderRegistry({'payment': {'csv': ['pyarrow', 'pandas']}})
+    monkeypatch.setattr(registry.BACKENDS['pyarrow'], 'required_modules', ['not_installed_module'])
+    assert [b.name for b in registry.candidates('csv', 'payment')] == ['pandas']
+
+    monkeypatch.undo()
+
+    def broken(fh, **options):
+        raise ValueError('CSV parse error')
+
+    monkeypatch.setattr(registry.BACKENDS['pyarrow'], 'read', broken)
+    df, stats = registry.read(io.BytesIO(CSV), 'csv', 'payment')
+    assert stats['engine'] == 'pandas'
+    assert stats['fallback_errors'] == {'pyarrow': 'CSV parse error'}
+    assert len(df) == 2
+
+
+def test_read_sheets_in_worker_processes_matches_sequential():
+    fh = io.BytesIO()
+    with pd.ExcelWriter(fh) as writer:
+        for name, rows in (('Lima', 3), ('Cusco', 2), ('Piura', 1)):
+            pd.DataFrame({'customer_id': [f'{name}{i}' for i in range(rows)]}).to_excel(
+                writer, sheet_name=name, index=False)
+    registry = ReaderRegistry()
+    names = registry.sheet_names(fh)
+    assert names == ['Lima', 'Cusco', 'Piura']
+
+    sequential = registry.read_sheets(fh, names)
+    parallel = registry.read_sheets(fh, names, workers=2)
+    assert [len(df) for df, _ in parallel] == [3, 2, 1]
+    for (expected, _), (df, _) in zip(sequential, parallel):
+        pd.testing.assert_frame_equal(df, expected)
@@ -0,0 +1,75 @@
+import io
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import csv_file
+from streamlit_app.utils.readers import ReaderRegistry
+from streamlit_app.utils.schema_registry import DEFAULT_SCHEMAS, SchemaRegistry
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / 'supabase' / 'migrations'
+
+RISK_CSV = b"Customer ID,DPD,Date,Event Type,Notes\n007,15,2025-01-31,late,x\n008,,2025-02-28,late,y\n"
+
+
+def test_hints_match_raw_header_names():
+    schema = SchemaRegistry().get('risk')
+    hints = schema.reader_hints(['Customer ID', 'DPD', 'Date', 'Notes'], prune=True)
+    assert hints.dtypes == {'Customer ID': 'string', 'DPD': 'integer', 'Date': 'datetime'}
+    assert hints.usecols == ['Customer ID', 'DPD', 'Date']
+    assert hints.relaxed().dtypes == {'Customer ID': 'string'}
+
+
+@pytest.mark.parametrize('engine', ['pyarrow', 'pandas'])
+def test_csv_columns_are_typed_at_parse_time(engine):
+    registry = ReaderRegistry({'*': {'csv': [engine]}})
+    df, stats = registry.read(io.BytesIO(RISK_CSV), 'csv', 'risk', schema=SchemaRegistry().get('risk'))
+    assert stats['typed'] == 'full'
+    assert df['Customer ID'].tolist() == ['007', '008']
+    assert pd.api.types.is_datetime64_any_dtype(df['Date'])
+    assert df['Event Type'].dtype == 'category'
+    assert df['DPD'].iloc[0] == 15 and pd.isna(df['DPD'].iloc[1])
+
+
+def test_formatted_numbers_fall_back_to_relaxed_hints_once():
+    registry = ReaderRegistry({'*': {'csv': ['pandas']}})
+    schema = SchemaRegistry().get('portfolio')
+    raw = b"Customer ID,Balance,Date\n001,\"$1,000\",2025-01-31\n"
+    df, stats = registry.read(io.BytesIO(raw), 'csv', 'portfolio', schema=schema)
+    assert stats['typed'] == 'relaxed'
+    assert df['Balance'].tolist() == ['$1,000']
+    assert df['Customer ID'].tolist() == ['001']
+    assert ('portfolio', 'pandas') in registry._relaxed
+
+
+def test_engine_reports_schema_violations_and_compact_dtypes(make_engine):
+    engine = make_engine([csv_file('f1', 'riesgo_enero.csv', RISK_CSV.decode().replace('007,15', ',15'))])
+    report = engine.ingest_from_drive('folder')
+    detail = report['details'][0]
+    assert detail['status'] == 'success'
+    assert detail['reader']['typed'] == 'full'
+    assert detail['schema_violations'] == {'nulls': {'customer_id': 1, 'dpd': 1}}
+    rows = engine.supabase.upserts[0][1]
+    assert [row['dpd'] for row in rows] == [15, None]
+    assert rows[1]['customer_id'] == '008'
+
+
+def _table_columns():
+    """Columns of each raw_* table across the migrations"""
+    tables = {}
+    for path in sorted(MIGRATIONS.glob('*.sql')):
+        sql = path.read_text()
+        for table, body in re.findall(r'CREATE TABLE IF NOT EXISTS (raw_\w+) \((.*?)\n\);', sql, re.S):
+            tables.setdefault(table, set()).update(re.findall(r'^\s+(\w+)\s', body, re.M))
+        for table, column in re.findall(r'ALTER TABLE (raw_\w+) ADD COLUMN IF NOT EXISTS "?(\w+)"?', sql):
+            tables[table].add(column)
+    return tables
+
+
+def test_schemas_mirror_the_raw_tables(make_engine):
+    engine, tables = make_engine([]), _table_columns()
+    for source_type, schema in DEFAULT_SCHEMAS.items():
+        columns = tables[engine.get_table_name(source_type)]
+        assert {spec.name for spec in schema.columns} <= columns, source_type
@@ -0,0 +1,58 @@
+from conftest import csv_file
+from streamlit_app.utils.ingestion import DataIngestionEngine
+from streamlit_app.utils.source_classifier import KeywordAutomaton, SourceTypeClassifier
+
+
+def _classifier():
+    return SourceTypeClassifier(required_columns=DataIngestionEngine.REQUIRED_COLUMNS)
+
+
+def test_automaton_reports_overlapping_keywords():
+    automaton = KeywordAutomaton(['he', 'she', 'his', 'hers'])
+    assert sorted(automaton.find('ushers')) == [(1, 'she'), (2, 'he'), (2, 'hers')]
+
+
+def test_longest_token_match_wins_regardless_of_keyword_order():
+    classifier = _classifier()
+    match = classifier.classify('Pagos_Cobranza_Marzo.csv')
+    assert (match.source_type, match.keyword, match.method) == ('collections', 'cobranza', 'filename')
+    assert classifier.is_ambiguous(match)
+
+    assert classifier.classify('cobros_marzo.csv').source_type == 'payment'
+    assert classifier.classify('linea_credito_2025.xlsx').confidence == 1.0
+    assert classifier.classify('notes.csv').source_type is None
+
+    # Equal scores fall back to explicit priority (portfolio before risk)
+    tied = SourceTypeClassifier([('portfolio', ['abc']), ('risk', ['xyz'])])
+    assert tied.classify('abc_xyz.csv').source_type == 'portfolio'
+
+
+def test_header_settles_ambiguous_names_and_is_memoized():
+    classifier = _classifier()
+    header = ['Payment ID', 'Customer ID', 'Amount', 'Date']
+    match = classifier.classify('pagos_cobranza.csv', 'f1', header=header)
+    assert (match.source_type, match.method) == ('payment', 'header')
+    # Memoized per file id: the sniffed answer sticks without a header
+    assert classifier.classify('pagos_cobranza.csv', 'f1') == match
+    # ...until the file is renamed
+    assert classifier.classify('cobranza.csv', 'f1').method == 'filename'
+
+    unknown = classifier.classify('export.csv', 'f2', header=['Customer ID', 'DPD', 'Date'])
+    assert unknown.source_type == 'risk'
+
+
+def test_engine_routes_ambiguous_files_by_header(make_engine):
+    text = "Payment ID,Customer ID,Amount,Date\nP1,C1,100,2025-02-01\n"
+    files = [csv_file('f1', 'pagos_cobranza.csv', text), csv_file('f2', 'export.csv', text)]
+    for stream_csv in (False, True):
+        engine = make_engine(files, stream_csv=stream_csv)
+        report = engine.ingest_from_drive('folder')
+        assert [d['status'] for d in report['details']] == ['success', 'success']
+        assert [d['source']['method'] for d in report['details']] == ['header', 'header']
+        assert [name for name, _, _ in engine.supabase.upserts] == ['raw_payments', 'raw_payments']
+
+    # Filename only: routed to collections, whose required columns are missing
+    engine = make_engine(files, sniff_source_headers=False)
+    report = engine.ingest_from_drive('folder')
+    assert report['details'][0]['message'].startswith('Missing required columns: collected_amount')
+    assert [name for name, _, _ in engine.supabase.upserts] == ['raw_unknown']
@@ -0,0 +1,77 @@
+import pytest
+
+from conftest import csv_file
+from streamlit_app.utils.tracing import OpenTelemetryExporter, SpanRecorder
+
+PAYMENT_CSV = "Payment ID,Customer ID,Amount,Date\n" + "".join(
+    f"P{i},C{i % 7},{i}.5,2025-02-01\n" for i in range(1000)
+)
+
+
+def test_file_spans_carry_duration_bytes_and_rows(make_engine):
+    exported = []
+    engine = make_engine([csv_file('f1', 'pagos.csv', PAYMENT_CSV)],
+                         span_exporter=lambda span, start, end: exported.append((span['name'], end >= start)))
+    report = engine.ingest_from_drive('folder')
+
+    spans = {span['name']: span for span in report['details'][0]['spans']}
+    assert list(spans) == ['download', 'parse', 'normalize', 'validate', 'quality', 'compact', 'upsert']
+    assert spans['download']['bytes'] == len(PAYMENT_CSV)
+    assert spans['parse']['rows'] == spans['upsert']['rows'] == 1000
+    assert spans['upsert']['bytes'] > 0
+    assert all(span['status'] == 'ok' and span['seconds'] >= 0 for span in spans.values())
+    assert [span['name'] for span in report['spans']] == ['list', 'refresh_ml_features']
+    assert [name for name, _ in exported][-1] == 'refresh_ml_features'
+    assert all(ordered for _, ordered in exported)
+
+    (log,) = engine.supabase.logs
+    assert (log['total_files'], log['successful']) == (1, 1)
+    assert log['details']['files'][0]['spans'][0]['name'] == 'download'
+    assert [span['name'] for span in log['details']['spans']] == ['list', 'refresh_ml_features']
+
+
+def test_streamed_chunks_merge_into_one_span_per_stage(make_engine):
+    engine = make_engine([csv_file('f1', 'pagos.csv', PAYMENT_CSV)], stream_csv=True, csv_chunk_rows=300)
+    detail = engine.ingest_from_drive('folder')['details'][0]
+    spans = {span['name']: span for span in detail['spans']}
+    assert spans['normalize']['count'] == spans['upsert']['count'] == 4
+    assert spans['upsert']['rows'] == 1000
+    assert spans['parse']['bytes'] == len(PAYMENT_CSV)
+
+
+def test_failing_stage_is_recorded_and_reraised():
+    sink = []
+    with pytest.raises(RuntimeError):
+        with SpanRecorder().span('upsert', sink):
+            raise RuntimeError('boom')
+    assert sink[0]['status'] == 'error' and sink[0]['error'] == 'boom'
+
+
+class _FakeOtelSpan:
+    def __init__(self, tracer, name, start_time, attributes):
+        self.tracer, self.name, self.start_time, self.attributes = tracer, name, start_time, attributes
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.tracer.ended.append((self.name, self.start_time, end_time, self.attributes))
+
+
+class _FakeTracer:
+    def __init__(self):
+        self.ended = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        return _FakeOtelSpan(self, name, start_time, attributes)
+
+
+def test_opentelemetry_exporter_replays_span_timing():
+    pytest.importorskip('opentelemetry')
+    tracer = _FakeTracer()
+    recorder = SpanRecorder(OpenTelemetryExporter(tracer=tracer))
+    with recorder.span('parse', [], file='pagos.csv') as span:
+        span['rows'] = 10
+    ((name, start, end, attributes),) = tracer.ended
+    assert name == 'ingestion.parse' and end >= start
+    assert attributes == {'ingestion.rows': 10, 'ingestion.file': 'pagos.csv', 'ingestion.status': 'ok'}
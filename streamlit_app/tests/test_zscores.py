@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_app.utils.feature_engineering import FeatureEngineer
+from streamlit_app.utils.zscores import ZScoreEngine, ZScoreMomentStore
+
+
+def _features(rows=500, seed=2):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'customer_id': [f'C{i}' for i in range(rows)],
+        'segment': rng.choice(list('ABCDEF'), rows),
+        'customer_type': rng.choice(['B2B', 'B2C', 'B2G'], rows),
+        'total_balance': rng.gamma(2, 5000, rows),
+        'utilization': rng.random(rows),
+        'dpd_mean': rng.gamma(1, 20, rows),
+        'payment_ratio': rng.random(rows),
+        'total_revenue': rng.gamma(2, 300, rows),
+    })
+
+
+def test_ungrouped_scores_match_calculate_z_scores():
+    df = _features()
+    scored, moments = ZScoreEngine().fit_score(df)
+    expected = FeatureEngineer().calculate_z_scores(df.copy(), FeatureEngineer.ZSCORE_METRICS)
+    for metric in FeatureEngineer.ZSCORE_METRICS:
+        np.testing.assert_allclose(scored[f'{metric}_zscore'], expected[f'{metric}_zscore'])
+    assert moments.group_by == [] and len(moments.groups) == 0
+
+
+def test_grouped_scores_use_each_groups_moments():
+    df = _features()
+    scored, moments = ZScoreEngine().fit_score(df, ['segment', 'customer_type'])
+    engineer = FeatureEngineer()
+    for _, group in df.groupby(['segment', 'customer_type']):
+        expected = engineer.calculate_z_scores(group.copy(), ['utilization', 'dpd_mean'])
+        for metric in ('utilization', 'dpd_mean'):
+            np.testing.assert_allclose(scored.loc[group.index, f'{metric}_zscore'], expected[f'{metric}_zscore'])
+
+
+def test_frozen_moments_score_new_customers_and_round_trip(tmp_path):
+    df = _features()
+    engine = ZScoreEngine(min_group_size=5)
+    moments = engine.fit(df, 'segment')
+    store = ZScoreMomentStore(str(tmp_path))
+    version = store.save(moments)
+    assert engine.fit(df, 'segment').version == version
+    assert store.versions() == [version]
+
+    loaded = store.load()
+    assert loaded.version == version
+    newcomers = df.head(3).assign(customer_id=['N1', 'N2', 'N3'])
+    newcomers.loc[2, 'segment'] = 'Z'  # Unseen group falls back to the overall moments
+    scored = engine.score(newcomers, loaded)
+    pd.testing.assert_frame_equal(scored.head(2).drop(columns='customer_id'),
+                                  engine.score(df.head(2), moments).drop(columns='customer_id'))
+    overall = moments.overall['total_balance']
+    assert scored.loc[2, 'total_balance_zscore'] == pytest.approx(
+        (newcomers.loc[2, 'total_balance'] - overall['mean']) / overall['std']
+    )
+
+    # Refitting on drifted data is a new version; older ones stay loadable
+    drifted = engine.fit(df.assign(total_balance=df['total_balance'] * 2), 'segment')
+    store.save(drifted)
+    assert store.load().version == drifted.version
+    assert store.load(version).version == version
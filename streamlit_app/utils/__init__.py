@@ -1,13 +1,66 @@
 """Utilities module"""
 
 from .ingestion import DataIngestionEngine
-from .feature_engineering import FeatureEngineer
+from .ingestion_manifest import IngestionManifest
+from .ingestion_checkpoint import IngestionCheckpoint
+from .ingestion_jobs import IngestionJobQueue, IngestionWorker, IngestionTriggerServer
+from .batch_upsert import BatchUpserter
+from .dedup_index import RowFingerprintIndex
+from .normalization import NormalizationEngine, NormalizationPlan, ColumnRole
+from .readers import ReaderBackend, ReaderRegistry
+from .landing_zone import ParquetLandingZone
+from .compaction import FrameCompactor
+from .drive_async import AsyncDriveDownloader
+from .quality_profiler import DataQualityProfiler, QualityProfile, ColumnProfile
+from .sketches import HyperLogLog, TDigest, RunningMoments
+from .tracing import SpanRecorder, OpenTelemetryExporter
+from .schema_registry import SchemaRegistry, SourceSchema, ColumnSpec, ReaderHints
+from .source_classifier import SourceTypeClassifier, SourceMatch
+from .feature_engineering import FeatureEngineer, DPDStatsAccumulator
+from .incremental_features import IncrementalFeatureEngine
+from .parallel_features import ParallelFeatureRunner
+from .zscores import ZScoreEngine, ZScoreMoments, ZScoreMomentStore
 from .kpi_engine import KPIEngine
 from .business_rules import MYPEBusinessRules, RiskLevel, IndustryType, ApprovalDecision
 
-__all__  [
+__all__ = [
     "DataIngestionEngine",
+    "IngestionManifest",
+    "IngestionCheckpoint",
+    "IngestionJobQueue",
+    "IngestionWorker",
+    "IngestionTriggerServer",
+    "BatchUpserter",
+    "RowFingerprintIndex",
+    "NormalizationEngine",
+    "NormalizationPlan",
+    "ColumnRole",
+    "ReaderBackend",
+    "ReaderRegistry",
+    "ParquetLandingZone",
+    "FrameCompactor",
+    "AsyncDriveDownloader",
+    "DataQualityProfiler",
+    "QualityProfile",
+    "ColumnProfile",
+    "HyperLogLog",
+    "TDigest",
+    "RunningMoments",
+    "SpanRecorder",
+    "OpenTelemetryExporter",
+    "SchemaRegistry",
+    "SourceSchema",
+    "ColumnSpec",
+    "ReaderHints",
+    "SourceTypeClassifier",
+    "SourceMatch",
     "FeatureEngineer",
+    "DPDStatsAccumulator",
+    "IncrementalFeatureEngine",
+    "ParallelFeatureRunner",
+    "ZScoreEngine",
+    "ZScoreMoments",
+    "ZScoreMomentStore",
     "KPIEngine",
     "MYPEBusinessRules",
     "RiskLevel",
@@ -0,0 +1,143 @@
+"""
+Batched Supabase Upserts
+Streams DataFrame slices to PostgREST in bounded batches with retries
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+class BatchUpserter:
+    """Upsert large frames in fixed-size batches with bounded in-flight requests"""
+    
+    def __init__(
+        self,
+        supabase_client,
+        batch_size: int = 1000,
+        max_in_flight: int = 2,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        """
+        Args:
+            supabase_client: Client exposing ``table(name).upsert(...).execute()``
+            batch_size: Rows per request (keeps payloads under PostgREST limits)
+            max_in_flight: Concurrent requests; further batches are not
+                materialized until a slot frees up (backpressure)
+            max_retries: Retries per batch after the first attempt
+            retry_backoff: Base delay in seconds, doubled after each failure
+        """
+        self.supabase = supabase_client
+        self.batch_size = max(1, int(batch_size))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+    
+    def iter_slices(self, df: pd.DataFrame) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Yield (offset, slice) pairs without copying the frame"""
+        for offset in range(0, len(df), self.batch_size):
+            yield offset, df.iloc[offset:offset + self.batch_size]
+    
+    def _send(self, table_name: str, batch_number: int, offset: int, chunk: pd.DataFrame,
+              upsert_options: Dict) -> Dict:
+        """Upsert one batch, retrying with exponential backoff"""
+        # JSON-safe records (NaN -> null, timestamps -> ISO strings)
+        payload = chunk.to_json(orient='records', date_format='iso')
+        records = json.loads(payload)
+        result = {
+            'batch': batch_number,
+            'offset': offset,
+            'rows': len(records),
+            'bytes': len(payload),
+            'attempts': 0,
+            'status': 'pending'
+        }
+        
+        for attempt in range(self.max_retries + 1):
+            result['attempts'] = attempt + 1
+            try:
+                self.supabase.table(table_name).upsert(records, **upsert_options).execute()
+                result['status'] = 'success'
+                result.pop('error', None)
+                return result
+            except Exception as e:
+                result['status'] = 'failed'
+                result['error'] = str(e)
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+        
+        return result
+    
+    def upsert(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        on_conflict: Optional[str] = None,
+        returning: str = 'minimal',
+        on_commit: Optional[Callable[[int], None]] = None
+    ) -> Dict:
+        """
+        Upsert ``df`` into ``table_name`` batch by batch
+        
+        Args:
+            on_commit: Called with the number of leading rows of ``df`` that
+                are committed whenever that contiguous prefix grows (batches
+                finish out of order, so a later batch only counts once every
+                earlier one succeeded)
+        
+        Returns:
+            Dict with total/upserted row counts and one entry per batch,
+            ordered by offset
+        """
+        upsert_options = {'returning': returning}
+        if on_conflict:
+            upsert_options['on_conflict'] = on_conflict
+        
+        batches = []
+        pending = set()
+        finished: Dict[int, Dict] = {}
+        committed = 0
+        
+        def collect(done):
+            nonlocal committed
+            for future in done:
+                batch = future.result()
+                batches.append(batch)
+                finished[batch['offset']] = batch
+            advanced = committed
+            while advanced in finished and finished[advanced]['status'] == 'success':
+                advanced += finished[advanced]['rows']
+            if advanced != committed:
+                committed = advanced
+                if on_commit is not None:
+                    on_commit(committed)
+        
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='upsert') as pool:
+            for batch_number, (offset, chunk) in enumerate(self.iter_slices(df)):
+                if len(pending) >= self.max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(
+                    self._send, table_name, batch_number, offset, chunk, upsert_options
+                ))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        
+        batches.sort(key=lambda batch: batch['offset'])
+        rows_upserted = sum(batch['rows'] for batch in batches if batch['status'] == 'success')
+        failed_batches = [batch for batch in batches if batch['status'] != 'success']
+        
+        return {
+            'table': table_name,
+            'total_rows': len(df),
+            'rows_upserted': rows_upserted,
+            'batch_size': self.batch_size,
+            'failed_batches': len(failed_batches),
+            'bytes': sum(batch['bytes'] for batch in batches),
+            'committed_rows': committed,
+            'batches': batches
+        }
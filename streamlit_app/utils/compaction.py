@@ -0,0 +1,135 @@
+"""
+Frame Compaction - memory-lean normalized frames
+Categoricals for repetitive text, lossless numeric downcasts and once-stored constants
+"""
+
+import re
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+class FrameCompactor:
+    """
+    Shrinks normalized frames without changing any value
+    
+    - Constant text columns and the per-frame metadata stamps
+      (workbook_name, refresh_date) become a one-category categorical:
+      the value is stored once plus 1-byte codes.
+    - Text columns whose distinct count is at most ``category_ratio`` of
+      their values become categoricals.
+    - Integers take the narrowest type holding their min/max; floats go
+      to float32 only when every value round-trips exactly.
+    
+    Other dates and identifier columns (``id``, ``*_id``) are never made
+    categorical, even when constant within one file or chunk, so the
+    dtypes landed and replayed do not depend on the file's contents. The
+    metadata stamps are constant by construction and left out of row
+    fingerprints (RowFingerprintIndex.IGNORED_COLUMNS).
+    """
+    
+    CATEGORY_RATIO = 0.5
+    METADATA_COLUMNS = ('workbook_name', 'refresh_date')
+    IDENTIFIER = re.compile(r'(^|_)id$')
+    INTEGER_TYPES = [np.int8, np.int16, np.int32]
+    NULLABLE_INTEGERS = {np.int8: 'Int8', np.int16: 'Int16', np.int32: 'Int32'}
+    
+    def __init__(self, category_ratio: float = CATEGORY_RATIO, downcast_floats: bool = True):
+        """
+        Args:
+            category_ratio: Largest distinct/non-null ratio converted to a
+                categorical
+            downcast_floats: Allow float64 -> float32 when lossless
+        """
+        self.category_ratio = category_ratio
+        self.downcast_floats = downcast_floats
+    
+    @staticmethod
+    def nbytes(df: pd.DataFrame) -> int:
+        """Deep memory footprint, index included"""
+        return int(df.memory_usage(deep=True, index=True).sum())
+    
+    def _narrow_integer(self, series: pd.Series):
+        """Narrowest integer dtype for the column's range, or None"""
+        non_null = series.dropna()
+        if non_null.empty:
+            return None
+        low, high = int(non_null.min()), int(non_null.max())
+        for candidate in self.INTEGER_TYPES:
+            info = np.iinfo(candidate)
+            if info.min <= low and high <= info.max:
+                if np.dtype(candidate).itemsize >= series.dtype.itemsize:
+                    return None
+                if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                    return self.NULLABLE_INTEGERS[candidate]
+                return candidate
+        return None
+    
+    def _compact_series(self, series: pd.Series) -> Tuple[pd.Series, str]:
+        """(compacted series, what was done: 'constant'/'categorical'/'downcast'/'')"""
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+            return series, ''
+        
+        if series.name in self.METADATA_COLUMNS and len(series) > 1 and series.nunique(dropna=False) == 1:
+            return series.astype('category'), 'constant'
+        
+        if pd.api.types.is_integer_dtype(dtype):
+            narrow = self._narrow_integer(series)
+            return (series.astype(narrow), 'downcast') if narrow is not None else (series, '')
+        
+        if pd.api.types.is_float_dtype(dtype):
+            if not self.downcast_floats or dtype != np.float64:
+                return series, ''
+            values = series.to_numpy()
+            narrowed = values.astype(np.float32)
+            with np.errstate(over='ignore', invalid='ignore'):
+                exact = np.array_equal(narrowed.astype(np.float64), values, equal_nan=True)
+            return (pd.Series(narrowed, index=series.index, name=series.name), 'downcast') if exact else (series, '')
+        
+        # Only text becomes categorical: dates and identifiers keep their dtype
+        if dtype != object or self.IDENTIFIER.search(str(series.name)):
+            return series, ''
+        non_null = series.dropna()
+        if non_null.empty or pd.api.types.infer_dtype(non_null, skipna=False) != 'string':
+            return series, ''
+        distinct = non_null.nunique()
+        if distinct == 1 and len(non_null) > 1:
+            return series.astype('category'), 'constant'
+        if distinct <= self.category_ratio * len(non_null):
+            return series.astype('category'), 'categorical'
+        return series, ''
+    
+    def compact(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Compacted copy of ``df`` plus a report
+        
+        Returns:
+            (DataFrame, {'bytes_before', 'bytes_after', 'constant',
+            'categorical', 'downcast'}) - the lists name affected columns
+        """
+        report = {'bytes_before': self.nbytes(df), 'constant': [], 'categorical': [], 'downcast': []}
+        columns = {}
+        for i, column in enumerate(df.columns):
+            series, action = self._compact_series(df.iloc[:, i])
+            if action:
+                report[action].append(column)
+            columns[i] = series
+        # Keyed by position so duplicate column names survive
+        result = pd.DataFrame(columns, index=df.index)
+        result.columns = df.columns
+        report['bytes_after'] = self.nbytes(result)
+        return result, report
+    
+    @staticmethod
+    def merge_reports(left: Dict, right: Dict) -> Dict:
+        """Combine reports of chunks, sheets or files"""
+        if not left:
+            return dict(right)
+        merged = {
+            'bytes_before': left['bytes_before'] + right['bytes_before'],
+            'bytes_after': left['bytes_after'] + right['bytes_after']
+        }
+        for action in ('constant', 'categorical', 'downcast'):
+            merged[action] = list(dict.fromkeys(left.get(action, []) + right.get(action, [])))
+        return merged
@@ -0,0 +1,145 @@
+"""
+Row Fingerprint Index - cross-run deduplication for raw_* staging tables
+Remembers a content hash per business key so rows already upserted unchanged are not sent again
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+class RowFingerprintIndex:
+    """
+    Business-key hash -> row-content hash, one sorted uint64 table per Supabase table
+    
+    A row is dropped only when its key was seen with identical content, so
+    corrected values still reach Supabase (counted as ``changed``).
+    """
+    
+    # Columns rewritten on every run, excluded from the content hash
+    IGNORED_COLUMNS = ['workbook_name', 'refresh_date']
+    
+    def __init__(self, path: str):
+        """Load per-table indexes from the ``path`` directory (missing = empty)"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dirty = set()
+    
+    def _file(self, table_name: str) -> str:
+        return os.path.join(self.path, f'{table_name}.npz')
+    
+    def _load(self, table_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted key hashes and their row hashes (caller holds the lock)"""
+        entry = self._tables.get(table_name)
+        if entry is None:
+            path = self._file(table_name)
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    entry = (data['keys'], data['rows'])
+            else:
+                entry = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64))
+            self._tables[table_name] = entry
+        return entry
+    
+    @staticmethod
+    def _canonical(series: pd.Series) -> pd.Series:
+        """Text as is, every other dtype as strings; categoricals by their values"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Decoded to the categories' dtype, so compaction never changes a hash
+            series = series.astype(series.cat.categories.dtype)
+        return series if series.dtype == object else series.astype(str)
+    
+    @classmethod
+    def _hash(cls, df: pd.DataFrame) -> np.ndarray:
+        """Stable per-row uint64 hash, independent of how a column is stored"""
+        canonical = pd.DataFrame(
+            {i: cls._canonical(series) for i, (_, series) in enumerate(df.items())},
+            index=df.index
+        )
+        return pd.util.hash_pandas_object(canonical, index=False).to_numpy(dtype=np.uint64)
+    
+    @classmethod
+    def fingerprints(cls, df: pd.DataFrame, key_columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(key hashes, content hashes) for every row"""
+        content = [col for col in df.columns if col not in cls.IGNORED_COLUMNS]
+        return cls._hash(df[list(key_columns)]), cls._hash(df[content])
+    
+    def filter(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        key_columns: Sequence[str]
+    ) -> Tuple[pd.DataFrame, Dict, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Drop rows already upserted with identical content
+        
+        Returns:
+            (fresh rows, counters {'cross_run', 'changed'}, pending hashes for
+            ``mark`` once the fresh rows are safely upserted)
+        """
+        key_hashes, row_hashes = self.fingerprints(df, key_columns)
+        with self._lock:
+            keys, rows = self._load(table_name)
+            if len(keys):
+                positions = np.minimum(np.searchsorted(keys, key_hashes), len(keys) - 1)
+                known = keys[positions] == key_hashes
+                unchanged = known & (rows[positions] == row_hashes)
+            else:
+                known = unchanged = np.zeros(len(df), dtype=bool)
+        
+        fresh = ~unchanged
+        counters = {'cross_run': int(unchanged.sum()), 'changed': int((known & fresh).sum())}
+        return df[fresh], counters, (key_hashes[fresh], row_hashes[fresh])
+    
+    def mark(
+        self,
+        table_name: str,
+        pending: Tuple[np.ndarray, np.ndarray],
+        batches: Optional[List[Dict]] = None
+    ):
+        """
+        Remember rows returned by ``filter``
+        
+        With BatchUpserter ``batches``, only rows of successful batches are
+        remembered so failed ones are retried next run.
+        """
+        key_hashes, row_hashes = pending
+        if batches is not None:
+            sent = np.zeros(len(key_hashes), dtype=bool)
+            for batch in batches:
+                if batch['status'] == 'success':
+                    sent[batch['offset']:batch['offset'] + batch['rows']] = True
+            key_hashes, row_hashes = key_hashes[sent], row_hashes[sent]
+        if not len(key_hashes):
+            return
+        
+        with self._lock:
+            keys, rows = self._load(table_name)
+            # Newest content wins for keys seen before
+            merged = pd.Series(
+                np.concatenate([rows, row_hashes]),
+                index=np.concatenate([keys, key_hashes])
+            )
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self._tables[table_name] = (
+                merged.index.to_numpy(dtype=np.uint64),
+                merged.to_numpy(dtype=np.uint64)
+            )
+            self._dirty.add(table_name)
+    
+    def save(self):
+        """Atomically write tables changed since the last save"""
+        with self._lock:
+            dirty = {name: self._tables[name] for name in self._dirty}
+            self._dirty = set()
+        if not dirty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for table_name, (keys, rows) in dirty.items():
+            path = self._file(table_name)
+            tmp_path = f'{path}.tmp.npz'
+            np.savez(tmp_path, keys=keys, rows=rows)
+            os.replace(tmp_path, path)
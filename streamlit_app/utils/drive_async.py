@@ -0,0 +1,275 @@
+"""
+Async Drive Downloads
+Pooled HTTP session with parallel range requests and jittered retries for Drive media
+"""
+
+import asyncio
+import random
+import threading
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from .drive_stream import DEFAULT_CHUNK_BYTES
+
+DRIVE_API_URL = 'https://www.googleapis.com/drive/v3'
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+
+class AsyncDriveDownloader:
+    """
+    Drive media downloads over one keep-alive ``httpx.AsyncClient``
+    
+    The client lives on a private event loop thread, so the synchronous
+    ingestion workers share its connection pool. Files of at least
+    ``range_threshold`` bytes are fetched as ``chunk_bytes`` HTTP ranges,
+    ``parallel_ranges`` at a time, and still yielded in order; smaller files
+    (or files of unknown size) stream over a single request.
+    """
+    
+    # Worth retrying: throttling, server errors and dropped connections
+    RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        credentials=None,
+        base_url: str = DRIVE_API_URL,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        parallel_ranges: int = 4,
+        range_threshold: Optional[int] = None,
+        max_connections: int = 16,
+        max_retries: int = 4,
+        retry_backoff: float = 0.5,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            credentials: google-auth credentials with a Drive read scope
+                (None sends no Authorization header, e.g. for a local server)
+            base_url: Drive v3 API root; point at a fake server in tests
+            chunk_bytes: Size of each range request / streamed read
+            parallel_ranges: Range requests in flight per file (1 disables
+                range parallelism)
+            range_threshold: Smallest file split into ranges (defaults to
+                two chunks)
+            max_connections: Pooled connections shared by every download
+            max_retries: Retries per request after the first attempt
+            retry_backoff: Base delay in seconds; attempt n sleeps a random
+                time up to ``retry_backoff * 2**n`` (full jitter)
+            timeout: Per-request timeout in seconds
+            transport: Custom httpx transport (tests)
+        """
+        self.credentials = credentials
+        self.base_url = base_url.rstrip('/')
+        self.chunk_bytes = max(1, int(chunk_bytes))
+        self.parallel_ranges = max(1, int(parallel_ranges))
+        self.range_threshold = range_threshold if range_threshold is not None else 2 * self.chunk_bytes
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = retry_backoff
+        self._client_options = {
+            'timeout': timeout,
+            'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            'transport': transport
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._auth_lock = threading.Lock()
+    
+    @classmethod
+    def from_service_account_info(cls, info: Dict, **options) -> 'AsyncDriveDownloader':
+        """Downloader authenticated as a service account (GDRIVE_SERVICE_ACCOUNT JSON)"""
+        from google.oauth2 import service_account
+        
+        credentials = service_account.Credentials.from_service_account_info(info, scopes=DRIVE_SCOPES)
+        return cls(credentials, **options)
+    
+    #
+    # Event loop and session
+    #
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='drive-download', daemon=True
+                )
+                self._thread.start()
+            return self._loop
+    
+    def _run(self, coro):
+        """Run ``coro`` on the downloader loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+    
+    def _session(self) -> httpx.AsyncClient:
+        # Only touched from the loop thread
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options)
+        return self._client
+    
+    def close(self):
+        """Close pooled connections and stop the loop thread"""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    
+    def __enter__(self) -> 'AsyncDriveDownloader':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    #
+    # Requests
+    #
+    
+    def _auth_headers(self) -> Dict[str, str]:
+        """Bearer header, refreshing the access token when it expired (blocking)"""
+        if self.credentials is None:
+            return {}
+        with self._auth_lock:
+            if not self.credentials.valid:
+                from google.auth.transport.requests import Request
+                
+                self.credentials.refresh(Request())
+            return {'Authorization': f'Bearer {self.credentials.token}'}
+    
+    async def _headers(self, byte_range: Optional[Tuple[int, Optional[int]]] = None) -> Dict[str, str]:
+        if self.credentials is not None and not self.credentials.valid:
+            headers = await asyncio.get_running_loop().run_in_executor(None, self._auth_headers)
+        else:
+            headers = self._auth_headers()
+        if byte_range is not None:
+            start, end = byte_range
+            headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+        return headers
+    
+    def _media_url(self, file_id: str) -> str:
+        return f'{self.base_url}/files/{file_id}'
+    
+    async def _backoff(self, attempt: int, response: Optional[httpx.Response] = None):
+        delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay)
+    
+    def _retryable(self, error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.RETRY_STATUSES
+        return isinstance(error, httpx.TransportError)
+    
+    async def _get_range(self, file_id: str, start: int, end: int) -> bytes:
+        """Fetch bytes ``start..end`` (inclusive), retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await self._session().get(
+                    self._media_url(file_id),
+                    params={'alt': 'media'},
+                    headers=await self._headers((start, end))
+                )
+                response.raise_for_status()
+                if response.status_code != 206 and len(response.content) != end - start + 1:
+                    raise IOError(f'Drive ignored the Range header for {file_id}')
+                return response.content
+            except httpx.HTTPError as e:
+                if attempt >= self.max_retries or not self._retryable(e):
+                    raise
+                await self._backoff(attempt, response)
+    
+    async def _stream(self, file_id: str) -> AsyncIterator[bytes]:
+        """Single request streamed in chunk_bytes pieces; retries resume after the last byte received"""
+        received = 0
+        attempt = 0
+        while True:
+            response = None
+            try:
+                byte_range = (received, None) if received else None
+                async with self._session().stream(
+                    'GET', self._media_url(file_id),
+                    params={'alt': 'media'},
+                    headers=await self._headers(byte_range)
+                ) as response:
+                    response.raise_for_status()
+                    if received and response.status_code != 206:
+                        raise IOError(f'Drive ignored the Range header for {file_id}')
+                    async for chunk in response.aiter_bytes(self.chunk_bytes):
+                        received += len(chunk)
+                        yield chunk
+                return
+            except httpx.HTTPError as e:
+                if attempt >= self.max_retries or not self._retryable(e):
+                    raise
+                await self._backoff(attempt, response)
+                attempt += 1
+    
+    async def aiter_chunks(self, file_id: str, size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield a file's bytes in order, fetching up to parallel_ranges ranges ahead"""
+        if not size or size < self.range_threshold or self.parallel_ranges == 1:
+            async for chunk in self._stream(file_id):
+                yield chunk
+            return
+        
+        ranges = iter(
+            (start, min(start + self.chunk_bytes, size) - 1)
+            for start in range(0, size, self.chunk_bytes)
+        )
+        in_flight = deque()
+        
+        def schedule():
+            byte_range = next(ranges, None)
+            if byte_range is not None:
+                in_flight.append(asyncio.ensure_future(self._get_range(file_id, *byte_range)))
+        
+        try:
+            for _ in range(self.parallel_ranges):
+                schedule()
+            while in_flight:
+                chunk = await in_flight.popleft()
+                schedule()
+                yield chunk
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    #
+    # Synchronous API for the threaded ingestion engine
+    #
+    
+    def iter_chunks(self, file_id: str, size: Optional[int] = None) -> Iterator[bytes]:
+        """Blocking iterator over ``aiter_chunks`` (callable from any thread)"""
+        chunks = self.aiter_chunks(file_id, size)
+        
+        async def next_chunk():
+            try:
+                return await chunks.__anext__()
+            except StopAsyncIteration:
+                return None
+        
+        try:
+            while True:
+                chunk = self._run(next_chunk())
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self._run(chunks.aclose())
+    
+    def read_range(self, file_id: str, start: int, end: int) -> bytes:
+        """Bytes ``start..end`` (inclusive; fewer when the file is shorter)"""
+        return self._run(self._get_range(file_id, start, end))
+    
+    def download(self, file_id: str, size: Optional[int] = None) -> bytes:
+        """Whole file as bytes"""
+        return b''.join(self.iter_chunks(file_id, size))
@@ -0,0 +1,56 @@
+"""
+Drive Download Streams
+Chunked Google Drive media downloads exposed as iterators and file objects
+"""
+
+import hashlib
+import io
+from typing import Iterator
+
+from googleapiclient.http import MediaIoBaseDownload
+
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+def iter_media_chunks(request, chunksize: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yield the bytes of a ``get_media`` request one download chunk at a time"""
+    buffer = io.BytesIO()
+    downloader = MediaIoBaseDownload(buffer, request, chunksize=chunksize)
+    done = False
+    while not done:
+        status, done = downloader.next_chunk()
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if data:
+            yield data
+
+class DriveDownloadStream(io.RawIOBase):
+    """Read-only file object over downloaded chunks, hashing bytes as they pass"""
+    
+    def __init__(self, chunks: Iterator[bytes]):
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b'')
+        self._hash = hashlib.sha256()
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not len(self._pending):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._hash.update(chunk)
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        self.bytes_read += size
+        return size
+    
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of everything downloaded so far (the whole file once drained)"""
+        return self._hash.hexdigest()
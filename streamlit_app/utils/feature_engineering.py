@@ -1,39 +1,44 @@
 """
 Feature Engineering Module - 28+ Dimensions
 Transforms raw data into ML-ready features for predictive analytics
+"""
 
+import re
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from scipy import stats
 
+from .sketches import RunningMoments, TDigest
+
 class FeatureEngineer:
     """Enterprise-grade feature engineering for financial analytics"""
     
     # Customer type mappings
-    CUSTOMER_TYPES  {
+    CUSTOMER_TYPES = {
         'B2B': ['empresa', 'corporativo', 'business', 'b2b'],
         'B2C': ['persona', 'individual', 'consumer', 'b2c'],
         'B2G': ['gobierno', 'government', 'publico', 'b2g', 'municipal', 'estatal']
     }
     
     # Segmentation criteria (A-F based on performance)
-    SEGMENTATION_THRESHOLDS  {
+    SEGMENTATION_THRESHOLDS = {
         'A': {'dpd_max': 0, 'utilization_min': 0.5, 'payment_ratio_min': 1.0},
         'B': {'dpd_max': 15, 'utilization_min': 0.3, 'payment_ratio_min': 0.9},
         'C': {'dpd_max': 30, 'utilization_min': 0.2, 'payment_ratio_min': 0.75},
         'D': {'dpd_max': 60, 'utilization_min': 0.1, 'payment_ratio_min': 0.5},
         'E': {'dpd_max': 90, 'utilization_min': 0.05, 'payment_ratio_min': 0.25},
         'F': {'dpd_max': float('inf'), 'utilization_min': 0, 'payment_ratio_min': 0}
+    }
     
     # DPD buckets for delinquency analysis
-    DPD_BUCKETS  [0, 1, 15, 30, 45, 60, 90, 120, 180, float('inf')]
-    DPD_LABELS  ['Current', '1-14', '15-29', '30-44', '45-59', '60-89', '90-119', '120-179', '180+']
+    DPD_BUCKETS = [0, 1, 15, 30, 45, 60, 90, 120, 180, float('inf')]
+    DPD_LABELS = ['Current', '1-14', '15-29', '30-44', '45-59', '60-89', '90-119', '120-179', '180+']
     
-    def classify_customer_type(self, customer_name: str, customer_data: Dict) - str:
+    def classify_customer_type(self, customer_name: str, customer_data: Dict) -> str:
         """Classify customer as B2B, B2C, or B2G - Requirement 2"""
-        name_lower  customer_name.lower()
+        name_lower = customer_name.lower()
         
         for customer_type, keywords in self.CUSTOMER_TYPES.items():
             if any(keyword in name_lower for keyword in keywords):
@@ -41,58 +46,515 @@ class FeatureEngineer:
         
         return 'B2C'
     
-    def calculate_segmentation(self, customer_metrics: Dict) - str:
+    def calculate_segmentation(self, customer_metrics: Dict) -> str:
         """Segment customers A-F based on performance - Requirement 2"""
-        dpd  customer_metrics.get('avg_dpd', 0)
-        utilization  customer_metrics.get('utilization', 0)
-        payment_ratio  customer_metrics.get('payment_ratio', 0)
-        
-        for segment, thresholds in self.SEGMENTATION_THRESHOLDS.items():
-            if (dpd  thresholds['dpd_max'] and
-                utilization  thresholds['utilization_min'] and
-                payment_ratio  thresholds['payment_ratio_min']):
-                return segment
-        
-        return 'F'
+        return str(self.calculate_segmentations(
+            [customer_metrics.get('avg_dpd', 0)],
+            [customer_metrics.get('utilization', 0)],
+            [customer_metrics.get('payment_ratio', 0)]
+        )[0])
     
-    def bucket_dpd(self, dpd_value: float) - str:
+    def bucket_dpd(self, dpd_value: float) -> str:
         """Bucket DPD into categories - Requirement 2"""
-        for i, threshold in enumerate(self.DPD_BUCKETS[1:]):
-            if dpd_value  threshold:
-                return self.DPD_LABELS[i]
-        return self.DPD_LABELS[-1]
+        return str(self.bucket_dpd_values([dpd_value])[0])
     
-    def calculate_dpd_statistics(self, dpd_series: pd.Series) - Dict:
+    def _segment_table(self):
+        """
+        SEGMENTATION_THRESHOLDS as ascending searchsorted keys
+        
+        Each criterion only relaxes from A to F, so the first segment a value
+        satisfies is a binary search; minimums are negated to ascend.
+        """
+        thresholds = list(self.SEGMENTATION_THRESHOLDS.values())
+        keys = (
+            np.array([t['dpd_max'] for t in thresholds], dtype=float),
+            -np.array([t['utilization_min'] for t in thresholds], dtype=float),
+            -np.array([t['payment_ratio_min'] for t in thresholds], dtype=float)
+        )
+        if any(np.any(np.diff(key) < 0) for key in keys):
+            raise ValueError('SEGMENTATION_THRESHOLDS must relax monotonically from A to F')
+        # Trailing label catches values no segment accepts (NaN, negative ratios)
+        labels = np.array(list(self.SEGMENTATION_THRESHOLDS) + ['F'], dtype=object)
+        return labels, keys
+    
+    def calculate_segmentations(self, avg_dpd, utilization, payment_ratio) -> np.ndarray:
+        """Vectorized ``calculate_segmentation`` - one searchsorted per criterion"""
+        labels, (dpd_keys, utilization_keys, payment_keys) = self._segment_table()
+        index = np.maximum.reduce([
+            np.searchsorted(dpd_keys, np.asarray(avg_dpd, dtype=float), side='left'),
+            np.searchsorted(utilization_keys, -np.asarray(utilization, dtype=float), side='left'),
+            np.searchsorted(payment_keys, -np.asarray(payment_ratio, dtype=float), side='left')
+        ])
+        return labels[index]
+    
+    def bucket_dpd_values(self, dpd) -> np.ndarray:
+        """
+        Vectorized ``bucket_dpd`` over the DPD_BUCKETS/DPD_LABELS table
+        
+        A value lands in the first bucket whose upper edge exceeds it;
+        NaN and infinity land in the last bucket.
+        """
+        labels = np.array(self.DPD_LABELS, dtype=object)
+        index = np.searchsorted(np.array(self.DPD_BUCKETS[1:], dtype=float), np.asarray(dpd, dtype=float), side='right')
+        return labels[np.minimum(index, len(labels) - 1)]
+    
+    def calculate_dpd_statistics(self, dpd_series: pd.Series) -> Dict:
         """Calculate DPD statistics - Requirement 2"""
         return {
-            'dpd_max': float(dpd_series.max()) if len(dpd_series)  0 else 0,
-            'dpd_mean': float(dpd_series.mean()) if len(dpd_series)  0 else 0,
-            'dpd_median': float(dpd_series.median()) if len(dpd_series)  0 else 0,
-            'dpd_std': float(dpd_series.std()) if len(dpd_series)  0 else 0,
+            'dpd_max': float(dpd_series.max()) if len(dpd_series) > 0 else 0,
+            'dpd_mean': float(dpd_series.mean()) if len(dpd_series) > 0 else 0,
+            'dpd_median': float(dpd_series.median()) if len(dpd_series) > 0 else 0,
+            'dpd_std': float(dpd_series.std()) if len(dpd_series) > 0 else 0,
         }
     
-    def calculate_utilization(self, balance: float, limit: float) - float:
+    def calculate_dpd_statistics_streaming(self, chunks: Iterable) -> Dict:
+        """``calculate_dpd_statistics`` over chunks in bounded memory (approximate median)"""
+        accumulator = DPDStatsAccumulator()
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator.result()
+    
+    def calculate_utilization(self, balance: float, limit: float) -> float:
         """Calculate credit utilization - Requirement 2"""
-        if limit  0 or pd.isna(limit):
+        if limit <= 0 or pd.isna(limit):
             return 0.0
         return min(balance / limit, 1.0)
     
-    def calculate_weighted_apr(self, facilities: List[Dict]) - float:
+    def calculate_weighted_apr(self, facilities: List[Dict]) -> float:
         """Calculate weighted average APR - Requirement 2"""
-        total_balance  sum(f.get('balance', 0) for f in facilities)
-        if total_balance  0:
+        total_balance = sum(f.get('balance', 0) for f in facilities)
+        if total_balance == 0:
+            return 0.0
         
-        weighted_sum  sum(f.get('balance', 0) * f.get('apr', 0) for f in facilities)
+        weighted_sum = sum(f.get('balance', 0) * f.get('apr', 0) for f in facilities)
         return weighted_sum / total_balance
     
-    def calculate_z_scores(self, df: pd.DataFrame, metrics: List[str]) - pd.DataFrame:
+    def calculate_z_scores(self, df: pd.DataFrame, metrics: List[str]) -> pd.DataFrame:
         """Calculate Z-scores - Requirement 2"""
-        for metric in metrics:
+        return self.apply_z_scores(df, self.zscore_moments(df, metrics))
+    
+    def zscore_moments(self, df: pd.DataFrame, metrics: List[str]) -> Dict[str, Tuple[float, float]]:
+        """Reference (mean, sample std) per metric present in ``df``"""
+        return {metric: (df[metric].mean(), df[metric].std()) for metric in metrics if metric in df.columns}
+    
+    def apply_z_scores(self, df: pd.DataFrame, moments: Dict[str, Tuple[float, float]]) -> pd.DataFrame:
+        """Add ``<metric>_zscore`` columns against fixed moments (0 when std is not positive)"""
+        for metric, (mean, std) in moments.items():
             if metric in df.columns:
-                mean  df[metric].mean()
-                std  df[metric].std()
-                if std  0:
-                    df[f'{metric}_zscore']  (df[metric] - mean) / std
+                if std > 0:
+                    df[f'{metric}_zscore'] = (df[metric] - mean) / std
                 else:
-                    df[f'{metric}_zscore']  0
+                    df[f'{metric}_zscore'] = 0
         return df
+    
+    # ------------------------------------------------------------------
+    # Batch API - one vectorized pass over the raw tables
+    # ------------------------------------------------------------------
+    
+    # ml_feature_snapshots columns, in schema order
+    SNAPSHOT_COLUMNS = [
+        'customer_id', 'name', 'customer_type', 'is_b2g', 'segment',
+        'total_balance', 'avg_balance', 'max_balance',
+        'total_limit', 'num_facilities', 'utilization',
+        'total_payments', 'avg_payment', 'num_payments', 'payment_ratio',
+        'dpd_max', 'dpd_mean', 'dpd_median', 'dpd_std', 'dpd_bucket', 'is_delinquent',
+        'total_revenue', 'avg_revenue',
+        'total_collected', 'collection_rate',
+        'channel', 'acquisition_date', 'customer_age_months',
+        'industry_code',
+        'total_balance_zscore', 'utilization_zscore', 'dpd_mean_zscore',
+        'payment_ratio_zscore', 'total_revenue_zscore',
+        'ltv', 'churn_risk_score', 'default_risk_score', 'activity_score', 'profitability_score',
+        'feature_snapshot_date'
+    ]
+    ZSCORE_METRICS = ['total_balance', 'utilization', 'dpd_mean', 'payment_ratio', 'total_revenue']
+    
+    # raw_* columns read per frame, keyed like the build_feature_snapshots arguments
+    RAW_COLUMNS = {
+        'portfolios': ['customer_id', 'balance'],
+        'payments': ['customer_id', 'amount', 'payment_date'],
+        'facilities': ['customer_id', 'limit_amount'],
+        'risk_events': ['customer_id', 'dpd', 'risk_severity'],
+        'revenue': ['customer_id', 'revenue'],
+        'collections': ['customer_id', 'collected_amount'],
+        'marketing': ['customer_id', 'channel', 'acquisition_date', 'acquisition_cost'],
+        'customers': ['customer_id', 'name', 'industry_code'],
+        'industry': ['customer_id', 'industry_code']
+    }
+    
+    # Per-customer aggregates the snapshot columns are derived from
+    AGGREGATE_COLUMNS = [
+        'customer_id', 'name', 'industry_code',
+        'balance_sum', 'balance_count', 'balance_max', 'limit_sum', 'num_facilities',
+        'payment_sum', 'payment_count', 'num_payments', 'last_payment', 'recent_payments',
+        'dpd_max', 'dpd_mean', 'dpd_median', 'dpd_std', 'severity_mean',
+        'revenue_sum', 'revenue_count', 'collected_sum',
+        'channel', 'acquisition_date', 'acquisition_cost'
+    ]
+    
+    # Derived score horizons
+    CHURN_MONTHS = 6  # Months without payments at which churn risk saturates
+    ACTIVITY_PAYMENTS = 12  # Payments in ACTIVITY_WINDOW for full activity
+    ACTIVITY_WINDOW = timedelta(days=365)
+    DEFAULT_DPD = 180  # NPL threshold - DPD at which default risk saturates
+    DAYS_PER_MONTH = 30.4375
+    
+    def classify_customer_types(self, names: pd.Series) -> pd.Series:
+        """Vectorized ``classify_customer_type`` - first keyword match in CUSTOMER_TYPES order"""
+        codes, uniques = pd.factorize(names)
+        lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+        conditions = [
+            lowered.str.contains('|'.join(re.escape(k) for k in keywords), regex=True).to_numpy(dtype=bool)
+            for keywords in self.CUSTOMER_TYPES.values()
+        ]
+        types = np.append(np.select(conditions, list(self.CUSTOMER_TYPES), default='B2C'), 'B2C')
+        # Missing names (code -1) pick the trailing default
+        return pd.Series(types[codes], index=names.index, dtype=object)
+    
+    def calculate_utilizations(self, balance: pd.Series, limit: pd.Series) -> pd.Series:
+        """Vectorized ``calculate_utilization``"""
+        balance_values, limit_values = balance.to_numpy(dtype=float), limit.to_numpy(dtype=float)
+        usable = limit_values > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.minimum(balance_values / np.where(usable, limit_values, 1.0), 1.0)
+        return pd.Series(np.where(usable, ratio, 0.0), index=balance.index)
+    
+    @staticmethod
+    def _as_of(as_of: Optional[datetime]) -> pd.Timestamp:
+        return pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now().normalize()
+    
+    @staticmethod
+    def _frame(df: Optional[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+        """``df`` restricted to ``columns``, missing ones filled with NaN"""
+        if df is None:
+            return pd.DataFrame(columns=columns)
+        return df.reindex(columns=columns)
+    
+    @staticmethod
+    def _customer_codes(frames: List[pd.DataFrame]):
+        """
+        Factorize customer_id across all frames in one hash pass
+        
+        Returns:
+            (Index of customer ids, [per-frame row codes]) - code -1 marks
+            rows without a customer_id
+        """
+        keys = []
+        for frame in frames:
+            ids = frame['customer_id']
+            if ids.dtype != object:
+                ids = ids.astype(str).where(ids.notna())
+            keys.append(ids.to_numpy(dtype=object))
+        codes, uniques = pd.factorize(np.concatenate(keys))
+        bounds = np.cumsum([len(key) for key in keys])[:-1]
+        return pd.Index(uniques, name='customer_id'), np.split(codes, bounds)
+    
+    @staticmethod
+    def _numbers(values: pd.Series) -> np.ndarray:
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+    
+    @staticmethod
+    def _sum_count(codes: np.ndarray, values: np.ndarray, size: int):
+        """Per-customer (sum, count) of non-null values via bincount"""
+        present = (codes >= 0) & ~np.isnan(values)
+        total = np.bincount(codes[present], weights=values[present], minlength=size).astype(float)
+        return total, np.bincount(codes[present], minlength=size)
+    
+    @staticmethod
+    def _group(codes: np.ndarray, values: np.ndarray, size: int, how: str) -> np.ndarray:
+        """Per-customer ``how`` aggregation (NaN where the customer has no values)"""
+        present = codes >= 0
+        grouped = pd.Series(values[present]).groupby(codes[present]).agg(how)
+        return grouped.reindex(range(size)).to_numpy()
+    
+    @staticmethod
+    def _first(codes: np.ndarray, values: pd.Series, size: int) -> pd.Series:
+        """First non-null value per customer in row order, dtype preserved"""
+        present = (codes >= 0) & values.notna().to_numpy()
+        customers, first = np.unique(codes[present], return_index=True)
+        picked = values[present].iloc[first]
+        return pd.Series(picked.to_numpy(), index=customers, dtype=picked.dtype).reindex(range(size))
+    
+    @staticmethod
+    def _ratio(numerator, denominator, empty: float) -> np.ndarray:
+        """numerator / denominator capped at 1, ``empty`` where denominator <= 0"""
+        numerator, denominator = np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+        usable = denominator > 0
+        return np.where(usable, np.minimum(numerator / np.where(usable, denominator, 1.0), 1.0), empty)
+    
+    def aggregate_customers(
+        self,
+        portfolios: Optional[pd.DataFrame] = None,
+        payments: Optional[pd.DataFrame] = None,
+        facilities: Optional[pd.DataFrame] = None,
+        risk_events: Optional[pd.DataFrame] = None,
+        revenue: Optional[pd.DataFrame] = None,
+        collections: Optional[pd.DataFrame] = None,
+        marketing: Optional[pd.DataFrame] = None,
+        customers: Optional[pd.DataFrame] = None,
+        industry: Optional[pd.DataFrame] = None,
+        as_of: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Per-customer aggregates of the raw_* frames (AGGREGATE_COLUMNS)
+        
+        customer_id is factorized once and every aggregate is a bincount or
+        an integer-keyed groupby. DPD statistics follow
+        calculate_dpd_statistics (0 without events, NaN std for one event).
+        """
+        as_of = self._as_of(as_of)
+        
+        portfolios = self._frame(portfolios, self.RAW_COLUMNS['portfolios'])
+        payments = self._frame(payments, self.RAW_COLUMNS['payments'])
+        facilities = self._frame(facilities, self.RAW_COLUMNS['facilities'])
+        risk_events = self._frame(risk_events, self.RAW_COLUMNS['risk_events'])
+        revenue = self._frame(revenue, self.RAW_COLUMNS['revenue'])
+        collections = self._frame(collections, self.RAW_COLUMNS['collections'])
+        marketing = self._frame(marketing, self.RAW_COLUMNS['marketing'])
+        customers = self._frame(customers, self.RAW_COLUMNS['customers'])
+        industry = self._frame(industry, self.RAW_COLUMNS['industry'])
+        
+        ids, codes = self._customer_codes([
+            portfolios, payments, facilities, risk_events, revenue, collections, marketing, customers, industry
+        ])
+        (portfolio_codes, payment_codes, facility_codes, risk_codes, revenue_codes,
+         collection_codes, marketing_codes, customer_codes, industry_codes) = codes
+        size = len(ids)
+        aggregates = {'customer_id': ids.to_numpy()}
+        
+        # Balances and facilities
+        balances = self._numbers(portfolios['balance'])
+        aggregates['balance_sum'], aggregates['balance_count'] = self._sum_count(portfolio_codes, balances, size)
+        aggregates['balance_max'] = self._group(portfolio_codes, balances, size, 'max')
+        aggregates['limit_sum'], _ = self._sum_count(facility_codes, self._numbers(facilities['limit_amount']), size)
+        aggregates['num_facilities'] = np.bincount(facility_codes[facility_codes >= 0], minlength=size)
+        
+        # Payments
+        aggregates['payment_sum'], aggregates['payment_count'] = self._sum_count(
+            payment_codes, self._numbers(payments['amount']), size
+        )
+        aggregates['num_payments'] = np.bincount(payment_codes[payment_codes >= 0], minlength=size)
+        payment_dates = pd.to_datetime(payments['payment_date'], errors='coerce')
+        aggregates['last_payment'] = pd.to_datetime(self._group(payment_codes, payment_dates.to_numpy(), size, 'max'))
+        recent = payment_codes[(payment_codes >= 0) & (payment_dates > as_of - self.ACTIVITY_WINDOW).to_numpy()]
+        aggregates['recent_payments'] = np.bincount(recent, minlength=size)
+        
+        # DPD statistics
+        dpd = self._numbers(risk_events['dpd'])
+        present = risk_codes >= 0
+        dpd_stats = pd.Series(dpd[present]).groupby(risk_codes[present]).agg(['max', 'mean', 'median', 'std'])
+        dpd_stats = dpd_stats.reindex(range(size))
+        events = np.bincount(risk_codes[present], minlength=size)
+        for stat in ('max', 'mean', 'median', 'std'):
+            values = dpd_stats[stat].to_numpy(dtype=float)
+            # Single-event customers keep pandas' NaN sample std, as the scalar helper does
+            aggregates[f'dpd_{stat}'] = np.where(events > 0, values, 0.0) if stat == 'std' else np.nan_to_num(values)
+        aggregates['severity_mean'] = self._group(risk_codes, self._numbers(risk_events['risk_severity']), size, 'mean')
+        
+        # Revenue and collections
+        aggregates['revenue_sum'], aggregates['revenue_count'] = self._sum_count(
+            revenue_codes, self._numbers(revenue['revenue']), size
+        )
+        aggregates['collected_sum'], _ = self._sum_count(
+            collection_codes, self._numbers(collections['collected_amount']), size
+        )
+        
+        # Marketing - the earliest acquisition wins
+        acquired = pd.to_datetime(marketing['acquisition_date'], errors='coerce')
+        order = np.argsort(acquired.to_numpy(), kind='stable')
+        marketing = marketing.iloc[order].assign(acquisition_date=acquired.iloc[order])
+        marketing_codes = marketing_codes[order]
+        aggregates['channel'] = self._first(marketing_codes, marketing['channel'], size).to_numpy()
+        aggregates['acquisition_date'] = self._first(marketing_codes, marketing['acquisition_date'], size).to_numpy()
+        aggregates['acquisition_cost'] = self._first(
+            marketing_codes, pd.Series(self._numbers(marketing['acquisition_cost'])), size
+        ).to_numpy()
+        
+        # Identity - customers.industry_code wins, raw_industry fills the gaps
+        aggregates['name'] = self._first(customer_codes, customers['name'], size).to_numpy()
+        aggregates['industry_code'] = self._first(customer_codes, customers['industry_code'], size).fillna(
+            self._first(industry_codes, industry['industry_code'], size)
+        ).to_numpy()
+        
+        return pd.DataFrame(aggregates)[self.AGGREGATE_COLUMNS]
+    
+    def snapshots_from_aggregates(
+        self,
+        aggregates: pd.DataFrame,
+        as_of: Optional[datetime] = None,
+        moments: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> pd.DataFrame:
+        """
+        ml_feature_snapshots rows from AGGREGATE_COLUMNS
+        
+        Derived metrics:
+            payment_ratio: total_payments / total_balance, capped at 1
+            collection_rate: total_collected / total_balance, capped at 1
+                (1 when nothing is outstanding)
+            ltv: total_revenue - acquisition_cost
+            churn_risk_score: months since the last payment / CHURN_MONTHS
+                (1 without payments)
+            default_risk_score: max(dpd_max / DEFAULT_DPD, mean risk_severity)
+            activity_score: payments in ACTIVITY_WINDOW / ACTIVITY_PAYMENTS
+            profitability_score: ltv / total_balance (0 without balance)
+            Scores are clipped to [0, 1].
+        
+        Args:
+            moments: Reference (mean, std) per ZSCORE_METRICS; computed over
+                ``aggregates`` when omitted
+        """
+        as_of = self._as_of(as_of)
+        features = self.zscore_metrics(aggregates)
+        features['customer_id'] = aggregates['customer_id'].to_numpy()
+        
+        def column(name):
+            return aggregates[name].to_numpy()
+        
+        balance = features['total_balance'].to_numpy()
+        features['avg_balance'] = balance / np.maximum(column('balance_count'), 1)
+        features['max_balance'] = np.nan_to_num(column('balance_max').astype(float))
+        features['total_limit'] = column('limit_sum')
+        features['num_facilities'] = column('num_facilities')
+        
+        features['total_payments'] = column('payment_sum')
+        features['avg_payment'] = column('payment_sum') / np.maximum(column('payment_count'), 1)
+        features['num_payments'] = column('num_payments')
+        
+        for stat in ('max', 'median', 'std'):
+            features[f'dpd_{stat}'] = column(f'dpd_{stat}')
+        features['dpd_bucket'] = self.bucket_dpd_values(features['dpd_max'])
+        features['is_delinquent'] = (features['dpd_bucket'] != self.DPD_LABELS[0]).astype(int)
+        
+        features['avg_revenue'] = column('revenue_sum') / np.maximum(column('revenue_count'), 1)
+        features['total_collected'] = column('collected_sum')
+        features['collection_rate'] = self._ratio(features['total_collected'], balance, 1.0)
+        
+        features['channel'] = column('channel')
+        acquisition_date = pd.to_datetime(aggregates['acquisition_date'])
+        features['acquisition_date'] = acquisition_date.to_numpy()
+        features['customer_age_months'] = ((as_of - acquisition_date).dt.days / self.DAYS_PER_MONTH).to_numpy()
+        
+        features['name'] = column('name')
+        features['customer_type'] = self.classify_customer_types(aggregates['name']).to_numpy()
+        features['is_b2g'] = (features['customer_type'] == 'B2G').astype(int)
+        features['segment'] = self.calculate_segmentations(
+            features['dpd_mean'], features['utilization'], features['payment_ratio']
+        )
+        features['industry_code'] = column('industry_code')
+        
+        # Derived scores
+        features['ltv'] = features['total_revenue'] - np.nan_to_num(column('acquisition_cost').astype(float))
+        last_payment = pd.to_datetime(aggregates['last_payment'])
+        months_idle = (as_of - last_payment).dt.days.to_numpy() / self.DAYS_PER_MONTH
+        features['churn_risk_score'] = np.clip(np.nan_to_num(months_idle / self.CHURN_MONTHS, nan=1.0), 0, 1)
+        severity = np.nan_to_num(column('severity_mean').astype(float))
+        features['default_risk_score'] = np.clip(np.maximum(features['dpd_max'] / self.DEFAULT_DPD, severity), 0, 1)
+        features['activity_score'] = np.clip(column('recent_payments') / self.ACTIVITY_PAYMENTS, 0, 1)
+        outstanding = balance > 0
+        features['profitability_score'] = np.where(
+            outstanding, features['ltv'] / np.where(outstanding, balance, 1.0), 0.0
+        )
+        features['feature_snapshot_date'] = as_of
+        
+        if moments is None:
+            moments = self.zscore_moments(features, self.ZSCORE_METRICS)
+        return self.apply_z_scores(features, moments)[self.SNAPSHOT_COLUMNS]
+    
+    def zscore_metrics(self, aggregates: pd.DataFrame) -> pd.DataFrame:
+        """The ZSCORE_METRICS columns derived from AGGREGATE_COLUMNS"""
+        balance = aggregates['balance_sum'].to_numpy(dtype=float)
+        payments = aggregates['payment_sum'].to_numpy(dtype=float)
+        return pd.DataFrame({
+            'total_balance': balance,
+            'utilization': self.calculate_utilizations(
+                aggregates['balance_sum'], aggregates['limit_sum']
+            ).to_numpy(),
+            'dpd_mean': aggregates['dpd_mean'].to_numpy(dtype=float),
+            'payment_ratio': self._ratio(payments, balance, 0.0),
+            'total_revenue': aggregates['revenue_sum'].to_numpy(dtype=float)
+        }, index=aggregates.index)
+    
+    def build_feature_snapshots(
+        self,
+        portfolios: Optional[pd.DataFrame] = None,
+        payments: Optional[pd.DataFrame] = None,
+        facilities: Optional[pd.DataFrame] = None,
+        risk_events: Optional[pd.DataFrame] = None,
+        revenue: Optional[pd.DataFrame] = None,
+        collections: Optional[pd.DataFrame] = None,
+        marketing: Optional[pd.DataFrame] = None,
+        customers: Optional[pd.DataFrame] = None,
+        industry: Optional[pd.DataFrame] = None,
+        as_of: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Build ml_feature_snapshots rows for every customer in one pass
+        
+        Frames use the raw_* table columns; 1M customers take seconds.
+        Per-row values equal the scalar helpers: segment uses dpd_mean as
+        avg_dpd, dpd_bucket uses dpd_max. See ``snapshots_from_aggregates``
+        for the derived metrics.
+        
+        Returns:
+            DataFrame with SNAPSHOT_COLUMNS, one row per customer_id
+        """
+        as_of = self._as_of(as_of)
+        aggregates = self.aggregate_customers(
+            portfolios, payments, facilities, risk_events, revenue,
+            collections, marketing, customers, industry, as_of=as_of
+        )
+        return self.snapshots_from_aggregates(aggregates, as_of)
+
+class DPDStatsAccumulator:
+    """
+    Streaming counterpart of ``FeatureEngineer.calculate_dpd_statistics``
+    
+    Welford moments give max, mean and sample std; a t-digest gives the
+    median, exact until a few dozen distinct values and within the digest's
+    error beyond. Accumulators from different workers merge, also through
+    ``to_dict``/``from_dict``.
+    """
+    
+    def __init__(self, compression: float = 200):
+        self.rows = 0
+        self.moments = RunningMoments()
+        self.digest = TDigest(compression)
+    
+    def update(self, chunk):
+        """Add a Series, array or DataFrame with a ``dpd`` column"""
+        if isinstance(chunk, pd.DataFrame):
+            chunk = chunk['dpd']
+        values = pd.to_numeric(pd.Series(chunk), errors='coerce').to_numpy(dtype=float)
+        self.rows += len(values)
+        self.moments.update(values)
+        self.digest.update(values)
+    
+    def merge(self, other: 'DPDStatsAccumulator') -> 'DPDStatsAccumulator':
+        self.rows += other.rows
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        return self
+    
+    def result(self) -> Dict:
+        """Same keys and empty/one-value conventions as calculate_dpd_statistics"""
+        if not self.rows:
+            return {'dpd_max': 0, 'dpd_mean': 0, 'dpd_median': 0, 'dpd_std': 0}
+        if not self.moments.count:
+            return {'dpd_max': np.nan, 'dpd_mean': np.nan, 'dpd_median': np.nan, 'dpd_std': np.nan}
+        return {
+            'dpd_max': float(self.moments.max),
+            'dpd_mean': float(self.moments.mean),
+            'dpd_median': float(self.digest.quantile(0.5)),
+            'dpd_std': float(self.moments.std())
+        }
+    
+    def to_dict(self) -> Dict:
+        return {'rows': self.rows, 'moments': self.moments.to_dict(), 'digest': self.digest.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, payload: Dict) -> 'DPDStatsAccumulator':
+        accumulator = cls(payload['digest'].get('compression', 200))
+        accumulator.rows = int(payload.get('rows', 0))
+        accumulator.moments = RunningMoments.from_dict(payload['moments'])
+        accumulator.digest = TDigest.from_dict(payload['digest'])
+        return accumulator
@@ -0,0 +1,364 @@
+"""
+Incremental Feature Snapshots - ml_feature_snapshots from change deltas
+Mergeable per-customer aggregates so only customers touched by new rows are recomputed
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import FeatureEngineer
+from .sketches import TDigest
+
+class IncrementalFeatureEngine:
+    """
+    Per-customer sums, counts, sums of squares, extremes and a DPD t-digest
+    
+    ``apply`` folds newly ingested raw_* rows into the state and returns
+    snapshot rows for the customers those rows touch; nothing else is
+    rescanned. Rows are treated as append-only: a corrected row that
+    replaces an earlier one needs ``rebuild``.
+    
+    Z-scores of touched customers use moments over the whole state.
+    Time-based columns (customer_age_months, churn and activity scores) of
+    untouched customers age until they are touched again or ``snapshots``
+    is re-emitted for everyone.
+    """
+    
+    ADDITIVE = [
+        'balance_sum', 'balance_count', 'limit_sum', 'num_facilities',
+        'payment_sum', 'payment_count', 'num_payments',
+        'dpd_count', 'dpd_sum', 'dpd_sumsq', 'severity_sum', 'severity_count',
+        'revenue_sum', 'revenue_count', 'collected_sum'
+    ]
+    MAXIMA = ['balance_max', 'last_payment', 'dpd_max']
+    MINIMA = ['dpd_min', 'acquisition_date']
+    FIRSTS = ['name', 'customer_industry', 'industry_fallback']
+    # Marketing fields follow the earliest acquisition_date
+    EARLIEST = ['channel', 'acquisition_cost']
+    STATE_DTYPES = {
+        **{column: 'float64' for column in ADDITIVE + ['balance_max', 'dpd_max', 'dpd_min', 'dpd_median',
+                                                       'acquisition_cost']},
+        'last_payment': 'datetime64[ns]',
+        'acquisition_date': 'datetime64[ns]',
+        **{column: 'object' for column in FIRSTS + ['channel']}
+    }
+    
+    def __init__(self, engineer: Optional[FeatureEngineer] = None, compression: float = 200):
+        """
+        Args:
+            engineer: Supplies thresholds and the snapshot derivation
+            compression: t-digest compression for per-customer DPD medians
+        """
+        self.engineer = engineer or FeatureEngineer()
+        self.compression = compression
+        # Below this many events a digest keeps every value, so the median is exact
+        self.exact_digest_size = int(compression // 4)
+        self.reset()
+    
+    def reset(self):
+        self.state = self._empty_state()
+        self.centroids = pd.DataFrame({
+            'customer_id': pd.Series(dtype=object),
+            'mean': pd.Series(dtype='float64'),
+            'weight': pd.Series(dtype='float64')
+        })
+        self.recent_payments = pd.DataFrame({
+            'customer_id': pd.Series(dtype=object),
+            'payment_date': pd.Series(dtype='datetime64[ns]')
+        })
+    
+    def _empty_state(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in self.STATE_DTYPES.items()},
+            index=pd.Index([], dtype=object, name='customer_id')
+        )
+    
+    # ------------------------------------------------------------------
+    # Delta aggregation
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _keyed(df: Optional[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+        """``columns`` of ``df`` with a string customer_id, rows without one dropped"""
+        if df is None or df.empty:
+            return pd.DataFrame(columns=['customer_id'] + columns)
+        df = df.reindex(columns=['customer_id'] + columns)
+        df = df[df['customer_id'].notna()]
+        if df['customer_id'].dtype != object:
+            df = df.assign(customer_id=df['customer_id'].astype(str))
+        return df
+    
+    @staticmethod
+    def _numbers(df: pd.DataFrame, column: str) -> pd.Series:
+        return pd.to_numeric(df[column], errors='coerce').astype(float)
+    
+    def _delta_aggregates(self, frames: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+        """Per-customer partial aggregates of the new rows, STATE_DTYPES columns"""
+        engineer = self.engineer
+        portfolios = engineer._frame(frames.get('portfolios'), ['customer_id', 'balance'])
+        payments = engineer._frame(frames.get('payments'), ['customer_id', 'amount', 'payment_date'])
+        facilities = engineer._frame(frames.get('facilities'), ['customer_id', 'limit_amount'])
+        risk_events = engineer._frame(frames.get('risk_events'), ['customer_id', 'dpd', 'risk_severity'])
+        revenue = engineer._frame(frames.get('revenue'), ['customer_id', 'revenue'])
+        collections = engineer._frame(frames.get('collections'), ['customer_id', 'collected_amount'])
+        marketing = engineer._frame(frames.get('marketing'),
+                                    ['customer_id', 'channel', 'acquisition_date', 'acquisition_cost'])
+        customers = engineer._frame(frames.get('customers'), ['customer_id', 'name', 'industry_code'])
+        industry = engineer._frame(frames.get('industry'), ['customer_id', 'industry_code'])
+        
+        # Same factorize-once layout as FeatureEngineer.aggregate_customers
+        ids, codes = engineer._customer_codes([
+            portfolios, payments, facilities, risk_events, revenue, collections, marketing, customers, industry
+        ])
+        (portfolio_codes, payment_codes, facility_codes, risk_codes, revenue_codes,
+         collection_codes, marketing_codes, customer_codes, industry_codes) = codes
+        size = len(ids)
+        delta = {}
+        
+        balances = engineer._numbers(portfolios['balance'])
+        delta['balance_sum'], delta['balance_count'] = engineer._sum_count(portfolio_codes, balances, size)
+        delta['balance_max'] = engineer._group(portfolio_codes, balances, size, 'max')
+        delta['limit_sum'], _ = engineer._sum_count(facility_codes, engineer._numbers(facilities['limit_amount']), size)
+        delta['num_facilities'] = np.bincount(facility_codes[facility_codes >= 0], minlength=size)
+        
+        delta['payment_sum'], delta['payment_count'] = engineer._sum_count(
+            payment_codes, engineer._numbers(payments['amount']), size
+        )
+        delta['num_payments'] = np.bincount(payment_codes[payment_codes >= 0], minlength=size)
+        payment_dates = pd.to_datetime(payments['payment_date'], errors='coerce').to_numpy()
+        delta['last_payment'] = pd.to_datetime(engineer._group(payment_codes, payment_dates, size, 'max'))
+        
+        dpd = engineer._numbers(risk_events['dpd'])
+        delta['dpd_sum'], delta['dpd_count'] = engineer._sum_count(risk_codes, dpd, size)
+        delta['dpd_sumsq'], _ = engineer._sum_count(risk_codes, dpd * dpd, size)
+        delta['dpd_max'] = engineer._group(risk_codes, dpd, size, 'max')
+        delta['dpd_min'] = engineer._group(risk_codes, dpd, size, 'min')
+        delta['severity_sum'], delta['severity_count'] = engineer._sum_count(
+            risk_codes, engineer._numbers(risk_events['risk_severity']), size
+        )
+        
+        delta['revenue_sum'], delta['revenue_count'] = engineer._sum_count(
+            revenue_codes, engineer._numbers(revenue['revenue']), size
+        )
+        delta['collected_sum'], _ = engineer._sum_count(
+            collection_codes, engineer._numbers(collections['collected_amount']), size
+        )
+        
+        # First non-null value per field in acquisition_date order, as the batch path
+        acquired = pd.to_datetime(marketing['acquisition_date'], errors='coerce')
+        order = np.argsort(acquired.to_numpy(), kind='stable')
+        marketing_codes = marketing_codes[order]
+        delta['channel'] = engineer._first(marketing_codes, marketing['channel'].iloc[order], size)
+        delta['acquisition_date'] = engineer._first(marketing_codes, acquired.iloc[order], size)
+        delta['acquisition_cost'] = engineer._first(
+            marketing_codes, pd.Series(engineer._numbers(marketing['acquisition_cost'])).iloc[order], size
+        )
+        
+        delta['name'] = engineer._first(customer_codes, customers['name'], size)
+        delta['customer_industry'] = engineer._first(customer_codes, customers['industry_code'], size)
+        delta['industry_fallback'] = engineer._first(industry_codes, industry['industry_code'], size)
+        
+        delta = {column: np.asarray(values) for column, values in delta.items()}
+        return pd.DataFrame(delta, index=ids).reindex(columns=list(self.STATE_DTYPES)).astype(self.STATE_DTYPES)
+    
+    # ------------------------------------------------------------------
+    # Merging
+    # ------------------------------------------------------------------
+    
+    def _combine(self, old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """State rows for ``new.index`` after folding ``new`` into ``old`` (aligned)"""
+        merged = pd.DataFrame(index=new.index)
+        for column in self.ADDITIVE:
+            merged[column] = old[column].fillna(0) + new[column]
+        for column in self.MAXIMA:
+            merged[column] = pd.concat([old[column], new[column]], axis=1).max(axis=1)
+        for column in self.MINIMA:
+            merged[column] = pd.concat([old[column], new[column]], axis=1).min(axis=1)
+        for column in self.FIRSTS:
+            merged[column] = old[column].combine_first(new[column])
+        earlier = new['acquisition_date'] < old['acquisition_date']
+        for column in self.EARLIEST:
+            merged[column] = old[column].combine_first(new[column]).mask(earlier & new[column].notna(), new[column])
+        merged['dpd_median'] = old['dpd_median']
+        return merged.reindex(columns=list(self.STATE_DTYPES)).astype(self.STATE_DTYPES)
+    
+    def _merge(self, delta: pd.DataFrame):
+        known = delta.index.isin(self.state.index)
+        existing, fresh = delta.index[known], delta.index[~known]
+        if len(existing):
+            self.state.loc[existing] = self._combine(self.state.loc[existing], delta.loc[existing])
+        if len(fresh):
+            # Folding into an empty row is the identity
+            fresh_rows = delta.loc[fresh] if len(existing) else delta
+            self.state = pd.concat([self.state, fresh_rows]) if len(self.state) else fresh_rows
+    
+    def _update_digests(self, risk_events: Optional[pd.DataFrame]):
+        """Fold new DPD values into per-customer t-digests and refresh dpd_median"""
+        risk = self._keyed(risk_events, ['dpd'])
+        values = pd.DataFrame({'customer_id': risk['customer_id'], 'mean': self._numbers(risk, 'dpd')}).dropna()
+        if values.empty:
+            return
+        
+        touched = self.centroids['customer_id'].isin(values['customer_id'].unique())
+        existing = self.centroids[touched]
+        self.centroids = self.centroids[~touched]
+        combined = pd.concat([existing, values.assign(weight=1.0)], ignore_index=True)
+        is_new = np.arange(len(combined)) >= len(existing)
+        codes, customers = pd.factorize(combined['customer_id'])
+        means = combined['mean'].to_numpy()
+        
+        # Small customers keep every value as a unit centroid - exactly what the digest would hold
+        exact = (self.state.loc[customers, 'dpd_count'].to_numpy() <= self.exact_digest_size)[codes]
+        order = np.lexsort((means, codes))
+        order = order[exact[order]]
+        medians = pd.Series(means[order]).groupby(codes[order]).median()
+        medians.index = customers[medians.index]
+        centroids = [combined.iloc[order][['customer_id', 'mean', 'weight']]]
+        
+        for code, rows in pd.Series(np.flatnonzero(~exact)).groupby(codes[~exact]):
+            customer_id = customers[code]
+            rows = rows.to_numpy()
+            old, new = rows[~is_new[rows]], rows[is_new[rows]]
+            digest = TDigest(self.compression)
+            if len(old):
+                digest.means, digest.weights = means[old], combined['weight'].to_numpy()[old]
+                digest.min, digest.max = self.state.at[customer_id, 'dpd_min'], self.state.at[customer_id, 'dpd_max']
+            digest.update(means[new])
+            medians[customer_id] = digest.quantile(0.5)
+            centroids.append(pd.DataFrame({'customer_id': customer_id, 'mean': digest.means, 'weight': digest.weights}))
+        
+        self.centroids = pd.concat([self.centroids] + centroids, ignore_index=True)
+        self.state.loc[medians.index, 'dpd_median'] = medians.to_numpy()
+    
+    def _update_recent_payments(self, payments: Optional[pd.DataFrame], as_of: pd.Timestamp):
+        """Keep payment dates inside ACTIVITY_WINDOW for activity_score"""
+        payments = self._keyed(payments, ['payment_date'])
+        new = pd.DataFrame({
+            'customer_id': payments['customer_id'],
+            'payment_date': pd.to_datetime(payments['payment_date'], errors='coerce').astype('datetime64[ns]')
+        })
+        recent = pd.concat([self.recent_payments, new], ignore_index=True)
+        self.recent_payments = recent[recent['payment_date'] > as_of - self.engineer.ACTIVITY_WINDOW]
+    
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    
+    def _dpd_mean(self, state: pd.DataFrame) -> pd.Series:
+        return (state['dpd_sum'] / state['dpd_count']).where(state['dpd_count'] > 0, 0.0)
+    
+    def aggregates(self, customer_ids: Optional[pd.Index] = None, as_of: Optional[datetime] = None) -> pd.DataFrame:
+        """FeatureEngineer.AGGREGATE_COLUMNS for ``customer_ids`` (all customers when omitted)"""
+        as_of = self.engineer._as_of(as_of)
+        state = self.state if customer_ids is None else self.state.loc[customer_ids]
+        count = state['dpd_count']
+        variance = (state['dpd_sumsq'] - state['dpd_sum'] ** 2 / count.where(count > 0)) / (count - 1).where(count > 1)
+        window = self.recent_payments['payment_date'] > as_of - self.engineer.ACTIVITY_WINDOW
+        if customer_ids is not None:
+            window &= self.recent_payments['customer_id'].isin(customer_ids)
+        recent = self.recent_payments.loc[window, 'customer_id'].value_counts().reindex(state.index, fill_value=0)
+        
+        aggregates = pd.DataFrame({
+            'customer_id': state.index.to_numpy(),
+            'name': state['name'].to_numpy(),
+            'industry_code': state['customer_industry'].combine_first(state['industry_fallback']).to_numpy(),
+            'balance_sum': state['balance_sum'].to_numpy(),
+            'balance_count': state['balance_count'].astype(int).to_numpy(),
+            'balance_max': state['balance_max'].to_numpy(),
+            'limit_sum': state['limit_sum'].to_numpy(),
+            'num_facilities': state['num_facilities'].astype(int).to_numpy(),
+            'payment_sum': state['payment_sum'].to_numpy(),
+            'payment_count': state['payment_count'].astype(int).to_numpy(),
+            'num_payments': state['num_payments'].astype(int).to_numpy(),
+            'last_payment': state['last_payment'].to_numpy(),
+            'recent_payments': recent.to_numpy(),
+            'dpd_max': state['dpd_max'].fillna(0).to_numpy(),
+            'dpd_mean': self._dpd_mean(state).to_numpy(),
+            'dpd_median': state['dpd_median'].fillna(0).to_numpy(),
+            # Sample std: NaN for a single event and 0 without events, as calculate_dpd_statistics
+            'dpd_std': np.sqrt(variance.clip(lower=0)).where(count != 0, 0.0).to_numpy(),
+            'severity_mean': (state['severity_sum'] / state['severity_count'].where(state['severity_count'] > 0)).to_numpy(),
+            'revenue_sum': state['revenue_sum'].to_numpy(),
+            'revenue_count': state['revenue_count'].astype(int).to_numpy(),
+            'collected_sum': state['collected_sum'].to_numpy(),
+            'channel': state['channel'].to_numpy(),
+            'acquisition_date': state['acquisition_date'].to_numpy(),
+            'acquisition_cost': state['acquisition_cost'].to_numpy()
+        })
+        return aggregates[self.engineer.AGGREGATE_COLUMNS]
+    
+    def moments(self) -> Dict:
+        """Z-score reference moments over every customer in the state"""
+        metrics = self.engineer.zscore_metrics(pd.DataFrame({
+            'balance_sum': self.state['balance_sum'],
+            'limit_sum': self.state['limit_sum'],
+            'dpd_mean': self._dpd_mean(self.state),
+            'payment_sum': self.state['payment_sum'],
+            'revenue_sum': self.state['revenue_sum']
+        }))
+        return self.engineer.zscore_moments(metrics, self.engineer.ZSCORE_METRICS)
+    
+    def snapshots(self, customer_ids: Optional[pd.Index] = None, as_of: Optional[datetime] = None) -> pd.DataFrame:
+        """ml_feature_snapshots rows from the state alone, no raw data needed"""
+        as_of = self.engineer._as_of(as_of)
+        return self.engineer.snapshots_from_aggregates(self.aggregates(customer_ids, as_of), as_of, self.moments())
+    
+    def apply(self, as_of: Optional[datetime] = None, **frames: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Fold new raw rows into the state
+        
+        Args:
+            as_of: Snapshot date of the delta
+            **frames: New rows per raw table, keyed like
+                FeatureEngineer.build_feature_snapshots (portfolios,
+                payments, risk_events, ...)
+        
+        Returns:
+            Snapshot rows of the customers present in ``frames``
+        """
+        as_of = self.engineer._as_of(as_of)
+        delta = self._delta_aggregates(frames)
+        self._merge(delta)
+        self._update_digests(frames.get('risk_events'))
+        self._update_recent_payments(frames.get('payments'), as_of)
+        return self.snapshots(delta.index, as_of)
+    
+    def rebuild(self, as_of: Optional[datetime] = None, **frames: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Reset and rebuild the state from full raw tables; returns every snapshot row"""
+        self.reset()
+        return self.apply(as_of, **frames)
+    
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    
+    STATE_FILES = {'state': 'customers.parquet', 'centroids': 'dpd_centroids.parquet',
+                   'recent_payments': 'recent_payments.parquet'}
+    
+    def save(self, path: str):
+        """Write the state as Parquet files under the ``path`` directory"""
+        os.makedirs(path, exist_ok=True)
+        for attribute, file_name in self.STATE_FILES.items():
+            frame = getattr(self, attribute)
+            if attribute == 'state':
+                frame = frame.reset_index()
+            target = os.path.join(path, file_name)
+            frame.to_parquet(target + '.tmp', index=False)
+            os.replace(target + '.tmp', target)
+    
+    @classmethod
+    def load(cls, path: str, engineer: Optional[FeatureEngineer] = None, compression: float = 200) -> 'IncrementalFeatureEngine':
+        """Engine restored from ``save`` (empty when ``path`` holds no state)"""
+        engine = cls(engineer, compression)
+        if not os.path.exists(os.path.join(path, cls.STATE_FILES['state'])):
+            return engine
+        for attribute, file_name in cls.STATE_FILES.items():
+            frame = pd.read_parquet(os.path.join(path, file_name))
+            if attribute == 'state':
+                frame = frame.set_index('customer_id').astype(cls.STATE_DTYPES)
+            setattr(engine, attribute, frame)
+        return engine
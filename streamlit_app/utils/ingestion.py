@@ -1,178 +1,337 @@
 """
 Data Ingestion Module - Google Drive to Supabase
 Handles 9+ source types with robust normalization and validation
+"""
 
 import pandas as pd
 import numpy as np
-import re
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import io
+import json
 import warnings
 warnings.filterwarnings('ignore')
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 from supabase import create_client
 
+from .batch_upsert import BatchUpserter
+from .compaction import FrameCompactor
+from .dedup_index import RowFingerprintIndex
+from .drive_async import AsyncDriveDownloader
+from .drive_stream import DEFAULT_CHUNK_BYTES, DriveDownloadStream, iter_media_chunks
+from .ingestion_checkpoint import IngestionCheckpoint
+from .ingestion_manifest import IngestionManifest
+from .landing_zone import ParquetLandingZone
+from .normalization import NormalizationEngine
+from .quality_profiler import DataQualityProfiler, QualityProfile
+from .readers import ReaderRegistry
+from .tracing import SpanExporter, SpanRecorder
+from .schema_registry import DEFAULT_SCHEMAS, SchemaRegistry, normalize_column_name, sniff_csv_header
+from .source_classifier import SourceMatch, SourceTypeClassifier
+
 class DataIngestionEngine:
     """Enterprise-grade data ingestion with normalization and validation"""
     
-    # Required columns for each source type
-    REQUIRED_COLUMNS  {
-        'portfolio': ['customer_id', 'balance', 'date'],
-        'facility': ['facility_id', 'customer_id', 'limit'],
-        'customer': ['customer_id', 'name'],
-        'payment': ['payment_id', 'customer_id', 'amount', 'date'],
-        'risk': ['customer_id', 'dpd', 'date'],
-        'revenue': ['customer_id', 'revenue', 'date'],
-        'collections': ['customer_id', 'collected_amount', 'date'],
-        'marketing': ['customer_id', 'channel', 'acquisition_date'],
-        'industry': ['customer_id', 'industry_code']
+    # Required columns for each source type (typed contracts live in schema_registry)
+    REQUIRED_COLUMNS = {source_type: list(schema.required) for source_type, schema in DEFAULT_SCHEMAS.items()}
+    
+    # Columns whose nulls are penalized in the quality score
+    CRITICAL_COLUMNS = ['customer_id', 'balance', 'amount', 'date']
+    
+    # Upsert conflict targets: the unique indexes of
+    # supabase/migrations/20251115000001_raw_business_keys.sql (and
+    # raw_customers.customer_id). PostgREST rejects an on_conflict without
+    # one, so tables not listed are upserted on their id only.
+    CONFLICT_KEYS = {
+        'raw_portfolios': ['customer_id', 'date'],
+        'raw_facilities': ['facility_id'],
+        'raw_customers': ['customer_id'],
+        'raw_payments': ['payment_id'],
+        'raw_risk_events': ['customer_id', 'date', 'event_type'],
+        'raw_revenue': ['customer_id', 'date', 'revenue_type'],
+        'raw_collections': ['customer_id', 'date'],
+        'raw_marketing': ['customer_id', 'acquisition_date'],
+        'raw_industry': ['customer_id']
     }
     
-    def __init__(self, supabase_url: str, supabase_key: str, gdrive_credentials: Dict):
-        """Initialize clients"""
-        self.supabase  create_client(supabase_url, supabase_key)
+    def __init__(self, supabase_url: str, supabase_key: str, gdrive_credentials: Dict, **options):
+        """
+        Initialize clients
+        
+        Args:
+            **options: Pipeline settings, see ``_configure``
+        """
+        self.supabase = create_client(supabase_url, supabase_key)
         
-        credentials  service_account.Credentials.from_service_account_info(
+        credentials = service_account.Credentials.from_service_account_info(
             gdrive_credentials,
-            scopes['https://www.googleapis.com/auth/drive.readonly']
+            scopes=['https://www.googleapis.com/auth/drive.readonly']
         )
-        self.drive  build('drive', 'v3', credentialscredentials)
+        self.drive = build('drive', 'v3', credentials=credentials)
+        # googleapiclient services are not thread-safe, so worker threads build their own
+        self._drive_factory = lambda: build('drive', 'v3', credentials=credentials, cache_discovery=False)
+        self._configure(**options)
+    
+    @classmethod
+    def from_clients(cls, supabase_client, drive_client, **options) -> 'DataIngestionEngine':
+        """Build an engine around already-initialized Supabase and Drive clients"""
+        engine = cls.__new__(cls)
+        engine.supabase = supabase_client
+        engine.drive = drive_client
+        engine._drive_factory = lambda: drive_client
+        engine._configure(**options)
+        return engine
+    
+    def _configure(
+        self,
+        max_workers: int = 1,
+        parse_workers: Optional[int] = None,
+        manifest_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        batch_size: int = 1000,
+        max_in_flight: int = 2,
+        upsert_retries: int = 3,
+        stream_csv: bool = False,
+        csv_chunk_rows: int = 50_000,
+        download_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        drive_downloader: Optional[AsyncDriveDownloader] = None,
+        reader_preferences: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        landing_zone_path: Optional[str] = None,
+        schemas: Optional[SchemaRegistry] = None,
+        prune_columns: bool = False,
+        sniff_source_headers: bool = True,
+        preflight_bytes: int = 65536,
+        dedup_index_path: Optional[str] = None,
+        span_exporter: Optional[SpanExporter] = None,
+        log_table: Optional[str] = 'ingestion_logs',
+        quality_workers: int = 1,
+        sheet_workers: int = 1,
+        compact_frames: bool = True,
+        conflict_keys: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Apply pipeline settings
         
-    def normalize_columns(self, df: pd.DataFrame) - pd.DataFrame:
+        Args:
+            max_workers: Files processed concurrently (1 = sequential)
+            parse_workers: Files parsed/normalized at the same time; defaults
+                to min(max_workers, CPU count) so CPU work stays bounded while
+                downloads and upserts overlap
+            manifest_path: JSON manifest enabling incremental runs; files whose
+                modifiedTime, size or content hash are unchanged are skipped
+            checkpoint_path: JSON file recording the committed row offset of
+                files whose upsert failed partway; reruns resume from there
+            batch_size: Rows per Supabase upsert request
+            max_in_flight: Concurrent upsert requests per file
+            upsert_retries: Retries for a failed batch before the file fails
+            stream_csv: Parse CSV files chunk by chunk while they download,
+                normalizing and upserting each chunk as it arrives
+            csv_chunk_rows: Rows per parsed CSV chunk in streaming mode
+            download_chunk_bytes: Drive media download chunk size
+            drive_downloader: Fetches file bytes instead of googleapiclient's
+                serial MediaIoBaseDownload, e.g.
+                ``AsyncDriveDownloader.from_service_account_info(...)`` for a
+                pooled session with parallel range requests
+            reader_preferences: Parser engine order per source type, e.g.
+                ``{'payment': {'csv': ['pandas']}}`` (see ReaderRegistry)
+            landing_zone_path: Root of the local Parquet landing zone; every
+                normalized frame is written there before it is upserted
+            schemas: Typed column contracts per source type; readers get
+                dtype/parse_dates hints from them (defaults to SchemaRegistry())
+            prune_columns: Only parse columns declared in the source schema
+            sniff_source_headers: Settle ambiguous or unrecognized filenames
+                from the file's header against each schema's required columns
+            preflight_bytes: Bytes range-requested to check a CSV header
+                against the required columns before the full download
+                (0 disables; files no larger are just downloaded)
+            dedup_index_path: Directory of the row fingerprint index; rows
+                whose business key was already upserted with identical
+                content in an earlier run are not sent again
+            span_exporter: Receives every stage span as it finishes, e.g.
+                ``OpenTelemetryExporter()``
+            log_table: Table receiving one row per ingest_from_drive run, with
+                file results and spans in ``details`` (None disables)
+            quality_workers: Columns profiled concurrently for the quality score
+            sheet_workers: Worker processes parsing the sheets of a
+                multi-sheet workbook (1 = parse in the calling thread)
+            compact_frames: Shrink normalized frames (text categoricals, lossless
+                downcasts) before they are landed and upserted
+            conflict_keys: Upsert conflict columns per table, overriding
+                CONFLICT_KEYS, e.g. ``{'raw_payments': ['payment_id']}``; each
+                needs a matching unique index
+        """
+        self.max_workers = max(1, int(max_workers))
+        if parse_workers is None:
+            parse_workers = min(self.max_workers, os.cpu_count() or 1)
+        self.parse_workers = max(1, int(parse_workers))
+        self._parse_slots = threading.BoundedSemaphore(self.parse_workers)
+        self._thread_local = threading.local()
+        self.manifest = IngestionManifest(manifest_path) if manifest_path else None
+        self.checkpoint = IngestionCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.normalizer = NormalizationEngine()
+        self.stream_csv = stream_csv
+        self.csv_chunk_rows = max(1, int(csv_chunk_rows))
+        self.download_chunk_bytes = int(download_chunk_bytes)
+        self.drive_downloader = drive_downloader
+        self.readers = ReaderRegistry(reader_preferences)
+        self.landing_zone = ParquetLandingZone(landing_zone_path) if landing_zone_path else None
+        self.schemas = schemas or SchemaRegistry()
+        self.prune_columns = prune_columns
+        self.classifier = SourceTypeClassifier(required_columns=self.schemas.required_columns())
+        self.sniff_source_headers = sniff_source_headers
+        self.preflight_bytes = max(0, int(preflight_bytes))
+        self.dedup_index = RowFingerprintIndex(dedup_index_path) if dedup_index_path else None
+        self.tracer = SpanRecorder(span_exporter)
+        self.profiler = DataQualityProfiler(quality_workers)
+        self.sheet_workers = max(1, int(sheet_workers))
+        self.compactor = FrameCompactor() if compact_frames else None
+        self.log_table = log_table
+        self.conflict_keys = dict(self.CONFLICT_KEYS)
+        self.conflict_keys.update({table: list(keys) for table, keys in (conflict_keys or {}).items()})
+        self.upserter = BatchUpserter(
+            self.supabase,
+            batch_size=batch_size,
+            max_in_flight=max_in_flight,
+            max_retries=upsert_retries
+        )
+    
+    def normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Normalize column names to lowercase with underscores
         Requirement 1: lowercase/underscore column names
-        df.columns  [
-            re.sub(r'[^a-z0-9_]', '_', col.lower().strip().replace(' ', '_'))
-            for col in df.columns
-        ]
-        # Remove duplicate underscores
-        df.columns  [re.sub(r'_+', '_', col).strip('_') for col in df.columns]
+        """
+        df.columns = [normalize_column_name(col) for col in df.columns]
         return df
     
-    def convert_numeric_tolerant(self, series: pd.Series) - pd.Series:
+    def convert_numeric_tolerant(self, series: pd.Series) -> pd.Series:
+        """
         Tolerant numeric conversion - removes currency symbols, commas
         Requirement 1: tolerant numeric conversion
-        if series.dtype  'object':
-            # Remove currency symbols and formatting
-            series  series.astype(str).str.replace(r'[\$,₡,€,%]', '', regexTrue)
-            series  series.str.replace(',', '', regexTrue)
-            series  series.str.strip()
-            # Convert to numeric, coerce errors to NaN
-            series  pd.to_numeric(series, errors'coerce')
-        return series
-    
-    def standardize_dates(self, df: pd.DataFrame) - pd.DataFrame:
+        """
+        return NormalizationEngine.clean_numeric(series)
+    
+    def standardize_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
         Standardize date columns to datetime
         Requirement 1: date standardization
-        date_columns  [col for col in df.columns if 'date' in col or 'fecha' in col]
+        """
+        date_columns = [col for col in df.columns if 'date' in col or 'fecha' in col]
         for col in date_columns:
-            df[col]  pd.to_datetime(df[col], errors'coerce')
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
     
-    def normalize_dataframe(self, df: pd.DataFrame, source_name: str) - pd.DataFrame:
+    def normalize_dataframe(
+        self,
+        df: pd.DataFrame,
+        source_name: str,
+        source_type: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """
         Complete normalization pipeline
         Requirement 1: robust handling with deduplication and state saving
+        """
         # Step 1: Normalize column names
-        df  self.normalize_columns(df)
+        df = self.normalize_columns(df)
         
-        # Step 2: Convert numeric columns
-        for col in df.columns:
-            if col not in ['workbook_name', 'refresh_date'] and 'id' not in col and 'name' not in col:
-                df[col]  self.convert_numeric_tolerant(df[col])
+        # Steps 2-3: Numeric conversion and date standardization via the
+        # cached per-schema plan (column roles are inferred once from a sample)
+        df = self.normalizer.normalize(df, source_type)
         
-        # Step 3: Standardize dates
-        df  self.standardize_dates(df)
+        # Declared categoricals and integers take their compact dtypes
+        schema = self.schemas.get(source_type)
+        if schema is not None:
+            df = schema.reader_hints(df.columns).apply(df)
         
         # Step 4: Add metadata
-        df['workbook_name']  source_name
-        df['refresh_date']  datetime.now()
+        df['workbook_name'] = source_name
+        df['refresh_date'] = datetime.now()
         
         # Step 5: Deduplication
-        initial_rows  len(df)
-        df  df.drop_duplicates()
-        duplicates_removed  initial_rows - len(df)
+        initial_rows = len(df)
+        df = df.drop_duplicates()
+        duplicates_removed = initial_rows - len(df)
         
         return df, duplicates_removed
     
-    def validate_required_columns(self, df: pd.DataFrame, source_type: str) - Tuple[bool, List[str]]:
+    def validate_required_columns(self, df: pd.DataFrame, source_type: str) -> Tuple[bool, List[str]]:
+        """
         Validate that required columns are present
         Requirement 1: skip if core missing with alert
-        if source_type not in self.REQUIRED_COLUMNS:
+        """
+        schema = self.schemas.get(source_type)
+        if schema is None:
             return True, []  # Unknown source type, allow
         
-        required  self.REQUIRED_COLUMNS[source_type]
-        missing  [col for col in required if col not in df.columns]
+        required = schema.required
+        missing = [col for col in required if col not in df.columns]
         
-        return len(missing)  0, missing
+        return len(missing) == 0, missing
     
-    def calculate_data_quality_score(self, df: pd.DataFrame) - Dict:
+    def calculate_data_quality_score(self, df: pd.DataFrame) -> Dict:
+        """
         Calculate data quality metrics
         Requirement 8: Data Quality Audit with score %, nulls, zero-rows
-        total_cells  df.shape[0] * df.shape[1]
-        null_cells  df.isnull().sum().sum()
-        null_percentage  (null_cells / total_cells * 100) if total_cells  0 else 0
-        
-        # Zero rows check (rows with all zeros)
-        numeric_cols  df.select_dtypes(include[np.number]).columns
-        if len(numeric_cols)  0:
-            zero_rows  (df[numeric_cols]  0).all(axis1).sum()
-        else:
-            zero_rows  0
+        """
+        return self._quality_from_profile(self._quality_profile(df))
+    
+    def _quality_profile(self, df: pd.DataFrame) -> QualityProfile:
+        """One scan per column; profiles of chunks merge, so streamed input is scored incrementally"""
+        return self.profiler.profile(df)
+    
+    @staticmethod
+    def _merge_quality_profiles(left: Optional[QualityProfile], right: QualityProfile) -> QualityProfile:
+        """Combine profiles from two chunks of the same file"""
+        return right if left is None else left.merge(right)
+    
+    def _quality_from_profile(self, profile: QualityProfile) -> Dict:
+        """Derive the quality score (and per-column statistics) from a profile"""
+        total_rows = profile.rows
+        total_cells = total_rows * profile.total_columns
+        null_cells = profile.null_cells
+        null_percentage = (null_cells / total_cells * 100) if total_cells > 0 else 0
         
         # Completeness score (100% - null%)
-        completeness_score  100 - null_percentage
-        
-        # Critical column penalty
-        critical_cols  ['customer_id', 'balance', 'amount', 'date']
-        critical_nulls  0
-        for col in critical_cols:
-            if col in df.columns:
-                critical_nulls + df[col].isnull().sum()
+        completeness_score = 100 - null_percentage
         
         # Penalize critical nulls heavily
-        critical_penalty  (critical_nulls / len(df) * 50) if len(df)  0 else 0
+        critical_nulls = profile.nulls_in(self.CRITICAL_COLUMNS)
+        critical_penalty = (critical_nulls / total_rows * 50) if total_rows > 0 else 0
         
-        final_score  max(0, completeness_score - critical_penalty)
+        final_score = max(0, completeness_score - critical_penalty)
         
         return {
-            'total_rows': len(df),
-            'total_columns': len(df.columns),
+            'total_rows': total_rows,
+            'total_columns': profile.total_columns,
             'null_cells': int(null_cells),
             'null_percentage': round(null_percentage, 2),
-            'zero_rows': int(zero_rows),
+            'zero_rows': int(profile.zero_rows),
             'completeness_score': round(completeness_score, 2),
             'critical_penalty': round(critical_penalty, 2),
-            'final_quality_score': round(final_score, 2)
+            'final_quality_score': round(final_score, 2),
+            'columns': self.profiler.column_report(profile)
         }
     
-    def detect_source_type(self, filename: str) - Optional[str]:
-        """Detect source type from filename"""
-        filename_lower  filename.lower()
-        
-        type_keywords  {
-            'portfolio': ['portfolio', 'portafolio', 'cartera', 'balances'],
-            'facility': ['facility', 'facilities', 'linea', 'credito', 'limite'],
-            'customer': ['customer', 'cliente', 'clients'],
-            'payment': ['payment', 'pago', 'pagos', 'cobro'],
-            'risk': ['risk', 'riesgo', 'dpd', 'mora'],
-            'revenue': ['revenue', 'ingreso', 'ingresos'],
-            'collections': ['collection', 'cobranza', 'recuperacion'],
-            'marketing': ['marketing', 'adquisicion', 'canal'],
-            'industry': ['industry', 'industria', 'sector']
-        
-        for source_type, keywords in type_keywords.items():
-            if any(keyword in filename_lower for keyword in keywords):
-                return source_type
-        
-        return None
+    def detect_source_type(self, filename: str) -> Optional[str]:
+        """Detect source type from filename (see SourceTypeClassifier)"""
+        return self.classifier.classify(filename).source_type
+    
+    def _needs_header(self, match: SourceMatch) -> bool:
+        return self.sniff_source_headers and self.classifier.is_ambiguous(match)
+    
+    def _classify_by_header(self, file_info: Dict, header: List[str], file_result: Dict) -> Optional[str]:
+        """Re-classify an ambiguous file from its header columns"""
+        match = self.classifier.classify(file_info['name'], file_info['id'], header=header)
+        file_result['source'] = match.to_dict()
+        return match.source_type
     
-    def get_table_name(self, source_type: str) - str:
+    def get_table_name(self, source_type: str) -> str:
         """Map source type to Supabase table name"""
-        table_map  {
+        table_map = {
             'portfolio': 'raw_portfolios',
             'facility': 'raw_facilities',
             'customer': 'raw_customers',
@@ -182,119 +341,965 @@ class DataIngestionEngine:
             'collections': 'raw_collections',
             'marketing': 'raw_marketing',
             'industry': 'raw_industry'
+        }
         return table_map.get(source_type, 'raw_unknown')
     
-    def ingest_from_drive(self, folder_id: str) - Dict:
+    def _get_drive(self):
+        """Drive service for the calling thread (shared client when sequential)"""
+        if self.max_workers == 1:
+            return self.drive
+        drive = getattr(self._thread_local, 'drive', None)
+        if drive is None:
+            drive = self._drive_factory()
+            self._thread_local.drive = drive
+        return drive
+    
+    def _iter_download_chunks(self, file_id: str, size: Optional[int] = None) -> Iterator[bytes]:
+        """Stream a Drive file's bytes in order (``size`` enables range-parallel downloads)"""
+        if self.drive_downloader is not None:
+            return self.drive_downloader.iter_chunks(file_id, size)
+        request = self._get_drive().files().get_media(fileId=file_id)
+        return iter_media_chunks(request, chunksize=self.download_chunk_bytes)
+    
+    @staticmethod
+    def _file_size(file_info: Dict) -> Optional[int]:
+        """Byte size from the Drive listing (a string; absent for native Google files)"""
+        size = file_info.get('size')
+        return int(size) if size else None
+    
+    def _download_file(self, file_id: str, size: Optional[int] = None) -> io.BytesIO:
+        """Download a Drive file into memory"""
+        fh = io.BytesIO()
+        for chunk in self._iter_download_chunks(file_id, size):
+            fh.write(chunk)
+        fh.seek(0)
+        return fh
+    
+    def _fetch_head(self, file_id: str, nbytes: int) -> bytes:
+        """First ``nbytes`` of a Drive file through an HTTP range request"""
+        if self.drive_downloader is not None:
+            return self.drive_downloader.read_range(file_id, 0, nbytes - 1)
+        request = self._get_drive().files().get_media(fileId=file_id)
+        request.headers['Range'] = f'bytes=0-{nbytes - 1}'
+        return request.execute()
+    
+    def _open_stream(self, file_id: str, size: Optional[int] = None) -> DriveDownloadStream:
+        """Download a Drive file lazily, as a readable (and hashing) stream"""
+        return DriveDownloadStream(self._iter_download_chunks(file_id, size))
+    
+    def _conflict_target(self, table_name: str, columns, file_result: Dict) -> Optional[str]:
+        """
+        ``on_conflict`` of an upsert into ``table_name``
+        
+        The table's conflict keys when the frame has all of them; otherwise
+        ``id`` if present, with any missing keys recorded in
+        ``file_result['conflict_keys_missing']``.
+        """
+        keys = self.conflict_keys.get(table_name, [])
+        missing = [key for key in keys if key not in columns]
+        if keys and not missing:
+            return ','.join(keys)
+        if missing:
+            file_result['conflict_keys_missing'] = missing
+        return 'id' if 'id' in columns else None
+    
+    @staticmethod
+    def _landing_metadata(file_info: Dict, table_name: str, on_conflict: Optional[str]) -> Dict:
+        """What a landing-zone replay needs to upsert a frame again"""
+        return {
+            'table': table_name,
+            'on_conflict': on_conflict,
+            'file_id': file_info.get('id'),
+            'modified_time': file_info.get('modifiedTime')
+        }
+    
+    def _span(self, name: str, file_result: Dict, merge: bool = False, **fields):
+        """Time a stage of one file into ``file_result['spans']``"""
+        spans = file_result.setdefault('spans', [])
+        return self.tracer.span(name, spans, merge=merge, file=file_result['filename'], **fields)
+    
+    def _log_run(self, report: Dict):
+        """Store the run summary, file results and spans in the ingestion log table"""
+        if self.log_table is None:
+            return
+        details = {
+            'files': report['details'],
+            'spans': report['spans'],
+            'skipped_unchanged': report['skipped_unchanged'],
+            'cancelled': report['cancelled'],
+            'dedup': report['dedup'],
+            'preflight': report['preflight'],
+            'compaction': report['compaction']
+        }
+        row = {
+            'total_files': report['total_files'],
+            'successful': report['successful'],
+            'failed': report['failed'],
+            'skipped': report['skipped'],
+            # Round-trip through json so numpy scalars and timestamps are JSONB-safe
+            'details': json.loads(json.dumps(details, default=str)),
+            'quality_scores': json.loads(json.dumps(report['quality_scores'], default=str)),
+            'error_message': report.get('error')
+        }
+        try:
+            self.supabase.table(self.log_table).insert(row).execute()
+        except Exception as e:
+            report['log_error'] = str(e)
+    
+    def _drop_seen_rows(
+        self,
+        df: pd.DataFrame,
+        source_type: Optional[str],
+        table_name: str,
+        counters: Dict
+    ) -> Tuple[pd.DataFrame, Optional[Tuple]]:
+        """
+        Filter rows through the fingerprint index, adding to ``counters``
+        
+        Returns:
+            (rows to upsert, pending fingerprints to mark after the upsert or
+            None when cross-run dedup does not apply)
+        """
+        schema = self.schemas.get(source_type)
+        if self.dedup_index is None or schema is None:
+            return df, None
+        key_columns = schema.key_columns(df.columns)
+        if not key_columns:
+            return df, None
+        
+        df, seen, pending = self.dedup_index.filter(table_name, df, key_columns)
+        counters['cross_run'] += seen['cross_run']
+        counters['changed'] += seen['changed']
+        return df, pending
+    
+    def _record_schema_violations(self, df: pd.DataFrame, source_type: Optional[str], file_result: Dict):
+        """Add non-nullable nulls and out-of-domain values to the file result (summed over chunks)"""
+        schema = self.schemas.get(source_type)
+        if schema is None:
+            return
+        for kind, columns in schema.violations(df).items():
+            totals = file_result.setdefault('schema_violations', {}).setdefault(kind, {})
+            for column, count in columns.items():
+                totals[column] = totals.get(column, 0) + count
+    
+    def _preflight(self, file_info: Dict, match: SourceMatch, file_result: Dict) -> Tuple[SourceMatch, bool]:
+        """
+        Validate a CSV header from the file's first bytes, before downloading the rest
+        
+        Returns:
+            (match, rejected) - an ambiguous match may be settled by the header
+        """
+        size = self._file_size(file_info)
+        if not self.preflight_bytes or (size is not None and size <= self.preflight_bytes):
+            return match, False
+        
+        with self._span('preflight', file_result) as span:
+            head = self._fetch_head(file_info['id'], self.preflight_bytes)
+            span['bytes'] = len(head)
+            preflight = file_result['preflight'] = {
+                'status': 'inconclusive',
+                'bytes_fetched': len(head),
+                'bytes_saved': 0,
+                'rows_saved_estimate': 0
+            }
+            if b'\n' not in head:
+                # Header longer than the probe; validate after the download
+                return match, False
+            
+            header = sniff_csv_header(head)
+            if self._needs_header(match):
+                match = self.classifier.classify(file_info['name'], file_info['id'], header=header)
+                file_result['source'] = match.to_dict()
+            columns = self.normalize_columns(pd.DataFrame(columns=header))
+            is_valid, missing_cols = self.validate_required_columns(columns, match.source_type)
+        
+        if is_valid:
+            preflight['status'] = 'passed'
+            return match, False
+        
+        preflight['status'] = 'rejected'
+        if size is not None:
+            preflight['bytes_saved'] = size - len(head)
+            complete_lines = head[:head.rfind(b'\n') + 1]
+            bytes_per_row = len(complete_lines) / complete_lines.count(b'\n')
+            preflight['rows_saved_estimate'] = max(0, int(size / bytes_per_row) - 1)
+        file_result['status'] = 'failed'
+        file_result['message'] = f'Missing required columns: {", ".join(missing_cols)} (rejected by pre-flight)'
+        return match, True
+    
+    @staticmethod
+    def _preflight_summary(details: List[Dict]) -> Dict:
+        """Bandwidth the pre-flight stage saved this run, plus the CPU it likely saved"""
+        checked = [d['preflight'] for d in details if 'preflight' in d]
+        rejected = [preflight for preflight in checked if preflight['status'] == 'rejected']
+        bytes_saved = sum(preflight['bytes_saved'] for preflight in rejected)
+        
+        # Price a rejected byte at this run's parse-to-quality cost per parsed byte
+        cpu_seconds = parsed_bytes = 0
+        for detail in details:
+            for span in detail.get('spans', []):
+                if span['name'] in ('parse', 'normalize', 'validate', 'quality'):
+                    cpu_seconds += span['seconds']
+                if span['name'] == 'parse':
+                    parsed_bytes += span.get('bytes') or 0
+        
+        return {
+            'checked': len(checked),
+            'rejected': len(rejected),
+            'bytes_fetched': sum(preflight['bytes_fetched'] for preflight in checked),
+            'bytes_saved': bytes_saved,
+            'rows_saved_estimate': sum(preflight['rows_saved_estimate'] for preflight in rejected),
+            'cpu_seconds_saved_estimate': round(bytes_saved * cpu_seconds / parsed_bytes, 4) if parsed_bytes else None
+        }
+    
+    def _compact(self, df: pd.DataFrame, file_result: Dict) -> pd.DataFrame:
+        """Compact a validated frame before it is landed and upserted"""
+        if self.compactor is None:
+            return df
+        with self._span('compact', file_result, merge=True, rows=len(df)) as span:
+            df, report = self.compactor.compact(df)
+            span['bytes'] = report['bytes_after']
+        file_result['compaction'] = FrameCompactor.merge_reports(file_result.get('compaction'), report)
+        return df
+    
+    @staticmethod
+    def _compaction_summary(details: List[Dict]) -> Dict:
+        """Memory held by this run's normalized frames before and after compaction"""
+        reports = [d['compaction'] for d in details if 'compaction' in d]
+        bytes_before = sum(report['bytes_before'] for report in reports)
+        bytes_after = sum(report['bytes_after'] for report in reports)
+        return {
+            'files': len(reports),
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'ratio': round(bytes_after / bytes_before, 4) if bytes_before else None
+        }
+    
+    def _resume_point(
+        self,
+        file_info: Dict,
+        mode: str,
+        force: bool,
+        chunk_rows: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """(chunk, rows) an earlier run already committed; (0, 0) starts over"""
+        if self.checkpoint is None:
+            return 0, 0
+        if force:
+            self.checkpoint.clear(file_info['id'])
+            return 0, 0
+        entry = self.checkpoint.resume_point(file_info, mode, chunk_rows)
+        return (entry['chunk'], entry['rows']) if entry else (0, 0)
+    
+    def _commit_hook(
+        self,
+        file_info: Dict,
+        table_name: str,
+        df: pd.DataFrame,
+        normalized_rows: int,
+        mode: str,
+        chunk: int = 0,
+        chunk_rows: Optional[int] = None
+    ):
+        """
+        BatchUpserter ``on_commit`` callback advancing the checkpoint
+        
+        The index of ``df`` holds each row's position in the normalized
+        chunk, so committed upsert rows map back to chunk positions even
+        after resumed or deduplicated rows were dropped.
+        """
+        if self.checkpoint is None:
+            return None
+        positions = df.index.to_numpy()
+        
+        def on_commit(committed: int):
+            rows = normalized_rows if committed >= len(positions) else int(positions[committed])
+            self.checkpoint.advance(file_info, table_name, mode, chunk, rows, chunk_rows)
+        return on_commit
+    
+    def _refresh_ml_features(self, report: Dict):
+        """Refresh the ML feature view when a run upserted anything"""
+        if report['successful'] > 0:
+            try:
+                with self.tracer.span('refresh_ml_features', report.setdefault('spans', [])):
+                    self.supabase.rpc('refresh_ml_features').execute()
+                report['ml_features_refreshed'] = True
+            except Exception as e:
+                report['ml_features_refreshed'] = False
+                report['ml_refresh_error'] = str(e)
+    
+    def _process_file(self, file_info: Dict, force: bool = False) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Download, parse, normalize, validate and upsert a single Drive file
+        
+        Returns:
+            (file_result, quality_metrics) - quality_metrics is None when the
+            file never reached quality scoring
+        """
+        file_id = file_info['id']
+        file_name = file_info['name']
+        mime_type = file_info['mimeType']
+        
+        file_result = {
+            'filename': file_name,
+            'status': 'unknown',
+            'message': '',
+            'rows_processed': 0,
+            'duplicates_removed': 0
+        }
+        quality_metrics = None
+        
+        try:
+            is_excel = mime_type.endswith('spreadsheetml.sheet') or file_name.endswith('.xlsx')
+            is_csv = mime_type == 'text/csv' or file_name.endswith('.csv')
+            if not (is_excel or is_csv):
+                file_result['status'] = 'skipped'
+                file_result['message'] = f'Unsupported file type: {mime_type}'
+                return file_result, quality_metrics
+            
+            # Incremental mode: skip files whose Drive metadata is unchanged
+            if self.manifest is not None and not force and self.manifest.is_unchanged(file_info):
+                file_result['status'] = 'skipped_unchanged'
+                file_result['message'] = 'Unchanged since last ingestion'
+                return file_result, quality_metrics
+            
+            # Detect source type (memoized per file id)
+            match = self.classifier.classify(file_name, file_id)
+            source_type = match.source_type
+            file_result['source'] = match.to_dict()
+            if not source_type:
+                file_result['message'] = 'Could not detect source type from filename'
+            
+            # Pre-flight: reject mis-shaped CSVs from their first bytes
+            if is_csv:
+                match, rejected = self._preflight(file_info, match, file_result)
+                source_type = match.source_type
+                if rejected:
+                    return file_result, quality_metrics
+            
+            if is_csv and self.stream_csv:
+                return self._stream_csv_file(file_info, match, file_result, force)
+            
+            # Download file (I/O bound - overlaps across workers)
+            with self._span('download', file_result) as span:
+                fh = self._download_file(file_id, self._file_size(file_info))
+                span['bytes'] = fh.getbuffer().nbytes
+            
+            content_hash = None
+            if self.manifest is not None:
+                content_hash = IngestionManifest.content_hash(fh.getbuffer())
+                if not force and self.manifest.has_content(file_id, content_hash):
+                    # Touched but identical: remember the new metadata so the next run skips the download
+                    self.manifest.refresh(file_info)
+                    file_result['status'] = 'skipped_unchanged'
+                    file_result['message'] = 'Content unchanged since last ingestion'
+                    return file_result, quality_metrics
+            
+            # Workbooks with several tabs (e.g. one per branch) take the multi-sheet path
+            if is_excel:
+                sheet_names = self.readers.sheet_names(fh, source_type)
+                if len(sheet_names) > 1:
+                    return self._ingest_workbook(file_info, fh, sheet_names, match, file_result, force, content_hash)
+            
+            if is_csv and self._needs_header(match):
+                source_type = self._classify_by_header(
+                    file_info, sniff_csv_header(bytes(fh.getbuffer()[:65536])), file_result
+                )
+            
+            # Parse, normalize and score (CPU bound - limited to parse_workers)
+            with self._parse_slots:
+                with self._span('parse', file_result, bytes=fh.getbuffer().nbytes) as span:
+                    df, file_result['reader'] = self.readers.read(
+                        fh, 'xlsx' if is_excel else 'csv', source_type,
+                        schema=self.schemas.get(source_type), prune_columns=self.prune_columns
+                    )
+                    span['rows'] = len(df)
+                del fh
+                if is_excel and self._needs_header(match):
+                    source_type = self._classify_by_header(file_info, list(df.columns), file_result)
+                
+                with self._span('normalize', file_result) as span:
+                    df, duplicates_removed = self.normalize_dataframe(df, file_name, source_type)
+                    span['rows'] = len(df)
+                
+                # Validate required columns
+                with self._span('validate', file_result, rows=len(df)):
+                    is_valid, missing_cols = self.validate_required_columns(df, source_type)
+                if not is_valid:
+                    file_result['status'] = 'failed'
+                    file_result['message'] = f'Missing required columns: {", ".join(missing_cols)}'
+                    return file_result, quality_metrics
+                
+                # Calculate quality score
+                with self._span('quality', file_result, rows=len(df)):
+                    quality_metrics = self.calculate_data_quality_score(df)
+                    self._record_schema_violations(df, source_type, file_result)
+                df = self._compact(df, file_result)
+            
+            # Get target table
+            table_name = self.get_table_name(source_type)
+            on_conflict = self._conflict_target(table_name, df.columns, file_result)
+            
+            # Land the normalized frame locally so it can be replayed without Drive
+            if self.landing_zone is not None:
+                self.landing_zone.discard(file_name, file_id)
+                file_result['landing_paths'] = [self.landing_zone.write(
+                    df, source_type, file_name, self._landing_metadata(file_info, table_name, on_conflict),
+                    file_id=file_id
+                )]
+            
+            # Resume after the rows a failed earlier run already committed
+            normalized_rows = len(df)
+            df.index = pd.RangeIndex(normalized_rows)
+            _, resume_rows = self._resume_point(file_info, 'buffered', force)
+            if resume_rows:
+                df = df.iloc[resume_rows:]
+                file_result['resumed_from'] = {'chunk': 0, 'rows': resume_rows}
+            
+            # Drop rows earlier runs already upserted unchanged
+            file_result['dedup'] = {'within_file': duplicates_removed, 'cross_run': 0, 'changed': 0}
+            df, pending = self._drop_seen_rows(df, source_type, table_name, file_result['dedup'])
+            
+            # Upsert to Supabase in batches (I/O bound - overlaps across workers)
+            # Note: Requires a unique constraint on the table's conflict keys
+            with self._span('upsert', file_result, table=table_name) as span:
+                upsert_report = self.upserter.upsert(
+                    table_name, df, on_conflict=on_conflict,
+                    on_commit=self._commit_hook(file_info, table_name, df, normalized_rows, 'buffered')
+                )
+                span['rows'] = upsert_report['rows_upserted']
+                span['bytes'] = upsert_report['bytes']
+            if pending is not None:
+                self.dedup_index.mark(table_name, pending, upsert_report['batches'])
+            file_result['rows_processed'] = upsert_report['rows_upserted']
+            file_result['duplicates_removed'] = duplicates_removed
+            file_result['quality_score'] = quality_metrics['final_quality_score']
+            file_result['upsert_batches'] = upsert_report['batches']
+            
+            if upsert_report['failed_batches']:
+                file_result['status'] = 'failed'
+                file_result['message'] = (
+                    f"Upserted {upsert_report['rows_upserted']}/{upsert_report['total_rows']} rows "
+                    f"to {table_name}; {upsert_report['failed_batches']} batch(es) failed"
+                )
+                return file_result, quality_metrics
+            
+            file_result['status'] = 'success'
+            file_result['message'] = f"Upserted {upsert_report['rows_upserted']} rows to {table_name}"
+            if resume_rows:
+                file_result['message'] += f" (resumed after {resume_rows} committed rows)"
+            if file_result['dedup']['cross_run']:
+                file_result['message'] += f"; {file_result['dedup']['cross_run']} unchanged rows already ingested"
+            
+            if self.checkpoint is not None:
+                self.checkpoint.clear(file_id)
+            if self.manifest is not None:
+                self.manifest.record(file_info, content_hash, upsert_report['rows_upserted'], table_name)
+        
+        except Exception as e:
+            file_result['status'] = 'failed'
+            file_result['message'] = f'Error: {str(e)}'
+        
+        return file_result, quality_metrics
+    
+    def _classify_sheet(self, file_info: Dict, match: SourceMatch, sheet_name: str, columns: List[str]) -> SourceMatch:
+        """A sheet named after a source type wins; otherwise it inherits the workbook's type"""
+        sheet_match = self.classifier.classify(sheet_name)
+        if sheet_match.source_type is None or self.classifier.is_ambiguous(sheet_match):
+            sheet_match = match
+        if self._needs_header(sheet_match):
+            by_header = self.classifier.classify(sheet_name, f"{file_info['id']}#{sheet_name}", header=columns)
+            if by_header.method == 'header':
+                sheet_match = by_header
+        return sheet_match
+    
+    def _ingest_workbook(
+        self,
+        file_info: Dict,
+        fh: io.BytesIO,
+        sheet_names: List[str],
+        match: SourceMatch,
+        file_result: Dict,
+        force: bool = False,
+        content_hash: Optional[str] = None
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Multi-sheet path: every sheet is parsed (in parallel with sheet_workers),
+        classified and normalized on its own, then sheets sharing a source
+        type and column set are concatenated into one batched upsert
+        
+        Sheets missing required columns (summary or notes tabs) are skipped.
+        Groups are upserted in first-sheet order and the first failed group
+        stops the file, so checkpoints stay a committed prefix.
+        """
+        file_name = file_info['name']
+        sheets = file_result['sheets'] = []
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[pd.DataFrame]] = {}
+        profile = None
+        sheet_quality = {}
+        duplicates_removed = 0
+        
+        with self._parse_slots:
+            with self._span('parse', file_result, bytes=fh.getbuffer().nbytes, sheets=len(sheet_names)) as span:
+                parsed = self.readers.read_sheets(fh, sheet_names, match.source_type, workers=self.sheet_workers)
+                span['rows'] = sum(len(df) for df, _ in parsed)
+            file_result['reader'] = dict(parsed[0][1], sheets=len(sheet_names), seconds=span['seconds'])
+            del fh
+            
+            for sheet_name, (df, stats) in zip(sheet_names, parsed):
+                sheet_match = self._classify_sheet(file_info, match, sheet_name, list(df.columns))
+                source_type = sheet_match.source_type
+                sheet = {'sheet': sheet_name, 'source_type': source_type, 'reader': stats['engine'], 'rows': len(df)}
+                sheets.append(sheet)
+                if df.empty:
+                    sheet['status'] = 'skipped'
+                    sheet['message'] = 'Empty sheet'
+                    continue
+                
+                with self._span('normalize', file_result, merge=True) as span:
+                    df, sheet_duplicates = self.normalize_dataframe(df, file_name, source_type)
+                    span['rows'] = len(df)
+                with self._span('validate', file_result, merge=True, rows=len(df)):
+                    is_valid, missing_cols = self.validate_required_columns(df, source_type)
+                if not is_valid:
+                    sheet['status'] = 'skipped'
+                    sheet['message'] = f'Missing required columns: {", ".join(missing_cols)}'
+                    continue
+                
+                with self._span('quality', file_result, merge=True, rows=len(df)):
+                    sheet_profile = self._quality_profile(df)
+                    sheet_quality[sheet_name] = self._quality_from_profile(sheet_profile)
+                    profile = self._merge_quality_profiles(profile, sheet_profile)
+                    self._record_schema_violations(df, source_type, file_result)
+                
+                key = (source_type, tuple(sorted(df.columns)))
+                groups.setdefault(key, []).append(df)
+                sheet.update(
+                    status='parsed',
+                    group=list(groups).index(key),
+                    quality_score=sheet_quality[sheet_name]['final_quality_score']
+                )
+                duplicates_removed += sheet_duplicates
+        del parsed
+        
+        if not groups:
+            file_result['status'] = 'failed'
+            file_result['message'] = f'No sheet has the required columns ({len(sheet_names)} sheets)'
+            return file_result, None
+        
+        quality_metrics = self._quality_from_profile(profile)
+        quality_metrics['sheets'] = sheet_quality
+        file_result['quality_score'] = quality_metrics['final_quality_score']
+        file_result['dedup'] = dedup = {'within_file': duplicates_removed, 'cross_run': 0, 'changed': 0}
+        resume_group, resume_rows = self._resume_point(file_info, 'sheets', force)
+        if resume_group or resume_rows:
+            file_result['resumed_from'] = {'chunk': resume_group, 'rows': resume_rows}
+        if self.landing_zone is not None:
+            # Parts a resumed run already landed stay; later ones are rewritten
+            self.landing_zone.discard(file_name, file_info['id'], from_part=resume_group)
+        
+        batches = []
+        total_rows = 0
+        rows_upserted = 0
+        tables = []
+        for group_number, ((source_type, _), frames) in enumerate(groups.items()):
+            if group_number < resume_group:
+                continue
+            table_name = self.get_table_name(source_type)
+            tables.append(table_name)
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            # Sheets were deduplicated one by one; branch tabs can repeat rows
+            # (refresh_date is stamped per sheet, so it is not part of the key)
+            if len(frames) > 1:
+                normalized_rows = len(df)
+                df = df.drop_duplicates(subset=[column for column in df.columns if column != 'refresh_date'])
+                dedup['within_file'] += normalized_rows - len(df)
+            df = self._compact(df, file_result)
+            on_conflict = self._conflict_target(table_name, df.columns, file_result)
+            
+            if self.landing_zone is not None:
+                file_result.setdefault('landing_paths', []).append(self.landing_zone.write(
+                    df, source_type, file_name,
+                    self._landing_metadata(file_info, table_name, on_conflict),
+                    part=group_number, file_id=file_info['id']
+                ))
+            
+            normalized_rows = len(df)
+            df.index = pd.RangeIndex(normalized_rows)
+            if group_number == resume_group and resume_rows:
+                df = df.iloc[resume_rows:]
+            df, pending = self._drop_seen_rows(df, source_type, table_name, dedup)
+            with self._span('upsert', file_result, merge=True, table=table_name) as span:
+                upsert_report = self.upserter.upsert(
+                    table_name, df, on_conflict=on_conflict,
+                    on_commit=self._commit_hook(file_info, table_name, df, normalized_rows, 'sheets', group_number)
+                )
+                span['rows'] = upsert_report['rows_upserted']
+                span['bytes'] = upsert_report['bytes']
+            if pending is not None:
+                self.dedup_index.mark(table_name, pending, upsert_report['batches'])
+            for batch in upsert_report['batches']:
+                batch['batch'] = len(batches)
+                batch['offset'] += total_rows
+                batch['table'] = table_name
+                batches.append(batch)
+            total_rows += len(df)
+            rows_upserted += upsert_report['rows_upserted']
+            if upsert_report['failed_batches']:
+                break
+        
+        file_result['rows_processed'] = rows_upserted
+        file_result['duplicates_removed'] = dedup['within_file']
+        file_result['upsert_batches'] = batches
+        table_list = ', '.join(dict.fromkeys(tables))
+        failed_batches = sum(1 for batch in batches if batch['status'] != 'success')
+        if failed_batches:
+            file_result['status'] = 'failed'
+            file_result['message'] = (
+                f"Upserted {rows_upserted}/{total_rows} rows to {table_list}; "
+                f"{failed_batches} batch(es) failed"
+            )
+            return file_result, quality_metrics
+        
+        parsed_sheets = sum(1 for sheet in sheets if sheet['status'] == 'parsed')
+        file_result['status'] = 'success'
+        file_result['message'] = (
+            f"Upserted {rows_upserted} rows to {table_list} "
+            f"from {parsed_sheets}/{len(sheets)} sheets in {len(groups)} batch group(s)"
+        )
+        if dedup['cross_run']:
+            file_result['message'] += f"; {dedup['cross_run']} unchanged rows already ingested"
+        if self.checkpoint is not None:
+            self.checkpoint.clear(file_info['id'])
+        if self.manifest is not None:
+            self.manifest.record(file_info, content_hash, rows_upserted, table_list)
+        
+        return file_result, quality_metrics
+    
+    def _stream_csv_file(
+        self,
+        file_info: Dict,
+        match: SourceMatch,
+        file_result: Dict,
+        force: bool = False
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Streaming CSV path: download chunks feed ``read_csv(chunksize=...)`` and
+        every parsed chunk is normalized and upserted before the next is read,
+        so peak memory is bounded by csv_chunk_rows instead of the file size
+        
+        Note: duplicates are removed within each chunk only. When resuming,
+        chunks an earlier run committed are read past without being
+        normalized, scored or upserted again.
+        """
+        file_name = file_info['name']
+        stream = self._open_stream(file_info['id'], self._file_size(file_info))
+        buffered = io.BufferedReader(stream, buffer_size=65536)
+        header = sniff_csv_header(buffered.peek(65536))
+        source_type = match.source_type
+        if self._needs_header(match):
+            source_type = self._classify_by_header(file_info, header, file_result)
+        table_name = self.get_table_name(source_type)
+        
+        profile = None
+        batches = []
+        total_rows = 0
+        rows_upserted = 0
+        duplicates_removed = 0
+        dedup = file_result['dedup'] = {'within_file': 0, 'cross_run': 0, 'changed': 0}
+        resume_chunk, resume_rows = self._resume_point(file_info, 'streamed', force, self.csv_chunk_rows)
+        if resume_chunk or resume_rows:
+            file_result['resumed_from'] = {'chunk': resume_chunk, 'rows': resume_rows}
+        if self.landing_zone is not None:
+            # Parts a resumed run already landed stay; later ones are rewritten
+            self.landing_zone.discard(file_name, file_info['id'], from_part=resume_chunk)
+        
+        read_options = {}
+        schema = self.schemas.get(source_type)
+        if schema is not None:
+            # Only string-safe hints: a conversion error mid-stream would
+            # abort a file whose earlier chunks are already upserted
+            hints = schema.reader_hints(header, prune=self.prune_columns)
+            hints = hints.relaxed()
+            read_options = {'dtype': hints.pandas_dtypes(), 'usecols': hints.usecols}
+        
+        reader = pd.read_csv(buffered, chunksize=self.csv_chunk_rows, **read_options)
+        chunk_number = -1
+        validated = False
+        bytes_seen = 0
+        while True:
+            # Download and parse are interleaved while streaming, so one span
+            # covers both (the first also counts the header read above)
+            with self._span('parse', file_result, merge=True, streamed=True) as span:
+                chunk = next(reader, None)
+                span['bytes'] = stream.bytes_read - bytes_seen
+                bytes_seen = stream.bytes_read
+                span['rows'] = len(chunk) if chunk is not None else 0
+            if chunk is None:
+                break
+            chunk_number += 1
+            if chunk_number < resume_chunk:
+                continue
+            
+            with self._parse_slots:
+                with self._span('normalize', file_result, merge=True) as span:
+                    chunk, chunk_duplicates = self.normalize_dataframe(chunk, file_name, source_type)
+                    span['rows'] = len(chunk)
+                
+                # Validate required columns on the first chunk processed (the
+                # resume chunk when resuming), before reading further
+                if not validated:
+                    with self._span('validate', file_result, rows=len(chunk)):
+                        is_valid, missing_cols = self.validate_required_columns(chunk, source_type)
+                    if not is_valid:
+                        file_result['status'] = 'failed'
+                        file_result['message'] = f'Missing required columns: {", ".join(missing_cols)}'
+                        return file_result, None
+                    validated = True
+                
+                with self._span('quality', file_result, merge=True, rows=len(chunk)):
+                    profile = self._merge_quality_profiles(profile, self._quality_profile(chunk))
+                    self._record_schema_violations(chunk, source_type, file_result)
+                chunk = self._compact(chunk, file_result)
+            
+            on_conflict = self._conflict_target(table_name, chunk.columns, file_result)
+            if self.landing_zone is not None:
+                file_result.setdefault('landing_paths', []).append(self.landing_zone.write(
+                    chunk, source_type, file_name,
+                    self._landing_metadata(file_info, table_name, on_conflict),
+                    part=chunk_number, file_id=file_info['id']
+                ))
+            
+            normalized_rows = len(chunk)
+            chunk.index = pd.RangeIndex(normalized_rows)
+            if chunk_number == resume_chunk and resume_rows:
+                chunk = chunk.iloc[resume_rows:]
+            
+            dedup['within_file'] += chunk_duplicates
+            chunk, pending = self._drop_seen_rows(chunk, source_type, table_name, dedup)
+            with self._span('upsert', file_result, merge=True, table=table_name) as span:
+                upsert_report = self.upserter.upsert(
+                    table_name, chunk, on_conflict=on_conflict,
+                    on_commit=self._commit_hook(
+                        file_info, table_name, chunk, normalized_rows, 'streamed', chunk_number, self.csv_chunk_rows
+                    )
+                )
+                span['rows'] = upsert_report['rows_upserted']
+                span['bytes'] = upsert_report['bytes']
+            if pending is not None:
+                self.dedup_index.mark(table_name, pending, upsert_report['batches'])
+            for batch in upsert_report['batches']:
+                batch['batch'] = len(batches)
+                batch['offset'] += total_rows
+                batches.append(batch)
+            
+            total_rows += len(chunk)
+            rows_upserted += upsert_report['rows_upserted']
+            duplicates_removed += chunk_duplicates
+            file_result['chunks'] = chunk_number + 1
+            if upsert_report['failed_batches']:
+                break
+        
+        quality_metrics = self._quality_from_profile(profile) if profile else None
+        file_result['rows_processed'] = rows_upserted
+        file_result['duplicates_removed'] = duplicates_removed
+        file_result['upsert_batches'] = batches
+        if quality_metrics is not None:
+            file_result['quality_score'] = quality_metrics['final_quality_score']
+        
+        failed_batches = sum(1 for batch in batches if batch['status'] != 'success')
+        if failed_batches:
+            file_result['status'] = 'failed'
+            file_result['message'] = (
+                f"Upserted {rows_upserted}/{total_rows} rows to {table_name}; "
+                f"{failed_batches} batch(es) failed, stream stopped"
+            )
+            return file_result, quality_metrics
+        
+        file_result['status'] = 'success'
+        file_result['message'] = f"Upserted {rows_upserted} rows to {table_name} (streamed)"
+        if 'resumed_from' in file_result:
+            file_result['message'] += f"; resumed at chunk {resume_chunk}, row {resume_rows}"
+        if dedup['cross_run']:
+            file_result['message'] += f"; {dedup['cross_run']} unchanged rows already ingested"
+        if self.checkpoint is not None:
+            self.checkpoint.clear(file_info['id'])
+        if self.manifest is not None:
+            self.manifest.record(file_info, stream.content_hash, rows_upserted, table_name)
+        
+        return file_result, quality_metrics
+    
+    def ingest_from_drive(
+        self,
+        folder_id: str,
+        max_workers: Optional[int] = None,
+        force: bool = False,
+        resume_only: bool = False,
+        progress: Optional[Callable[[int, int, Dict], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> Dict:
+        """
         Main ingestion pipeline: Google Drive → Supabase
         Returns detailed ingestion report
-        ingestion_report  {
+        
+        Files are processed by up to ``max_workers`` threads (defaults to the
+        engine setting). Report details keep the Drive listing order no
+        matter which file finishes first. With a manifest configured,
+        unchanged files are reported as ``skipped_unchanged`` unless
+        ``force`` is set. With a checkpoint configured, files whose upsert
+        failed partway resume after their last committed batch (``force``
+        starts them over); ``resume_only`` processes just those files.
+        
+        ``progress(done, total, file_result)`` is called as each file
+        finishes. Once ``should_cancel()`` returns True, files not yet
+        started are reported as ``cancelled``; files in flight finish (their
+        checkpoints let a later run pick up the rest).
+        """
+        if resume_only and self.checkpoint is None:
+            raise ValueError('resume_only requires checkpoint_path')
+        
+        ingestion_report = {
             'total_files': 0,
             'successful': 0,
             'failed': 0,
             'skipped': 0,
+            'skipped_unchanged': 0,
+            'cancelled': 0,
             'details': [],
-            'quality_scores': {}
+            'quality_scores': {},
+            'dedup': {'within_file': 0, 'cross_run': 0, 'changed': 0},
+            'preflight': {},
+            'compaction': {},
+            'spans': []
+        }
         
         try:
             # List files in Google Drive folder
-            query  f"'{folder_id}' in parents and trashed  false"
-            results  self.drive.files().list(
-                qquery,
-                fields"files(id, name, mimeType, modifiedTime, size)"
-            ).execute()
-            
-            files  results.get('files', [])
-            ingestion_report['total_files']  len(files)
-            
-            for file_info in files:
-                file_id  file_info['id']
-                file_name  file_info['name']
-                mime_type  file_info['mimeType']
-                
-                file_result  {
-                    'filename': file_name,
-                    'status': 'unknown',
-                    'message': '',
-                    'rows_processed': 0,
-                    'duplicates_removed': 0
-                }
-                
-                try:
-                    # Download file
-                    request  self.drive.files().get_media(fileIdfile_id)
-                    fh  io.BytesIO()
-                    downloader  MediaIoBaseDownload(fh, request)
-                    done  False
-                    while not done:
-                        status, done  downloader.next_chunk()
-                    fh.seek(0)
-                    
-                    # Parse file based on type
-                    if mime_type.endswith('spreadsheetml.sheet') or file_name.endswith('.xlsx'):
-                        df  pd.read_excel(fh)
-                    elif mime_type  'text/csv' or file_name.endswith('.csv'):
-                        df  pd.read_csv(fh)
-                    else:
-                        file_result['status']  'skipped'
-                        file_result['message']  f'Unsupported file type: {mime_type}'
-                        ingestion_report['skipped'] + 1
-                        ingestion_report['details'].append(file_result)
-                        continue
-                    
-                    # Detect source type
-                    source_type  self.detect_source_type(file_name)
-                    if not source_type:
-                        file_result['message']  'Could not detect source type from filename'
-                    
-                    # Normalize data
-                    df, duplicates_removed  self.normalize_dataframe(df, file_name)
-                    
-                    # Validate required columns
-                    is_valid, missing_cols  self.validate_required_columns(df, source_type)
-                    if not is_valid:
-                        file_result['status']  'failed'
-                        file_result['message']  f'Missing required columns: {", ".join(missing_cols)}'
-                        ingestion_report['failed'] + 1
-                    
-                    # Calculate quality score
-                    quality_metrics  self.calculate_data_quality_score(df)
-                    ingestion_report['quality_scores'][file_name]  quality_metrics
-                    
-                    # Get target table
-                    table_name  self.get_table_name(source_type)
-                    
-                    # Convert to records
-                    data  df.to_dict(orient'records')
-                    
-                    # Upsert to Supabase
-                    # Note: Requires unique constraint on customer_id + date or similar
-                    response  self.supabase.table(table_name).upsert(
-                        data,
-                        on_conflict'id' if 'id' in df.columns else None
-                    ).execute()
-                    
-                    file_result['status']  'success'
-                    file_result['message']  f'Upserted {len(data)} rows to {table_name}'
-                    file_result['rows_processed']  len(data)
-                    file_result['duplicates_removed']  duplicates_removed
-                    file_result['quality_score']  quality_metrics['final_quality_score']
-                    ingestion_report['successful'] + 1
-                    
-                except Exception as e:
-                    file_result['status']  'failed'
-                    file_result['message']  f'Error: {str(e)}'
-                    ingestion_report['failed'] + 1
-                
+            query = f"'{folder_id}' in parents and trashed = false"
+            with self.tracer.span('list', ingestion_report['spans'], folder=folder_id) as span:
+                results = self.drive.files().list(
+                    q=query,
+                    fields="files(id, name, mimeType, modifiedTime, size)"
+                ).execute()
+                files = results.get('files', [])
+                if resume_only:
+                    pending = set(self.checkpoint.pending())
+                    files = [file_info for file_info in files if file_info['id'] in pending]
+                span['rows'] = len(files)
+            
+            ingestion_report['total_files'] = len(files)
+            
+            workers = min(max_workers or self.max_workers, len(files)) or 1
+            finished = []
+            finished_lock = threading.Lock()
+            
+            def process(file_info):
+                if should_cancel is not None and should_cancel():
+                    outcome = ({
+                        'filename': file_info['name'],
+                        'status': 'cancelled',
+                        'message': 'Cancelled before processing',
+                        'rows_processed': 0,
+                        'duplicates_removed': 0
+                    }, None)
+                else:
+                    outcome = self._process_file(file_info, force=force)
+                if progress is not None:
+                    with finished_lock:
+                        finished.append(file_info['id'])
+                        progress(len(finished), len(files), outcome[0])
+                return outcome
+            
+            if workers == 1:
+                outcomes = [process(file_info) for file_info in files]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as pool:
+                    # map() yields in submission order, keeping the report deterministic
+                    outcomes = list(pool.map(process, files))
+            
+            for file_result, quality_metrics in outcomes:
+                if quality_metrics is not None:
+                    ingestion_report['quality_scores'][file_result['filename']] = quality_metrics
+                if file_result['status'] == 'success':
+                    ingestion_report['successful'] += 1
+                elif file_result['status'] == 'skipped':
+                    ingestion_report['skipped'] += 1
+                elif file_result['status'] == 'skipped_unchanged':
+                    ingestion_report['skipped_unchanged'] += 1
+                elif file_result['status'] == 'cancelled':
+                    ingestion_report['cancelled'] += 1
+                else:
+                    ingestion_report['failed'] += 1
+                for counter, value in file_result.get('dedup', {}).items():
+                    ingestion_report['dedup'][counter] += value
                 ingestion_report['details'].append(file_result)
+            ingestion_report['preflight'] = self._preflight_summary(ingestion_report['details'])
+            ingestion_report['compaction'] = self._compaction_summary(ingestion_report['details'])
             
-            # Refresh ML features if any data was ingested
-            if ingestion_report['successful']  0:
-                    self.supabase.rpc('refresh_ml_features').execute()
-                    ingestion_report['ml_features_refreshed']  True
-                    ingestion_report['ml_features_refreshed']  False
-                    ingestion_report['ml_refresh_error']  str(e)
+            if self.manifest is not None:
+                self.manifest.save()
+            if self.dedup_index is not None:
+                self.dedup_index.save()
             
+            # Refresh ML features if any data was ingested
+            self._refresh_ml_features(ingestion_report)
+        
         except Exception as e:
-            ingestion_report['error']  str(e)
+            ingestion_report['error'] = str(e)
         
+        self._log_run(ingestion_report)
         return ingestion_report
+    
+    def replay_from_landing_zone(
+        self,
+        source_type: Optional[str] = None,
+        ingest_date: Optional[str] = None,
+        renormalize: bool = False
+    ) -> Dict:
+        """
+        Re-upsert landed Parquet frames without touching Google Drive
+        
+        Args:
+            source_type: Only replay this source type's partition
+            ingest_date: Only replay this day (YYYY-MM-DD)
+            renormalize: Run normalize_dataframe again before upserting,
+                e.g. after a normalization fix
+        """
+        if self.landing_zone is None:
+            raise ValueError('replay_from_landing_zone requires landing_zone_path')
+        
+        paths = self.landing_zone.list_files(source_type, ingest_date)
+        replay_report = {
+            'total_files': len(paths),
+            'successful': 0,
+            'failed': 0,
+            'details': []
+        }
+        
+        for path in paths:
+            file_result = {'filename': path, 'status': 'unknown', 'message': '', 'rows_processed': 0}
+            try:
+                df, metadata = self.landing_zone.read(path)
+                if renormalize:
+                    df, file_result['duplicates_removed'] = self.normalize_dataframe(
+                        df, metadata.get('file_name', path), metadata.get('source_type')
+                    )
+                table_name = metadata.get('table') or self.get_table_name(metadata.get('source_type'))
+                upsert_report = self.upserter.upsert(table_name, df, on_conflict=metadata.get('on_conflict'))
+                file_result['rows_processed'] = upsert_report['rows_upserted']
+                file_result['upsert_batches'] = upsert_report['batches']
+                if upsert_report['failed_batches']:
+                    file_result['status'] = 'failed'
+                    file_result['message'] = f"{upsert_report['failed_batches']} batch(es) failed"
+                else:
+                    file_result['status'] = 'success'
+                    file_result['message'] = f"Replayed {upsert_report['rows_upserted']} rows to {table_name}"
+            except Exception as e:
+                file_result['status'] = 'failed'
+                file_result['message'] = f'Error: {str(e)}'
+            
+            replay_report['successful' if file_result['status'] == 'success' else 'failed'] += 1
+            replay_report['details'].append(file_result)
+        
+        self._refresh_ml_features(replay_report)
+        return replay_report
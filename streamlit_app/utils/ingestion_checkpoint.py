@@ -0,0 +1,99 @@
+"""
+Ingestion Checkpoint - resumable Google Drive ingestion
+Persists how far each partially upserted Drive file got so a rerun only sends the rest
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class IngestionCheckpoint:
+    """
+    JSON-backed committed offsets keyed by Drive file id
+    
+    A position is ``(chunk, rows)``: every chunk before ``chunk`` and the
+    first ``rows`` normalized rows of ``chunk`` are committed. Buffered
+    files are a single chunk 0. Entries are written on every advance and
+    removed once the file is fully ingested.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path: str):
+        """Load checkpoints from ``path`` (a missing file starts empty)"""
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self.entries = payload.get('files', {})
+    
+    def pending(self) -> List[str]:
+        """File ids with an unfinished ingestion"""
+        with self._lock:
+            return list(self.entries)
+    
+    def resume_point(self, file_info: Dict, mode: str, chunk_rows: Optional[int] = None) -> Optional[Dict]:
+        """
+        Checkpoint to resume from, or None to start over
+        
+        Positions only carry over when the Drive file is unchanged and is
+        read the same way (mode and chunk size decide what a chunk is).
+        """
+        with self._lock:
+            entry = self.entries.get(file_info['id'])
+        if entry is None or not file_info.get('modifiedTime'):
+            return None
+        if (
+            entry.get('modified_time') != file_info.get('modifiedTime') or
+            entry.get('size') != file_info.get('size') or
+            entry.get('mode') != mode or
+            entry.get('chunk_rows') != chunk_rows
+        ):
+            return None
+        return entry
+    
+    def advance(
+        self,
+        file_info: Dict,
+        table_name: str,
+        mode: str,
+        chunk: int,
+        rows: int,
+        chunk_rows: Optional[int] = None
+    ):
+        """Record that everything before ``(chunk, rows)`` is committed and save"""
+        with self._lock:
+            self.entries[file_info['id']] = {
+                'name': file_info.get('name'),
+                'modified_time': file_info.get('modifiedTime'),
+                'size': file_info.get('size'),
+                'table': table_name,
+                'mode': mode,
+                'chunk_rows': chunk_rows,
+                'chunk': int(chunk),
+                'rows': int(rows),
+                'updated_at': datetime.now().isoformat()
+            }
+        self.save()
+    
+    def clear(self, file_id: str):
+        """Forget a file once it is fully ingested (or restarted with force)"""
+        with self._lock:
+            if self.entries.pop(file_id, None) is None:
+                return
+        self.save()
+    
+    def save(self):
+        """Atomically write the checkpoints to disk"""
+        with self._lock:
+            payload = {'version': self.VERSION, 'files': dict(self.entries)}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
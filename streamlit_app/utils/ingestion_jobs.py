@@ -0,0 +1,423 @@
+"""
+Ingestion Jobs - out-of-process Google Drive ingestion
+SQLite job queue shared by the Streamlit UI, the cron trigger endpoint and ingestion workers
+"""
+
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+class IngestionJobQueue:
+    """
+    Ingestion jobs in one SQLite file
+    
+    Enqueuers (UI, trigger endpoint) and workers may live in different
+    processes; every call opens its own connection and claims happen in an
+    IMMEDIATE transaction, so at most ``max_concurrent`` jobs run across
+    all workers, and at most one per folder. A running job whose heartbeat is older than
+    ``stale_after`` seconds (its worker died) is handed out again.
+    """
+    
+    ACTIVE = ('queued', 'running')
+    
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS ingestion_jobs (
+            id TEXT PRIMARY KEY,
+            folder_id TEXT NOT NULL,
+            options TEXT NOT NULL,
+            source TEXT NOT NULL,
+            status TEXT NOT NULL,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            files_done INTEGER NOT NULL DEFAULT 0,
+            files_total INTEGER,
+            message TEXT,
+            report TEXT,
+            error TEXT,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            heartbeat_at TEXT,
+            finished_at TEXT
+        )
+    '''
+    
+    def __init__(self, path: str, max_concurrent: int = 1, stale_after: float = 600.0):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+            max_concurrent: Jobs allowed to run at once across every worker
+            stale_after: Seconds without a heartbeat before a running job
+                is requeued
+        """
+        self.path = path
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.stale_after = stale_after
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(self.SCHEMA)
+            conn.execute('CREATE INDEX IF NOT EXISTS ingestion_jobs_status ON ingestion_jobs (status, created_at)')
+    
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat()
+    
+    @staticmethod
+    def _to_job(row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        job['report'] = json.loads(job['report']) if job['report'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+    
+    #
+    # Enqueuers
+    #
+    
+    def enqueue(self, folder_id: str, options: Optional[Dict] = None, source: str = 'ui') -> Dict:
+        """
+        Queue an ingestion of ``folder_id`` and return the job
+        
+        While a job for the same folder and options is still queued or
+        running it is returned instead, so repeated clicks and cron retries
+        do not pile up duplicate runs.
+        """
+        options = options or {}
+        encoded = json.dumps(options, sort_keys=True)
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                existing = conn.execute(
+                    'SELECT * FROM ingestion_jobs WHERE folder_id = ? AND options = ? '
+                    'AND status IN (?, ?) AND cancel_requested = 0 ORDER BY created_at LIMIT 1',
+                    (folder_id, encoded, *self.ACTIVE)
+                ).fetchone()
+                if existing is None:
+                    job_id = uuid.uuid4().hex[:12]
+                    conn.execute(
+                        'INSERT INTO ingestion_jobs (id, folder_id, options, source, status, created_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (job_id, folder_id, encoded, source, 'queued', self._now())
+                    )
+                    existing = conn.execute('SELECT * FROM ingestion_jobs WHERE id = ?', (job_id,)).fetchone()
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return self._to_job(existing)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            return self._to_job(conn.execute('SELECT * FROM ingestion_jobs WHERE id = ?', (job_id,)).fetchone())
+    
+    def jobs(self, limit: int = 20, status: Optional[str] = None) -> List[Dict]:
+        """Most recent jobs first"""
+        query = 'SELECT * FROM ingestion_jobs'
+        params = []
+        if status is not None:
+            query += ' WHERE status = ?'
+            params.append(status)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        params.append(limit)
+        with self._connect() as conn:
+            return [self._to_job(row) for row in conn.execute(query, params).fetchall()]
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job: queued jobs are cancelled at once, running ones stop
+        before their next file. False when the job already finished.
+        """
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE ingestion_jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?, "
+                "message = 'Cancelled before start' WHERE id = ? AND status = 'queued'",
+                (self._now(), job_id)
+            ).rowcount
+            updated += conn.execute(
+                "UPDATE ingestion_jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,)
+            ).rowcount
+        return bool(updated)
+    
+    #
+    # Workers
+    #
+    
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Oldest queued job, marked running for ``worker_id``
+        
+        Jobs of a folder that already has a running job wait their turn.
+        None at the concurrency limit or when nothing can start.
+        """
+        now = datetime.now()
+        stale_before = (now - timedelta(seconds=self.stale_after)).isoformat()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Jobs of dead workers go back to the queue (or end, if cancelled meanwhile)
+                conn.execute(
+                    "UPDATE ingestion_jobs SET status = 'cancelled', finished_at = ? "
+                    "WHERE status = 'running' AND heartbeat_at < ? AND cancel_requested = 1",
+                    (now.isoformat(), stale_before)
+                )
+                conn.execute(
+                    "UPDATE ingestion_jobs SET status = 'queued', worker = NULL "
+                    "WHERE status = 'running' AND heartbeat_at < ?",
+                    (stale_before,)
+                )
+                running = conn.execute("SELECT COUNT(*) FROM ingestion_jobs WHERE status = 'running'").fetchone()[0]
+                row = None
+                if running < self.max_concurrent:
+                    # One running job per folder: its jobs share the manifest and checkpoint files
+                    row = conn.execute(
+                        "SELECT * FROM ingestion_jobs WHERE status = 'queued' AND folder_id NOT IN "
+                        "(SELECT folder_id FROM ingestion_jobs WHERE status = 'running') "
+                        "ORDER BY created_at LIMIT 1"
+                    ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE ingestion_jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                        "started_at = ?, heartbeat_at = ?, message = NULL WHERE id = ?",
+                        (worker_id, now.isoformat(), now.isoformat(), row['id'])
+                    )
+                    row = conn.execute('SELECT * FROM ingestion_jobs WHERE id = ?', (row['id'],)).fetchone()
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return self._to_job(row)
+    
+    def heartbeat(self, job_id: str, files_done: Optional[int] = None,
+                  files_total: Optional[int] = None, message: Optional[str] = None) -> bool:
+        """Record liveness (and progress); returns True when cancellation was requested"""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE ingestion_jobs SET heartbeat_at = ?, files_done = COALESCE(?, files_done), '
+                'files_total = COALESCE(?, files_total), message = COALESCE(?, message) WHERE id = ?',
+                (self._now(), files_done, files_total, message, job_id)
+            )
+            row = conn.execute('SELECT cancel_requested FROM ingestion_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+    
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM ingestion_jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+    
+    def finish(self, job_id: str, report: Dict):
+        """Store the ingestion report; the status follows the report"""
+        if report.get('error'):
+            status, message = 'failed', report['error']
+        elif report.get('cancelled'):
+            status, message = 'cancelled', f"Cancelled after {report['total_files'] - report['cancelled']} files"
+        else:
+            status = 'failed' if report.get('failed') else 'succeeded'
+            message = (
+                f"{report.get('successful', 0)} succeeded, {report.get('failed', 0)} failed, "
+                f"{report.get('skipped', 0) + report.get('skipped_unchanged', 0)} skipped"
+            )
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE ingestion_jobs SET status = ?, message = ?, report = ?, error = ?, '
+                'files_done = COALESCE(files_total, files_done), finished_at = ? WHERE id = ?',
+                (
+                    status, message, json.dumps(report, default=str), report.get('error'),
+                    self._now(), job_id
+                )
+            )
+    
+    def fail(self, job_id: str, error: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'failed', error = ?, message = ?, finished_at = ? WHERE id = ?",
+                (error, error, self._now(), job_id)
+            )
+
+class IngestionWorker:
+    """
+    Runs queued ingestion jobs, each on its own thread with a fresh engine
+    
+    ``engine_factory(job)`` builds the DataIngestionEngine for a job. Jobs
+    of one folder never overlap (see ``IngestionJobQueue.claim``), so they
+    can share the folder's manifest and checkpoint files; the factory must
+    give different folders different files. Job ``options`` may set
+    ``force``, ``resume_only`` and ``max_workers``.
+    """
+    
+    RUN_OPTIONS = ('force', 'resume_only', 'max_workers')
+    
+    def __init__(
+        self,
+        queue: IngestionJobQueue,
+        engine_factory: Callable[[Dict], object],
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0
+    ):
+        self.queue = queue
+        self.engine_factory = engine_factory
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+    
+    def run_job(self, job: Dict) -> Dict:
+        """Run one claimed job to completion and store its outcome"""
+        job_id = job['id']
+        
+        def progress(done: int, total: int, file_result: Dict):
+            self.queue.heartbeat(job_id, done, total, f"{file_result['filename']}: {file_result['status']}")
+        
+        try:
+            engine = self.engine_factory(job)
+            options = {key: job['options'][key] for key in self.RUN_OPTIONS if key in job['options']}
+            report = engine.ingest_from_drive(
+                job['folder_id'],
+                progress=progress,
+                should_cancel=lambda: self.queue.cancel_requested(job_id),
+                **options
+            )
+            self.queue.finish(job_id, report)
+        except Exception as e:
+            self.queue.fail(job_id, f'Error: {str(e)}')
+        return self.queue.get(job_id)
+    
+    def running(self) -> List[str]:
+        """Ids of jobs this worker is running"""
+        with self._lock:
+            for job_id in [job_id for job_id, thread in self._threads.items() if not thread.is_alive()]:
+                del self._threads[job_id]
+            return list(self._threads)
+    
+    def poll(self) -> List[str]:
+        """Heartbeat running jobs and start as many queued ones as the queue allows"""
+        for job_id in self.running():
+            self.queue.heartbeat(job_id)
+        started = []
+        while True:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                return started
+            thread = threading.Thread(target=self.run_job, args=(job,), name=f"ingest-job-{job['id']}", daemon=True)
+            with self._lock:
+                self._threads[job['id']] = thread
+            thread.start()
+            started.append(job['id'])
+    
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """Poll until ``stop`` is set, then wait for running jobs"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(self.poll_interval)
+        for job_id in self.running():
+            self._threads[job_id].join()
+
+class IngestionTriggerServer(ThreadingHTTPServer):
+    """
+    HTTP trigger for scheduled runs (the pg_cron ``/api/ingest`` call)
+    
+    ``POST /api/ingest`` queues an ingestion of the configured folder and
+    answers 202 with the job; ``GET /api/ingest/<job_id>`` reports its
+    status and ``DELETE /api/ingest/<job_id>`` cancels it. With a
+    ``token`` every request needs ``Authorization: Bearer <token>``.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, queue: IngestionJobQueue, folder_id: str, token: Optional[str] = None,
+                 host: str = '127.0.0.1', port: int = 8502):
+        super().__init__((host, port), _TriggerHandler)
+        self.queue = queue
+        self.folder_id = folder_id
+        self.token = token
+
+class _TriggerHandler(BaseHTTPRequestHandler):
+    PATH = '/api/ingest'
+    
+    def log_message(self, *args):
+        pass
+    
+    def _reply(self, status: int, payload: Dict):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _authorized(self) -> bool:
+        token = self.server.token
+        supplied = self.headers.get('Authorization') or ''
+        if token and not hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+            self._reply(401, {'error': 'Unauthorized'})
+            return False
+        return True
+    
+    def _job_id(self) -> Optional[str]:
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if not path.startswith(self.PATH + '/'):
+            self._reply(404, {'error': 'Not found'})
+            return None
+        return path[len(self.PATH) + 1:]
+    
+    def do_POST(self):
+        if self.path.split('?', 1)[0].rstrip('/') != self.PATH:
+            self._reply(404, {'error': 'Not found'})
+            return
+        if not self._authorized():
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        except ValueError:
+            self._reply(400, {'error': 'Invalid JSON body'})
+            return
+        options = {key: body[key] for key in IngestionWorker.RUN_OPTIONS if key in body}
+        job = self.server.queue.enqueue(self.server.folder_id, options, source=body.get('source', 'cron'))
+        self._reply(202, {'job': job})
+    
+    def do_GET(self):
+        if not self._authorized():
+            return
+        job_id = self._job_id()
+        if job_id is None:
+            return
+        job = self.server.queue.get(job_id)
+        if job is None:
+            self._reply(404, {'error': f'Unknown job {job_id}'})
+            return
+        self._reply(200, {'job': job})
+    
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        job_id = self._job_id()
+        if job_id is None:
+            return
+        if self.server.queue.get(job_id) is None:
+            self._reply(404, {'error': f'Unknown job {job_id}'})
+            return
+        cancelled = self.server.queue.cancel(job_id)
+        self._reply(202 if cancelled else 409, {'job': self.server.queue.get(job_id), 'cancelled': cancelled})
@@ -0,0 +1,86 @@
+"""
+Ingestion Manifest - incremental Google Drive ingestion
+Persists what was ingested per Drive file so unchanged files can be skipped
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+class IngestionManifest:
+    """JSON-backed record of processed Drive files keyed by file id"""
+    
+    VERSION = 1
+    
+    def __init__(self, path: str):
+        """Load the manifest from ``path`` (a missing file starts empty)"""
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self.entries = payload.get('files', {})
+    
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """Stable content fingerprint for downloaded file bytes"""
+        return hashlib.sha256(data).hexdigest()
+    
+    def get(self, file_id: str) -> Optional[Dict]:
+        """Manifest entry for a file, if it was ingested before"""
+        with self._lock:
+            return self.entries.get(file_id)
+    
+    def is_unchanged(self, file_info: Dict) -> bool:
+        """True when Drive metadata matches the last successful ingestion"""
+        entry = self.get(file_info['id'])
+        if entry is None or not file_info.get('modifiedTime'):
+            return False
+        return (
+            entry.get('modified_time') == file_info.get('modifiedTime') and
+            entry.get('size') == file_info.get('size')
+        )
+    
+    def has_content(self, file_id: str, content_hash: str) -> bool:
+        """True when the file was already ingested with identical bytes"""
+        entry = self.get(file_id)
+        return entry is not None and entry.get('content_hash') == content_hash
+    
+    def record(self, file_info: Dict, content_hash: str, rows: int, table_name: str):
+        """Store the outcome of a successful ingestion"""
+        with self._lock:
+            self.entries[file_info['id']] = {
+                'name': file_info.get('name'),
+                'modified_time': file_info.get('modifiedTime'),
+                'size': file_info.get('size'),
+                'content_hash': content_hash,
+                'rows': int(rows),
+                'table': table_name,
+                'ingested_at': datetime.now().isoformat()
+            }
+    
+    def refresh(self, file_info: Dict):
+        """Adopt new Drive metadata for a file whose bytes matched its entry"""
+        with self._lock:
+            entry = self.entries.get(file_info['id'])
+            if entry is not None:
+                entry.update(
+                    name=file_info.get('name'),
+                    modified_time=file_info.get('modifiedTime'),
+                    size=file_info.get('size')
+                )
+    
+    def save(self):
+        """Atomically write the manifest to disk"""
+        with self._lock:
+            payload = {'version': self.VERSION, 'files': dict(self.entries)}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
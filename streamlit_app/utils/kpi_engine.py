@@ -8,52 +8,55 @@ from typing import Dict, List, Optional
 class KPIEngine:
     """Calculate all financial KPIs - Requirement 3"""
     
-    def calculate_aum(self, portfolios: pd.DataFrame) - float:
+    def calculate_aum(self, portfolios: pd.DataFrame) -> float:
         """Assets Under Management"""
         return portfolios['balance'].sum() if not portfolios.empty else 0
     
-    def calculate_active_clients(self, customers: pd.DataFrame) - int:
+    def calculate_active_clients(self, customers: pd.DataFrame) -> int:
         """Count of active clients"""
         return len(customers[customers.get('is_active', True)])
     
-    def calculate_churn_rate(self, customers: pd.DataFrame, period_days: int  90) - float:
+    def calculate_churn_rate(self, customers: pd.DataFrame, period_days: int = 90) -> float:
         """Churn rate calculation"""
         if customers.empty:
             return 0
         
-        cutoff_date  datetime.now() - timedelta(daysperiod_days)
-        inactive  customers[customers['last_activity_date']  cutoff_date]
+        cutoff_date = datetime.now() - timedelta(days=period_days)
+        inactive = customers[customers['last_activity_date'] < cutoff_date]
         return len(inactive) / len(customers) * 100
     
-    def calculate_default_rate(self, risk_events: pd.DataFrame) - float:
-        """Default rate (DPD  90)"""
+    def calculate_default_rate(self, risk_events: pd.DataFrame) -> float:
+        """Default rate (DPD > 90)"""
         if risk_events.empty:
-        return len(risk_events[risk_events['dpd']  90]) / len(risk_events) * 100
+            return 0
+        return len(risk_events[risk_events['dpd'] > 90]) / len(risk_events) * 100
     
-    def calculate_ltv_cac(self, customers: pd.DataFrame, channel: Optional[str]  None) - Dict:
+    def calculate_ltv_cac(self, customers: pd.DataFrame, channel: Optional[str] = None) -> Dict:
         """LTV:CAC ratio by channel"""
+        if customers.empty:
             return {}
         
         if channel:
-            customers  customers[customers['channel']  channel]
+            customers = customers[customers['channel'] == channel]
         
-        ltv  customers['total_revenue'].sum()
-        cac  customers['acquisition_cost'].sum()
+        ltv = customers['total_revenue'].sum()
+        cac = customers['acquisition_cost'].sum()
         
         return {
             'ltv': ltv,
             'cac': cac,
-            'ratio': ltv / cac if cac  0 else 0
+            'ratio': ltv / cac if cac > 0 else 0
         }
     
-    def calculate_nrr(self, revenue: pd.DataFrame) - float:
+    def calculate_nrr(self, revenue: pd.DataFrame) -> float:
         """Net Revenue Retention"""
         if revenue.empty:
+            return 0
         
-        current_month  revenue[revenue['month']  revenue['month'].max()]
-        previous_month  revenue[revenue['month']  revenue['month'].max() - 1]
+        current_month = revenue[revenue['month'] == revenue['month'].max()]
+        previous_month = revenue[revenue['month'] == revenue['month'].max() - 1]
         
-        current_total  current_month['revenue'].sum()
-        previous_total  previous_month['revenue'].sum()
+        current_total = current_month['revenue'].sum()
+        previous_total = previous_month['revenue'].sum()
         
-        return (current_total / previous_total * 100) if previous_total  0 else 0
+        return (current_total / previous_total * 100) if previous_total > 0 else 0
@@ -0,0 +1,121 @@
+"""
+Parquet Landing Zone - local columnar copy of every normalized frame
+Partitioned as source_type=<type>/ingest_date=<YYYY-MM-DD>/<file name>-<file id>.parquet
+"""
+
+import glob
+import json
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+class ParquetLandingZone:
+    """Writes normalized frames to partitioned Parquet and reads them back for replay"""
+    
+    METADATA_KEY = b'abaco_ingestion'
+    
+    PART = re.compile(r'-part-(\d{5})')
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    @staticmethod
+    def _file_stem(file_name: str, file_id: Optional[str] = None) -> str:
+        """
+        Filesystem-safe name keeping the extension, plus the Drive file id
+        
+        ``x.csv`` and ``x.xlsx``, or same-named files of different folders,
+        land under different names.
+        """
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', os.path.basename(file_name)).strip('_') or 'file'
+        if file_id:
+            stem = f"{stem}-{re.sub(r'[^A-Za-z0-9_-]+', '_', file_id)}"
+        return stem
+    
+    def partition_dir(self, source_type: Optional[str], ingest_date: Optional[date] = None) -> Path:
+        """Directory for one source type and ingestion day"""
+        ingest_date = ingest_date or date.today()
+        return self.root / f'source_type={source_type or "unknown"}' / f'ingest_date={ingest_date.isoformat()}'
+    
+    def write(
+        self,
+        df: pd.DataFrame,
+        source_type: Optional[str],
+        file_name: str,
+        metadata: Optional[Dict] = None,
+        part: Optional[int] = None,
+        ingest_date: Optional[date] = None,
+        file_id: Optional[str] = None
+    ) -> str:
+        """
+        Atomically write one normalized frame (or one streamed chunk, ``part``)
+        
+        ``metadata`` (target table, conflict keys, Drive file id...) is stored
+        in the Parquet schema so replays need nothing but the file.
+        """
+        directory = self.partition_dir(source_type, ingest_date)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = self._file_stem(file_name, file_id)
+        if part is not None:
+            name = f'{name}-part-{part:05d}'
+        path = directory / f'{name}.parquet'
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        file_metadata = dict(table.schema.metadata or {})
+        file_metadata[self.METADATA_KEY] = json.dumps(
+            {'source_type': source_type, 'file_name': file_name, **(metadata or {})},
+            default=str
+        ).encode('utf-8')
+        table = table.replace_schema_metadata(file_metadata)
+        
+        tmp_path = path.with_suffix('.parquet.tmp')
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        return str(path)
+    
+    def discard(
+        self,
+        file_name: str,
+        file_id: Optional[str] = None,
+        from_part: int = 0,
+        ingest_date: Optional[date] = None
+    ) -> List[str]:
+        """
+        Remove a file's landed frames of one day from part ``from_part`` on
+        
+        Called before a file is landed again, so parts a shorter re-run no
+        longer writes are not replayed. Parts below ``from_part`` (committed
+        by the run being resumed) are kept. Every source type is searched,
+        as a file can be classified differently between runs.
+        """
+        ingest_date = ingest_date or date.today()
+        name = self._file_stem(file_name, file_id)
+        removed = []
+        for path in self.root.glob(f'source_type=*/ingest_date={ingest_date.isoformat()}/{glob.escape(name)}*.parquet'):
+            suffix = path.stem[len(name):]
+            part = self.PART.fullmatch(suffix) if suffix else None
+            if suffix and part is None:
+                continue  # Another file whose name extends this one
+            if part is None or int(part.group(1)) >= from_part:
+                path.unlink()
+                removed.append(str(path))
+        return sorted(removed)
+    
+    def list_files(self, source_type: Optional[str] = None, ingest_date: Optional[str] = None) -> List[str]:
+        """Parquet files in the zone, optionally filtered by partition, in stable order"""
+        source_glob = f'source_type={source_type}' if source_type else 'source_type=*'
+        date_glob = f'ingest_date={ingest_date}' if ingest_date else 'ingest_date=*'
+        return sorted(str(path) for path in self.root.glob(f'{source_glob}/{date_glob}/*.parquet'))
+    
+    def read(self, path: str) -> Tuple[pd.DataFrame, Dict]:
+        """Load a landed frame with the ingestion metadata written alongside it"""
+        table = pq.read_table(path)
+        raw = (table.schema.metadata or {}).get(self.METADATA_KEY)
+        metadata = json.loads(raw.decode('utf-8')) if raw else {}
+        return table.to_pandas(), metadata
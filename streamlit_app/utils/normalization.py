@@ -0,0 +1,130 @@
+"""
+Normalization Engine - compiled cleaning plans for ingested frames
+Infers column roles once from a sample and applies them in one vectorized pass
+"""
+
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - pandas fallback below
+    pa = None
+    pc = None
+
+class ColumnRole(Enum):
+    """How a column is cleaned during normalization"""
+    NUMERIC = "numeric"
+    DATE = "date"
+    TEXT = "text"
+    PASSTHROUGH = "passthrough"
+
+@dataclass(frozen=True)
+class NormalizationPlan:
+    """Column roles compiled for one source type and column layout"""
+    source_type: Optional[str]
+    signature: Tuple
+    roles: Dict[str, ColumnRole]
+
+class NormalizationEngine:
+    """Builds, caches and applies normalization plans - Requirement 1"""
+    
+    # Currency symbols, thousands separators and percent signs
+    CLEAN_PATTERN = r'[$,₡€%]'
+    NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+    
+    METADATA_COLUMNS = ['workbook_name', 'refresh_date']
+    IDENTIFIER_TOKENS = {'id', 'code', 'name'}
+    DATE_MARKERS = ['date', 'fecha']
+    
+    SAMPLE_SIZE = 500
+    NUMERIC_MIN_RATIO = 0.5
+    
+    def __init__(self):
+        self._plans: Dict[Tuple, NormalizationPlan] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def clean_numeric(cls, series: pd.Series) -> pd.Series:
+        """Tolerant numeric conversion with one regex pass (pyarrow kernels when available)"""
+        if series.dtype != 'object' and not pd.api.types.is_string_dtype(series):
+            return series
+        
+        if pa is None:
+            cleaned = series.astype(str).str.replace(cls.CLEAN_PATTERN, '', regex=True).str.strip()
+            return pd.to_numeric(cleaned, errors='coerce')
+        
+        try:
+            values = pa.array(series, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed objects (e.g. floats and strings from Excel cells)
+            values = pa.array(series.astype(str), type=pa.string())
+        
+        cleaned = pc.utf8_trim_whitespace(pc.replace_substring_regex(values, cls.CLEAN_PATTERN, ''))
+        valid = pc.match_substring_regex(cleaned, cls.NUMBER_PATTERN)
+        numbers = pc.cast(pc.if_else(valid, cleaned, pa.scalar(None, pa.string())), pa.float64())
+        
+        result = numbers.to_numpy(zero_copy_only=False)
+        # Match pd.to_numeric: integer columns without gaps stay int64
+        if numbers.null_count == 0 and len(result) and np.all(np.mod(result, 1) == 0):
+            result = result.astype(np.int64)
+        return pd.Series(result, index=series.index, name=series.name)
+    
+    def infer_role(self, column: str, sample: pd.Series) -> ColumnRole:
+        """Infer a column role from its name and a sample of values"""
+        if column in self.METADATA_COLUMNS:
+            return ColumnRole.PASSTHROUGH
+        if any(marker in column for marker in self.DATE_MARKERS):
+            return ColumnRole.DATE
+        if self.IDENTIFIER_TOKENS.intersection(column.split('_')):
+            return ColumnRole.TEXT
+        if pd.api.types.is_numeric_dtype(sample) or pd.api.types.is_datetime64_any_dtype(sample):
+            return ColumnRole.PASSTHROUGH
+        
+        non_null = sample.dropna()
+        if non_null.empty:
+            return ColumnRole.NUMERIC
+        parsed = self.clean_numeric(non_null.astype(str))
+        return ColumnRole.NUMERIC if parsed.notna().mean() >= self.NUMERIC_MIN_RATIO else ColumnRole.TEXT
+    
+    def plan_for(self, df: pd.DataFrame, source_type: Optional[str] = None) -> NormalizationPlan:
+        """Cached plan for this source type and column layout"""
+        signature = tuple((col, dtype.kind) for col, dtype in df.dtypes.items())
+        key = (source_type, signature)
+        with self._lock:
+            plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        
+        sample = df.head(self.SAMPLE_SIZE)
+        roles = {col: self.infer_role(col, sample.iloc[:, i]) for i, col in enumerate(df.columns)}
+        plan = NormalizationPlan(source_type=source_type, signature=signature, roles=roles)
+        with self._lock:
+            self._plans[key] = plan
+        return plan
+    
+    def apply(self, df: pd.DataFrame, plan: NormalizationPlan) -> pd.DataFrame:
+        """Apply a plan, building the cleaned frame in one pass"""
+        columns = {}
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            role = plan.roles.get(col, ColumnRole.PASSTHROUGH)
+            if role == ColumnRole.NUMERIC:
+                series = self.clean_numeric(series)
+            elif role == ColumnRole.DATE and not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, errors='coerce')
+            columns[i] = series
+        # Keyed by position so duplicate column names survive
+        result = pd.DataFrame(columns, index=df.index)
+        result.columns = df.columns
+        return result
+    
+    def normalize(self, df: pd.DataFrame, source_type: Optional[str] = None) -> pd.DataFrame:
+        """Plan (cached) and apply in one call"""
+        return self.apply(df, self.plan_for(df, source_type))
@@ -0,0 +1,276 @@
+"""
+Parallel Feature Build - ml_feature_snapshots across worker processes
+Raw tables are hash-partitioned by customer_id and handed to workers as Arrow IPC files
+"""
+
+import math
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .feature_engineering import FeatureEngineer
+from .sketches import RunningMoments
+
+def _write_frame(frame, path: str):
+    """
+    DataFrame or Arrow table as an Arrow IPC file at ``path``; DataFrames
+    whose columns Arrow cannot type are pickled instead
+    """
+    if isinstance(frame, pa.Table):
+        feather.write_feather(frame, path + '.arrow', compression='uncompressed')
+        return
+    try:
+        feather.write_feather(frame.reset_index(drop=True), path + '.arrow', compression='uncompressed')
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError, TypeError):
+        # Mixed-type object columns (e.g. ids that are partly numbers)
+        if os.path.exists(path + '.arrow'):
+            os.remove(path + '.arrow')
+        with open(path + '.pkl', 'wb') as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _read_frame(path: str, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+    """Rows ``start:stop`` of a ``_write_frame`` file; Arrow files are memory-mapped"""
+    if os.path.exists(path + '.arrow'):
+        table = feather.read_table(path + '.arrow', memory_map=True)
+        stop = table.num_rows if stop is None else stop
+        return table.slice(start, stop - start).to_pandas()
+    with open(path + '.pkl', 'rb') as f:
+        return pickle.load(f).iloc[start:stop]
+
+def _read_frames(paths: List[str]) -> Optional[pd.DataFrame]:
+    """Concatenation of the ``paths`` that exist, in order (None when none do)"""
+    arrow = [path for path in paths if os.path.exists(path + '.arrow')]
+    pickled = [path for path in paths if os.path.exists(path + '.pkl')]
+    if not arrow and not pickled:
+        return None
+    if not pickled:
+        # One Arrow concatenation converts each column to pandas once
+        tables = [feather.read_table(path + '.arrow', memory_map=True) for path in arrow]
+        return pa.concat_tables(tables, promote_options='default').to_pandas()
+    existing = [path for path in paths if path in arrow or path in pickled]
+    return pd.concat([_read_frame(path) for path in existing], ignore_index=True)
+
+def _piece(directory: str, name: str, chunk: int) -> str:
+    return os.path.join(directory, f'{name}-{chunk:04d}')
+
+def _arrow_partition_ids(customer_ids: pa.ChunkedArray, partitions: int) -> np.ndarray:
+    """``partition_ids`` of an Arrow text column, hashing each distinct id once"""
+    if pa.types.is_null(customer_ids.type):
+        return np.full(len(customer_ids), -1, dtype=np.int64)
+    encoded = customer_ids.combine_chunks().dictionary_encode()
+    uniques = pd.Series(encoded.dictionary.to_numpy(zero_copy_only=False), dtype=object)
+    indices = encoded.indices
+    partition = ParallelFeatureRunner.partition_ids(uniques, partitions)[
+        indices.fill_null(0).to_numpy(zero_copy_only=False)
+    ]
+    partition[indices.is_null().to_numpy(zero_copy_only=False)] = -1
+    return partition
+
+def _split_chunk(name: str, source: str, start: int, stop: int, chunk: int, directories: List[str]):
+    """
+    Worker step 1: scatter one row chunk of a raw frame into its customer partitions
+    
+    Arrow chunks stay Arrow tables end to end, so no text is converted to
+    Python objects here.
+    """
+    partitions = len(directories)
+    if os.path.exists(source + '.arrow'):
+        frame = feather.read_table(source + '.arrow', memory_map=True).slice(start, stop - start)
+        partition = _arrow_partition_ids(frame.column('customer_id'), partitions)
+    else:
+        frame = _read_frame(source, start, stop)
+        partition = ParallelFeatureRunner.partition_ids(frame['customer_id'], partitions)
+    order = np.argsort(partition, kind='stable')
+    bounds = np.searchsorted(partition[order], np.arange(-1, partitions + 1))
+    for i, directory in enumerate(directories):
+        rows = order[bounds[i + 1]:bounds[i + 2]]
+        if len(rows):
+            _write_frame(frame.take(rows), _piece(directory, name, chunk))
+
+def _aggregate_partition(
+    engineer: FeatureEngineer,
+    directory: str,
+    chunks: Dict[str, int],
+    as_of: pd.Timestamp
+) -> Dict:
+    """Worker step 2: partition aggregates to disk, z-score moments of its customers back"""
+    frames = {
+        name: _read_frames([_piece(directory, name, chunk) for chunk in range(chunks.get(name, 0))])
+        for name in engineer.RAW_COLUMNS
+    }
+    aggregates = engineer.aggregate_customers(**frames, as_of=as_of)
+    _write_frame(aggregates, os.path.join(directory, 'aggregates'))
+    metrics = engineer.zscore_metrics(aggregates)
+    moments = {}
+    for metric in engineer.ZSCORE_METRICS:
+        running = RunningMoments()
+        running.update(metrics[metric].to_numpy())
+        moments[metric] = running.to_dict()
+    return moments
+
+def _snapshot_partition(
+    engineer: FeatureEngineer,
+    directory: str,
+    as_of: pd.Timestamp,
+    moments: Dict[str, Tuple[float, float]]
+) -> str:
+    """Worker step 3: snapshot rows against the population moments"""
+    aggregates = _read_frame(os.path.join(directory, 'aggregates'))
+    snapshots = engineer.snapshots_from_aggregates(aggregates, as_of, moments)
+    path = os.path.join(directory, 'snapshots')
+    _write_frame(snapshots, path)
+    return path
+
+class ParallelFeatureRunner:
+    """
+    ``FeatureEngineer.build_feature_snapshots`` over customer_id partitions
+    
+    Every row of a customer lands in the same hash partition, so
+    partitions are aggregated independently in spawned workers:
+    
+    1. Each raw frame is written once as an Arrow IPC file; workers
+       memory-map row chunks of it and scatter them into partitions.
+    2. Workers aggregate one partition each and return only its z-score
+       moments, merged (Chan) into the population moments.
+    3. Workers derive snapshot rows against those moments, so z-scores
+       match a single-process build.
+    
+    A worker holds one chunk or one partition at a time, so its peak memory
+    is bounded by ``chunk_rows`` and the partition size; use more
+    ``partitions`` than ``workers`` to lower the latter. Rows come out
+    grouped by partition rather than in first-seen order.
+    """
+    
+    CHUNK_ROWS = 1_000_000
+    MIN_CHUNK_ROWS = 50_000
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        partitions: Optional[int] = None,
+        engineer: Optional[FeatureEngineer] = None,
+        work_dir: Optional[str] = None,
+        chunk_rows: int = CHUNK_ROWS
+    ):
+        """
+        Args:
+            workers: Worker processes (defaults to the CPU count)
+            partitions: customer_id hash partitions (defaults to ``workers``)
+            engineer: Supplies thresholds and the snapshot derivation
+            work_dir: Parent of the scratch directory (system temp by default)
+            chunk_rows: Largest raw row chunk a worker scatters at once
+        """
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.partitions = max(1, int(partitions or self.workers))
+        self.engineer = engineer or FeatureEngineer()
+        self.work_dir = work_dir
+        self.chunk_rows = max(1, int(chunk_rows))
+    
+    @staticmethod
+    def partition_ids(customer_ids: pd.Series, partitions: int) -> np.ndarray:
+        """
+        Stable partition per row (-1 without a customer_id)
+        
+        Non-text ids are hashed as text, as FeatureEngineer keys them.
+        """
+        present = customer_ids.notna().to_numpy()
+        keys = customer_ids.astype(str) if customer_ids.dtype != object else customer_ids
+        hashes = pd.util.hash_array(keys.to_numpy(dtype=object)[present], categorize=False)
+        result = np.full(len(customer_ids), -1, dtype=np.int64)
+        result[present] = (hashes % np.uint64(partitions)).astype(np.int64)
+        return result
+    
+    def _chunk_bounds(self, rows: int) -> List[Tuple[int, int]]:
+        """Row ranges of a frame, enough of them to keep every worker busy"""
+        size = min(self.chunk_rows, max(self.MIN_CHUNK_ROWS, math.ceil(rows / self.workers)))
+        return [(start, min(start + size, rows)) for start in range(0, rows, size)]
+    
+    @staticmethod
+    def _map(pool: Optional[ProcessPoolExecutor], function, *iterables) -> List:
+        if pool is None:
+            return list(map(function, *iterables))
+        return list(pool.map(function, *iterables))
+    
+    def run(
+        self,
+        portfolios: Optional[pd.DataFrame] = None,
+        payments: Optional[pd.DataFrame] = None,
+        facilities: Optional[pd.DataFrame] = None,
+        risk_events: Optional[pd.DataFrame] = None,
+        revenue: Optional[pd.DataFrame] = None,
+        collections: Optional[pd.DataFrame] = None,
+        marketing: Optional[pd.DataFrame] = None,
+        customers: Optional[pd.DataFrame] = None,
+        industry: Optional[pd.DataFrame] = None,
+        as_of: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Build ml_feature_snapshots rows for every customer
+        
+        Returns:
+            DataFrame with FeatureEngineer.SNAPSHOT_COLUMNS, one row per
+            customer_id
+        """
+        as_of = self.engineer._as_of(as_of)
+        frames = {
+            'portfolios': portfolios, 'payments': payments, 'facilities': facilities,
+            'risk_events': risk_events, 'revenue': revenue, 'collections': collections,
+            'marketing': marketing, 'customers': customers, 'industry': industry
+        }
+        
+        with tempfile.TemporaryDirectory(prefix='features-', dir=self.work_dir) as scratch:
+            directories = [os.path.join(scratch, f'part-{i:04d}') for i in range(self.partitions)]
+            for directory in directories:
+                os.makedirs(directory)
+            
+            # Only the handoff files are written here; hashing happens in workers
+            splits, chunks = [], {}
+            for name, frame in frames.items():
+                if frame is None:
+                    continue
+                frame = self.engineer._frame(frame, self.engineer.RAW_COLUMNS[name])
+                ids = frame['customer_id']
+                if ids.dtype != object:
+                    # Text keys, as FeatureEngineer._customer_codes uses them
+                    frame = frame.assign(customer_id=ids.astype(str).where(ids.notna()))
+                source = os.path.join(scratch, name)
+                _write_frame(frame, source)
+                bounds = self._chunk_bounds(len(frame))
+                chunks[name] = len(bounds)
+                splits += [(name, source, start, stop, chunk) for chunk, (start, stop) in enumerate(bounds)]
+            
+            workers = min(self.workers, max(self.partitions, len(splits)))
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) if workers > 1 else None
+            try:
+                if splits:
+                    self._map(pool, _split_chunk, *zip(*splits), [directories] * len(splits))
+                
+                engineers, dates = [self.engineer] * self.partitions, [as_of] * self.partitions
+                partials = self._map(pool, _aggregate_partition, engineers, directories, [chunks] * self.partitions, dates)
+                
+                moments = {}
+                for metric in self.engineer.ZSCORE_METRICS:
+                    merged = RunningMoments()
+                    for partial in partials:
+                        merged.merge(RunningMoments.from_dict(partial[metric]))
+                    moments[metric] = (merged.mean if merged.count else np.nan, merged.std())
+                
+                paths = self._map(pool, _snapshot_partition, engineers, directories, dates, [moments] * self.partitions)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            
+            snapshots = _read_frames(paths)[self.engineer.SNAPSHOT_COLUMNS]
+        # Arrow hands text nulls back as None; pandas' own frames carry NaN
+        for column in snapshots.columns[snapshots.dtypes == object]:
+            snapshots[column] = snapshots[column].where(snapshots[column].notna(), np.nan)
+        return snapshots
@@ -0,0 +1,179 @@
+"""
+Data Quality Profiler - single-pass, column-parallel and mergeable
+Each column is scanned once for nulls, zeros, distincts, min/max and quantiles
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sketches import HyperLogLog, TDigest
+
+def _finite(value, digits: Optional[int] = None) -> Optional[float]:
+    """JSON-safe float: ±inf and NaN (invalid in JSONB) become None"""
+    value = float(value)
+    if not np.isfinite(value):
+        return None
+    return value if digits is None else round(value, digits)
+
+class ColumnProfile:
+    """Mergeable statistics for one column"""
+    
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind  # 'numeric', 'datetime' or 'text'
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.distinct = HyperLogLog()
+        self.digest = TDigest() if kind == 'numeric' else None
+    
+    @staticmethod
+    def kind_of(series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series):
+            return 'text'
+        if pd.api.types.is_numeric_dtype(series):
+            return 'numeric'
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return 'datetime'
+        return 'text'
+    
+    @property
+    def has_values(self) -> bool:
+        return self.rows > self.nulls
+    
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        if other.has_values and not self.has_values:
+            # Nothing typed on this side yet (e.g. an all-null chunk)
+            self.kind, self.min, self.max, self.digest = other.kind, other.min, other.max, other.digest
+        elif other.has_values and other.kind != self.kind:
+            # Column typed differently across chunks: min/max are not comparable
+            self.kind, self.min, self.max, self.digest = 'text', None, None, None
+        elif other.has_values:
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+                self.max = other.max if self.max is None else max(self.max, other.max)
+            if self.digest is not None and other.digest is not None:
+                self.digest.merge(other.digest)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.distinct.merge(other.distinct)
+        return self
+    
+    def to_dict(self, quantiles: Sequence[float]) -> Dict:
+        result = {
+            'kind': self.kind,
+            'nulls': int(self.nulls),
+            'null_percentage': round(self.nulls / self.rows * 100, 2) if self.rows else 0,
+            'distinct_approx': self.distinct.estimate()
+        }
+        if self.min is not None:
+            as_json = (lambda v: v.isoformat()) if self.kind == 'datetime' else _finite
+            result['min'] = as_json(self.min)
+            result['max'] = as_json(self.max)
+        if self.digest is not None and self.digest.count:
+            result['quantiles'] = {f'p{round(q * 100):02d}': _finite(self.digest.quantile(q), 6) for q in quantiles}
+        return result
+
+class QualityProfile:
+    """Per-column profiles plus the row-level all-zero count; merge chunk profiles in order"""
+    
+    def __init__(self):
+        self.rows = 0
+        self.zero_rows = 0
+        self.columns: Dict[Tuple[str, int], ColumnProfile] = {}
+    
+    @property
+    def total_columns(self) -> int:
+        return len(self.columns)
+    
+    @property
+    def null_cells(self) -> int:
+        return sum(column.nulls for column in self.columns.values())
+    
+    def nulls_in(self, names: Sequence[str]) -> int:
+        return sum(column.nulls for (name, _), column in self.columns.items() if name in names)
+    
+    def merge(self, other: 'QualityProfile') -> 'QualityProfile':
+        self.rows += other.rows
+        self.zero_rows += other.zero_rows
+        for key, column in other.columns.items():
+            if key in self.columns:
+                self.columns[key].merge(column)
+            else:
+                self.columns[key] = column
+        return self
+
+class DataQualityProfiler:
+    """Builds QualityProfiles, optionally scanning columns on a thread pool"""
+    
+    QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+    
+    def __init__(self, max_workers: int = 1, quantiles: Sequence[float] = QUANTILES):
+        """
+        Args:
+            max_workers: Columns scanned concurrently (numpy/pandas kernels
+                release the GIL for most of the work)
+            quantiles: Quantiles reported for numeric columns
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.quantiles = tuple(quantiles)
+    
+    @staticmethod
+    def _scan(name: str, series: pd.Series) -> Tuple[ColumnProfile, Optional[np.ndarray]]:
+        """One column: profile plus its zero mask (numeric columns only)"""
+        profile = ColumnProfile(name, ColumnProfile.kind_of(series))
+        profile.rows = len(series)
+        null_mask = series.isna().to_numpy()
+        profile.nulls = int(null_mask.sum())
+        values = series[~null_mask]
+        profile.distinct.update(values)
+        
+        zero_mask = None
+        if profile.kind == 'numeric':
+            numbers = values.to_numpy(dtype=np.float64)
+            zero_mask = np.zeros(len(series), dtype=bool)
+            zero_mask[~null_mask] = numbers == 0
+            if len(numbers):
+                profile.min, profile.max = float(numbers.min()), float(numbers.max())
+                profile.digest.update(numbers)
+        elif profile.kind == 'datetime' and len(values):
+            profile.min, profile.max = values.min(), values.max()
+        return profile, zero_mask
+    
+    def profile(self, df: pd.DataFrame) -> QualityProfile:
+        """Profile every column of ``df`` in one scan per column"""
+        keyed = []
+        seen: Dict[str, int] = {}
+        for i, name in enumerate(df.columns):
+            # Duplicate column names are profiled separately
+            occurrence = seen.get(name, 0)
+            seen[name] = occurrence + 1
+            keyed.append(((name, occurrence), df.iloc[:, i]))
+        
+        scan = lambda item: self._scan(item[0][0], item[1])
+        if self.max_workers > 1 and len(keyed) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='profile') as pool:
+                results = list(pool.map(scan, keyed))
+        else:
+            results = [scan(item) for item in keyed]
+        
+        result = QualityProfile()
+        result.rows = len(df)
+        all_zero = None
+        for (key, _), (column, zero_mask) in zip(keyed, results):
+            result.columns[key] = column
+            if zero_mask is not None:
+                all_zero = zero_mask if all_zero is None else all_zero & zero_mask
+        result.zero_rows = int(all_zero.sum()) if all_zero is not None else 0
+        return result
+    
+    def column_report(self, profile: QualityProfile) -> Dict[str, Dict]:
+        """JSON-safe per-column statistics"""
+        report = {}
+        for (name, occurrence), column in profile.columns.items():
+            report[name if occurrence == 0 else f'{name}.{occurrence}'] = column.to_dict(self.quantiles)
+        return report
@@ -0,0 +1,296 @@
+"""
+Reader Backends - pluggable xlsx/csv parsing engines
+Picks the fastest available engine per format with automatic fallback
+"""
+
+import importlib.util
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .schema_registry import ReaderHints, SourceSchema, sniff_csv_header
+
+class ReaderBackend:
+    """Base class for a file parsing engine"""
+    
+    name = 'base'
+    file_format = None
+    required_modules: List[str] = []
+    
+    def is_available(self) -> bool:
+        """True when every module the engine needs can be imported"""
+        return all(importlib.util.find_spec(module) is not None for module in self.required_modules)
+    
+    # Whether read() applies ReaderHints while parsing; other engines are
+    # typed after the fact with ReaderHints.apply
+    typed_parse = False
+    
+    def read(self, fh, hints: Optional[ReaderHints] = None, **options) -> pd.DataFrame:
+        raise NotImplementedError
+    
+    def sheet_names(self, fh) -> List[str]:
+        """Worksheet names in workbook order (workbook engines only)"""
+        raise NotImplementedError
+
+class OpenpyxlExcelReader(ReaderBackend):
+    """pandas.read_excel with the default openpyxl engine"""
+    
+    name = 'openpyxl'
+    file_format = 'xlsx'
+    required_modules = ['openpyxl']
+    
+    def read(self, fh, hints: Optional[ReaderHints] = None, **options) -> pd.DataFrame:
+        return pd.read_excel(fh, engine='openpyxl', **options)
+    
+    def sheet_names(self, fh) -> List[str]:
+        return pd.ExcelFile(fh, engine='openpyxl').sheet_names
+
+class CalamineExcelReader(ReaderBackend):
+    """Rust calamine parser - typically an order of magnitude faster than openpyxl"""
+    
+    name = 'calamine'
+    file_format = 'xlsx'
+    required_modules = ['python_calamine']
+    
+    def read(self, fh, hints: Optional[ReaderHints] = None, sheet_name=0, **options) -> pd.DataFrame:
+        from python_calamine import CalamineWorkbook
+        
+        workbook = CalamineWorkbook.from_filelike(fh)
+        if isinstance(sheet_name, int):
+            sheet = workbook.get_sheet_by_index(sheet_name)
+        else:
+            sheet = workbook.get_sheet_by_name(sheet_name)
+        rows = sheet.to_python()
+        if not rows:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame(rows[1:], columns=[str(col) for col in rows[0]])
+        # calamine reports empty cells as '' where pandas readers produce NaN
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col] != '', np.nan)
+        
+        usecols = options.get('usecols')
+        if usecols is not None:
+            df = df[[col for col in df.columns if col in set(usecols)]]
+        return df
+    
+    def sheet_names(self, fh) -> List[str]:
+        from python_calamine import CalamineWorkbook
+        
+        return list(CalamineWorkbook.from_filelike(fh).sheet_names)
+
+class PandasCsvReader(ReaderBackend):
+    """pandas.read_csv with the C parser"""
+    
+    name = 'pandas'
+    file_format = 'csv'
+    required_modules = ['pandas']
+    
+    typed_parse = True
+    
+    def read(self, fh, hints: Optional[ReaderHints] = None, **options) -> pd.DataFrame:
+        if hints is not None:
+            options.setdefault('dtype', hints.pandas_dtypes())
+            options.setdefault('parse_dates', hints.parse_dates)
+            if hints.usecols is not None:
+                options.setdefault('usecols', hints.usecols)
+        return pd.read_csv(fh, **options)
+
+class PyArrowCsvReader(ReaderBackend):
+    """Multithreaded pyarrow CSV reader converted to pandas"""
+    
+    name = 'pyarrow'
+    file_format = 'csv'
+    required_modules = ['pyarrow']
+    
+    typed_parse = True
+    
+    def read(self, fh, hints: Optional[ReaderHints] = None, **options) -> pd.DataFrame:
+        from pyarrow import csv
+        
+        usecols = options.get('usecols')
+        if hints is not None and usecols is None:
+            usecols = hints.usecols
+        convert_options = csv.ConvertOptions(
+            strings_can_be_null=True,
+            include_columns=usecols,
+            column_types=hints.arrow_types() if hints is not None else {}
+        )
+        table = csv.read_csv(
+            fh,
+            read_options=csv.ReadOptions(use_threads=True),
+            convert_options=convert_options
+        )
+        return table.to_pandas(date_as_object=False)
+
+# Worker-process state for ReaderRegistry.read_sheets: the workbook bytes
+# are shipped once per worker instead of once per sheet
+_sheet_worker = {}
+
+def _init_sheet_worker(raw: bytes, preferences: Optional[Dict]):
+    _sheet_worker['raw'] = raw
+    _sheet_worker['registry'] = ReaderRegistry(preferences)
+
+def _read_worker_sheet(sheet_name: str, source_type: Optional[str]) -> Tuple[pd.DataFrame, Dict]:
+    fh = io.BytesIO(_sheet_worker['raw'])
+    return _sheet_worker['registry'].read(fh, 'xlsx', source_type, sheet_name=sheet_name)
+
+class ReaderRegistry:
+    """Resolves a reader per file format and source type, with fallback"""
+    
+    BACKENDS = {
+        backend.name: backend for backend in [
+            OpenpyxlExcelReader(),
+            CalamineExcelReader(),
+            PandasCsvReader(),
+            PyArrowCsvReader(),
+        ]
+    }
+    
+    # Fastest first; later engines are fallbacks
+    DEFAULT_PREFERENCES = {
+        'xlsx': ['calamine', 'openpyxl'],
+        'csv': ['pyarrow', 'pandas'],
+    }
+    
+    def __init__(self, preferences: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        """
+        Args:
+            preferences: Per source type engine order, e.g.
+                ``{'payment': {'csv': ['pandas']}}``; the ``'*'`` key
+                overrides the defaults for every source type
+        """
+        self.preferences = preferences or {}
+        # (source_type, engine) pairs whose numeric/date hints failed before;
+        # later files of that source go straight to the relaxed hints
+        self._relaxed = set()
+    
+    def candidates(self, file_format: str, source_type: Optional[str] = None) -> List[ReaderBackend]:
+        """Available backends for a format, in preference order"""
+        order = (
+            self.preferences.get(source_type, {}).get(file_format) or
+            self.preferences.get('*', {}).get(file_format) or
+            self.DEFAULT_PREFERENCES.get(file_format, [])
+        )
+        backends = [self.BACKENDS[name] for name in order if name in self.BACKENDS]
+        return [backend for backend in backends if backend.file_format == file_format and backend.is_available()]
+    
+    def read(
+        self,
+        fh: io.BytesIO,
+        file_format: str,
+        source_type: Optional[str] = None,
+        schema: Optional[SourceSchema] = None,
+        prune_columns: bool = False,
+        **options
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Parse ``fh`` with the first engine that succeeds
+        
+        With a ``schema``, CSV engines receive dtype/parse_dates/usecols
+        hints up front (matched against the sniffed header); other engines
+        are typed right after parsing. A typed parse that fails on
+        formatted values (e.g. '$1,000') is retried with string-safe hints
+        only, leaving those columns to the normalization engine.
+        
+        Returns:
+            (DataFrame, stats) - stats carry engine, bytes, seconds, mb_per_s,
+            typed ('full'/'relaxed' when hints were used) and any fallback errors
+        """
+        size = fh.getbuffer().nbytes if isinstance(fh, io.BytesIO) else None
+        errors = {}
+        
+        hints = None
+        if schema is not None and file_format == 'csv' and isinstance(fh, io.BytesIO):
+            hints = schema.reader_hints(sniff_csv_header(bytes(fh.getbuffer()[:65536])), prune=prune_columns)
+        
+        for backend in self.candidates(file_format, source_type):
+            started = time.perf_counter()
+            try:
+                df, typed = self._read_typed(backend, fh, hints, source_type, **options)
+            except Exception as e:
+                errors[backend.name] = str(e)
+                continue
+            if schema is not None and not backend.typed_parse:
+                df = schema.reader_hints(df.columns, prune=prune_columns).apply(df)
+                typed = 'full'
+            seconds = time.perf_counter() - started
+            stats = {
+                'engine': backend.name,
+                'bytes': size,
+                'seconds': round(seconds, 4),
+                'mb_per_s': round(size / 1_048_576 / seconds, 2) if size and seconds > 0 else None
+            }
+            if typed:
+                stats['typed'] = typed
+            if errors:
+                stats['fallback_errors'] = errors
+            return df, stats
+        
+        raise ValueError(f'No {file_format} reader succeeded: {errors or "no engine available"}')
+    
+    def sheet_names(self, fh: io.BytesIO, source_type: Optional[str] = None) -> List[str]:
+        """Worksheet names from the first xlsx engine that can open the workbook"""
+        errors = {}
+        for backend in self.candidates('xlsx', source_type):
+            fh.seek(0)
+            try:
+                return backend.sheet_names(fh)
+            except Exception as e:
+                errors[backend.name] = str(e)
+        raise ValueError(f'No xlsx reader could list sheets: {errors or "no engine available"}')
+    
+    def read_sheets(
+        self,
+        fh: io.BytesIO,
+        sheet_names: Sequence[str],
+        source_type: Optional[str] = None,
+        workers: int = 1
+    ) -> List[Tuple[pd.DataFrame, Dict]]:
+        """
+        Parse several worksheets, in ``sheet_names`` order
+        
+        With ``workers`` > 1 sheets are parsed in that many spawned worker
+        processes (xlsx parsing holds the GIL), which pays off once sheets
+        are large enough to outweigh process start-up.
+        """
+        workers = min(max(1, int(workers)), len(sheet_names))
+        if workers == 1:
+            return [self.read(fh, 'xlsx', source_type, sheet_name=name) for name in sheet_names]
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context('spawn'),
+            initializer=_init_sheet_worker,
+            initargs=(fh.getvalue(), self.preferences)
+        ) as pool:
+            return list(pool.map(_read_worker_sheet, sheet_names, [source_type] * len(sheet_names)))
+    
+    def _read_typed(
+        self,
+        backend: ReaderBackend,
+        fh: io.BytesIO,
+        hints: Optional[ReaderHints],
+        source_type: Optional[str],
+        **options
+    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        """One engine, typed hints first and string-safe hints on a conversion error"""
+        if hints is None or not backend.typed_parse:
+            fh.seek(0)
+            return backend.read(fh, **options), None
+        
+        key = (source_type, backend.name)
+        if not hints.is_relaxed and key not in self._relaxed:
+            fh.seek(0)
+            try:
+                return backend.read(fh, hints=hints, **options), 'full'
+            except (ValueError, TypeError):
+                # ArrowInvalid subclasses ValueError
+                self._relaxed.add(key)
+        fh.seek(0)
+        return backend.read(fh, hints=hints.relaxed(), **options), 'relaxed'
@@ -0,0 +1,282 @@
+"""
+Schema Registry - typed column contracts for the 9 source types
+Feeds dtype/parse_dates/usecols hints to readers so columns are typed at parse time
+"""
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pandas readers only
+    pa = None
+
+def normalize_column_name(column) -> str:
+    """Lowercase/underscore column name - Requirement 1"""
+    name = re.sub(r'[^a-z0-9_]', '_', str(column).lower().strip().replace(' ', '_'))
+    # Remove duplicate underscores
+    return re.sub(r'_+', '_', name).strip('_')
+
+def sniff_csv_header(raw: bytes) -> List[str]:
+    """Column names from the first line of a CSV payload"""
+    first_line = raw.split(b'\n', 1)[0].decode('utf-8-sig', errors='replace')
+    return next(csv.reader(io.StringIO(first_line)), [])
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """
+    One declared column
+    
+    dtype is one of 'string', 'float', 'integer', 'datetime', 'category';
+    categories, when set, is the allowed domain of a categorical column.
+    """
+    name: str
+    dtype: str
+    nullable: bool = True
+    categories: Optional[Tuple[str, ...]] = None
+
+@dataclass(frozen=True)
+class ReaderHints:
+    """Parse-time typing for one file, keyed by the file's raw header names"""
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    usecols: Optional[List[str]] = None
+    
+    # Types that cannot fail to parse; numbers and timestamps can
+    # ('$1,000' is left to the normalization engine)
+    SAFE_TYPES = ('string', 'category')
+    
+    @property
+    def parse_dates(self) -> List[str]:
+        return [col for col, dtype in self.dtypes.items() if dtype == 'datetime']
+    
+    @property
+    def is_relaxed(self) -> bool:
+        return all(dtype in self.SAFE_TYPES for dtype in self.dtypes.values())
+    
+    def relaxed(self) -> 'ReaderHints':
+        """Keep only the hints that can never make a parse fail"""
+        dtypes = {col: dtype for col, dtype in self.dtypes.items() if dtype in self.SAFE_TYPES}
+        return ReaderHints(dtypes=dtypes, usecols=self.usecols)
+    
+    def pandas_dtypes(self) -> Dict[str, str]:
+        """``dtype=`` argument for pandas.read_csv (dates go through parse_dates)"""
+        mapping = {'string': 'object', 'float': 'float64', 'integer': 'Int32', 'category': 'category'}
+        return {col: mapping[dtype] for col, dtype in self.dtypes.items() if dtype in mapping}
+    
+    def arrow_types(self) -> Dict:
+        """``column_types=`` argument for pyarrow.csv.ConvertOptions"""
+        mapping = {
+            'string': pa.string(),
+            'float': pa.float64(),
+            'integer': pa.int32(),
+            'datetime': pa.timestamp('ns'),
+            'category': pa.dictionary(pa.int32(), pa.string()),
+        }
+        return {col: mapping[dtype] for col, dtype in self.dtypes.items()}
+    
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Type an already parsed frame (engines without parse-time dtypes)
+        
+        Only lossless casts: values that are not already numbers are left
+        for the normalization engine to clean.
+        """
+        if self.usecols is not None:
+            df = df[[col for col in df.columns if col in set(self.usecols)]]
+        for col, dtype in self.dtypes.items():
+            if col not in df.columns or df[col].ndim != 1:
+                continue
+            series = df[col]
+            if dtype == 'category' and series.dtype == object:
+                df[col] = series.astype('category')
+            elif dtype == 'integer' and series.dtype.kind in 'iuf':
+                non_null = series.dropna()
+                if non_null.empty or ((non_null % 1 == 0).all() and non_null.abs().max() < 2 ** 31):
+                    df[col] = series.astype('Int32')
+        return df
+
+@dataclass(frozen=True)
+class SourceSchema:
+    """Typed column contract for one source type"""
+    source_type: str
+    columns: Tuple[ColumnSpec, ...]
+    required: Tuple[str, ...] = ()
+    # Identify a row across files and runs (cross-run dedup)
+    business_keys: Tuple[str, ...] = ()
+    
+    def spec(self, column: str) -> Optional[ColumnSpec]:
+        for spec in self.columns:
+            if spec.name == column:
+                return spec
+        return None
+    
+    def reader_hints(self, raw_columns: Iterable, prune: bool = False) -> ReaderHints:
+        """
+        Hints for a file whose header is ``raw_columns``
+        
+        Raw names are matched after column-name normalization, so
+        'Customer ID' picks up the customer_id spec. With ``prune``,
+        undeclared columns are not parsed at all.
+        """
+        dtypes = {}
+        usecols = []
+        for raw in raw_columns:
+            spec = self.spec(normalize_column_name(raw))
+            if spec is None:
+                continue
+            dtypes[str(raw)] = spec.dtype
+            usecols.append(str(raw))
+        return ReaderHints(dtypes=dtypes, usecols=usecols if prune else None)
+    
+    def violations(self, df: pd.DataFrame) -> Dict[str, Dict[str, int]]:
+        """Nulls in non-nullable columns and values outside categorical domains"""
+        nulls = {}
+        domain = {}
+        for spec in self.columns:
+            if spec.name not in df.columns or df[spec.name].ndim != 1:
+                continue
+            series = df[spec.name]
+            if not spec.nullable:
+                null_count = int(series.isnull().sum())
+                if null_count:
+                    nulls[spec.name] = null_count
+            if spec.categories:
+                outside = int((series.notna() & ~series.astype(object).isin(spec.categories)).sum())
+                if outside:
+                    domain[spec.name] = outside
+        result = {}
+        if nulls:
+            result['nulls'] = nulls
+        if domain:
+            result['domain'] = domain
+        return result
+    
+    def key_columns(self, columns: Iterable[str]) -> List[str]:
+        """Business keys present in ``columns``; empty unless every required key is there"""
+        present = set(columns)
+        if any(key in self.required and key not in present for key in self.business_keys):
+            return []
+        return [key for key in self.business_keys if key in present]
+
+def _schema(
+    source_type: str,
+    required: List[str],
+    *columns: ColumnSpec,
+    keys: Tuple[str, ...] = ()
+) -> SourceSchema:
+    """Schema whose required columns are also declared non-nullable"""
+    specs = tuple(
+        ColumnSpec(spec.name, spec.dtype, nullable=False, categories=spec.categories)
+        if spec.name in required else spec
+        for spec in columns
+    )
+    return SourceSchema(source_type=source_type, columns=specs, required=tuple(required), business_keys=keys)
+
+# Mirrors the raw_* tables of supabase/migrations/20241110_abaco_schema.sql plus the
+# source columns added in 20251115000000_raw_source_columns.sql
+DEFAULT_SCHEMAS = {
+    schema.source_type: schema for schema in [
+        _schema(
+            'portfolio', ['customer_id', 'balance', 'date'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('portfolio_name', 'string'),
+            ColumnSpec('balance', 'float'),
+            ColumnSpec('date', 'datetime'),
+            keys=('customer_id', 'date'),
+        ),
+        _schema(
+            'facility', ['facility_id', 'customer_id', 'limit'],
+            ColumnSpec('facility_id', 'string'),
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('facility_type', 'category'),
+            ColumnSpec('limit', 'float'),
+            ColumnSpec('limit_amount', 'float'),
+            ColumnSpec('apr', 'float'),
+            ColumnSpec('origination_date', 'datetime'),
+            keys=('facility_id',),
+        ),
+        _schema(
+            'customer', ['customer_id', 'name'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('name', 'string'),
+            ColumnSpec('customer_type', 'category', categories=('B2B', 'B2C', 'B2G')),
+            ColumnSpec('industry_code', 'category'),
+            ColumnSpec('segment', 'category', categories=('A', 'B', 'C', 'D', 'E', 'F')),
+            keys=('customer_id',),
+        ),
+        _schema(
+            'payment', ['payment_id', 'customer_id', 'amount', 'date'],
+            ColumnSpec('payment_id', 'string'),
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('amount', 'float'),
+            ColumnSpec('date', 'datetime'),
+            ColumnSpec('payment_date', 'datetime'),
+            ColumnSpec('payment_type', 'category'),
+            keys=('payment_id',),
+        ),
+        _schema(
+            'risk', ['customer_id', 'dpd', 'date'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('dpd', 'integer'),
+            ColumnSpec('date', 'datetime'),
+            ColumnSpec('event_date', 'datetime'),
+            ColumnSpec('event_type', 'category'),
+            ColumnSpec('risk_severity', 'float'),
+            keys=('customer_id', 'date', 'event_type'),
+        ),
+        _schema(
+            'revenue', ['customer_id', 'revenue', 'date'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('revenue', 'float'),
+            ColumnSpec('date', 'datetime'),
+            ColumnSpec('revenue_date', 'datetime'),
+            ColumnSpec('revenue_type', 'category'),
+            keys=('customer_id', 'date', 'revenue_type'),
+        ),
+        _schema(
+            'collections', ['customer_id', 'collected_amount', 'date'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('collected_amount', 'float'),
+            ColumnSpec('date', 'datetime'),
+            ColumnSpec('collection_date', 'datetime'),
+            keys=('customer_id', 'date'),
+        ),
+        _schema(
+            'marketing', ['customer_id', 'channel', 'acquisition_date'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('channel', 'category'),
+            ColumnSpec('acquisition_date', 'datetime'),
+            ColumnSpec('acquisition_cost', 'float'),
+            keys=('customer_id', 'acquisition_date'),
+        ),
+        _schema(
+            'industry', ['customer_id', 'industry_code'],
+            ColumnSpec('customer_id', 'string'),
+            ColumnSpec('industry_code', 'category'),
+            ColumnSpec('industry_name', 'string'),
+            keys=('customer_id',),
+        ),
+    ]
+}
+
+class SchemaRegistry:
+    """Looks up source schemas; custom schemas override the defaults"""
+    
+    def __init__(self, schemas: Optional[Dict[str, SourceSchema]] = None):
+        self.schemas = dict(DEFAULT_SCHEMAS)
+        self.schemas.update(schemas or {})
+    
+    def get(self, source_type: Optional[str]) -> Optional[SourceSchema]:
+        return self.schemas.get(source_type)
+    
+    def register(self, schema: SourceSchema):
+        self.schemas[schema.source_type] = schema
+    
+    def required_columns(self) -> Dict[str, List[str]]:
+        """Required column names per source type"""
+        return {source_type: list(schema.required) for source_type, schema in self.schemas.items()}
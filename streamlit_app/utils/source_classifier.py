@@ -0,0 +1,205 @@
+"""
+Source Type Classifier - filename routing for Drive files
+Aho-Corasick keyword matching with explicit priority, confidence and header fallback
+"""
+
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .schema_registry import normalize_column_name
+
+# Source types in priority order (earlier wins ties) with their filename keywords
+DEFAULT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ('portfolio', ['portfolio', 'portafolio', 'cartera', 'balances']),
+    ('facility', ['facility', 'facilities', 'linea', 'credito', 'limite']),
+    ('customer', ['customer', 'cliente', 'clients']),
+    ('payment', ['payment', 'pago', 'pagos', 'cobro']),
+    ('risk', ['risk', 'riesgo', 'dpd', 'mora']),
+    ('revenue', ['revenue', 'ingreso', 'ingresos']),
+    ('collections', ['collection', 'cobranza', 'recuperacion']),
+    ('marketing', ['marketing', 'adquisicion', 'canal']),
+    ('industry', ['industry', 'industria', 'sector'])
+]
+
+@dataclass(frozen=True)
+class SourceMatch:
+    """
+    Classification of one file
+    
+    method is 'filename', 'header' or 'none'; confidence is the winner's
+    share of the keyword score of every source type the filename matched.
+    """
+    source_type: Optional[str]
+    confidence: float
+    keyword: Optional[str] = None
+    method: str = 'none'
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: every keyword occurrence in one pass over the text"""
+    
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+    
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            state = self._goto[state].setdefault(char, len(self._goto))
+            if state == len(self._goto):
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+        self._output[state].append(keyword)
+    
+    def _link(self):
+        """Breadth-first failure links; outputs inherit their fallback's matches"""
+        # Depth-1 states keep failing to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def find(self, text: str) -> Iterable[Tuple[int, str]]:
+        """Yield (start, keyword) for every occurrence, overlapping ones included"""
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                yield end - len(keyword) + 1, keyword
+
+class SourceTypeClassifier:
+    """
+    Routes filenames to source types
+    
+    Every keyword occurrence scores its length, doubled when it starts a
+    token ('pagos_cobranza' -> 'cobranza' beats 'pagos'). The best score
+    per type competes; equal scores fall back to keyword priority order.
+    Ambiguous or unmatched names can be settled from the file header, and
+    results are memoized per Drive file id.
+    """
+    
+    # Below this confidence a filename match is ambiguous
+    AMBIGUOUS_BELOW = 0.75
+    
+    def __init__(
+        self,
+        keywords: Optional[Sequence[Tuple[str, Sequence[str]]]] = None,
+        required_columns: Optional[Dict[str, Sequence[str]]] = None
+    ):
+        """
+        Args:
+            keywords: (source_type, keywords) in priority order
+                (defaults to DEFAULT_KEYWORDS)
+            required_columns: Normalized required columns per source type,
+                used to sniff headers of ambiguous files
+        """
+        keywords = list(keywords or DEFAULT_KEYWORDS)
+        self.priority = {source_type: rank for rank, (source_type, _) in enumerate(keywords)}
+        self._keyword_types: Dict[str, str] = {}
+        for source_type, words in keywords:
+            for word in words:
+                self._keyword_types.setdefault(word.lower(), source_type)
+        self._automaton = KeywordAutomaton(self._keyword_types)
+        self.required_columns = {
+            source_type: set(columns) for source_type, columns in (required_columns or {}).items()
+        }
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, Tuple[SourceMatch, Dict[str, float]]] = {}
+        self._by_file: Dict[str, Tuple[str, SourceMatch]] = {}
+    
+    def _score_name(self, filename: str) -> Tuple[SourceMatch, Dict[str, float]]:
+        """Filename match plus the best keyword score of every matched type"""
+        with self._lock:
+            cached = self._by_name.get(filename)
+        if cached is not None:
+            return cached
+        
+        text = filename.lower()
+        scores: Dict[str, float] = {}
+        best_keyword: Dict[str, str] = {}
+        for start, keyword in self._automaton.find(text):
+            at_token_start = start == 0 or not text[start - 1].isalnum()
+            score = len(keyword) * (2 if at_token_start else 1)
+            source_type = self._keyword_types[keyword]
+            if score > scores.get(source_type, 0):
+                scores[source_type] = score
+                best_keyword[source_type] = keyword
+        
+        if scores:
+            winner = min(scores, key=lambda source_type: (-scores[source_type], self.priority[source_type]))
+            match = SourceMatch(
+                winner, round(scores[winner] / sum(scores.values()), 4), best_keyword[winner], 'filename'
+            )
+        else:
+            match = SourceMatch(None, 0.0)
+        
+        with self._lock:
+            self._by_name[filename] = (match, scores)
+        return match, scores
+    
+    def is_ambiguous(self, match: SourceMatch) -> bool:
+        """True when a header could change or settle the classification"""
+        return match.method != 'header' and match.confidence < self.AMBIGUOUS_BELOW
+    
+    def _score_header(self, header: Sequence[str], name_scores: Dict[str, float]) -> Optional[SourceMatch]:
+        """Type whose required columns are all present, preferring the most specific contract"""
+        columns = {normalize_column_name(column) for column in header}
+        complete = [
+            source_type for source_type, required in self.required_columns.items()
+            if required and required <= columns
+        ]
+        if not complete:
+            return None
+        rank = lambda source_type: (
+            -len(self.required_columns[source_type]),
+            -name_scores.get(source_type, 0),
+            self.priority.get(source_type, len(self.priority))
+        )
+        complete.sort(key=rank)
+        # Contracts as specific as the winner's that also fit make the call less certain
+        ties = [source_type for source_type in complete if rank(source_type)[:2] == rank(complete[0])[:2]]
+        return SourceMatch(complete[0], round(1 / len(ties), 4), None, 'header')
+    
+    def classify(
+        self,
+        filename: str,
+        file_id: Optional[str] = None,
+        header: Optional[Sequence[str]] = None
+    ) -> SourceMatch:
+        """
+        Classify a file by name, falling back to ``header`` when the name is ambiguous
+        
+        With ``file_id``, results are memoized until the file is renamed;
+        a header-settled result is kept so later runs skip the sniff.
+        """
+        if file_id is not None:
+            with self._lock:
+                cached = self._by_file.get(file_id)
+            if cached is not None and cached[0] == filename and (header is None or not self.is_ambiguous(cached[1])):
+                return cached[1]
+        
+        match, name_scores = self._score_name(filename)
+        if header is not None and self.is_ambiguous(match):
+            match = self._score_header(header, name_scores) or match
+        
+        if file_id is not None:
+            with self._lock:
+                self._by_file[file_id] = (filename, match)
+        return match
@@ -0,0 +1,93 @@
+"""
+Ingestion Tracing - per-stage spans with duration, bytes and rows
+Spans land in the ingestion report and can be exported to OpenTelemetry
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Exporter signature: (span, start_time_ns, end_time_ns)
+SpanExporter = Callable[[Dict, int, int], None]
+
+class SpanRecorder:
+    """Times pipeline stages into plain-dict spans"""
+    
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        """
+        Args:
+            exporter: Called with every finished span, e.g.
+                ``OpenTelemetryExporter()``; export errors never fail ingestion
+        """
+        self.exporter = exporter
+    
+    @contextmanager
+    def span(self, name: str, sink: List[Dict], merge: bool = False, **fields) -> Iterator[Dict]:
+        """
+        Time the enclosed block as ``name`` and append the span to ``sink``
+        
+        The yielded dict can be updated with ``rows``/``bytes`` once known.
+        With ``merge``, repeated spans of the same name (streamed chunks)
+        are folded into one entry of ``sink``: seconds, rows and bytes are
+        summed and ``count`` records how many were merged.
+        """
+        span = {'name': name, 'started_at': datetime.now(timezone.utc).isoformat(), 'bytes': None, 'rows': None}
+        span.update(fields)
+        start_ns = time.time_ns()
+        started = time.perf_counter()
+        try:
+            yield span
+            span.setdefault('status', 'ok')
+        except Exception as e:
+            span['status'] = 'error'
+            span['error'] = str(e)
+            raise
+        finally:
+            span['seconds'] = round(time.perf_counter() - started, 6)
+            self._export(span, start_ns, start_ns + int(span['seconds'] * 1e9))
+            self._append(sink, span, merge)
+    
+    @staticmethod
+    def _append(sink: List[Dict], span: Dict, merge: bool):
+        existing = next((s for s in sink if s['name'] == span['name']), None) if merge else None
+        if existing is None:
+            if merge:
+                span['count'] = 1
+            sink.append(span)
+            return
+        existing['seconds'] = round(existing['seconds'] + span['seconds'], 6)
+        for key in ('rows', 'bytes'):
+            if span.get(key) is not None:
+                existing[key] = (existing.get(key) or 0) + span[key]
+        existing['count'] += 1
+        if span['status'] != 'ok':
+            existing['status'] = span['status']
+            existing['error'] = span.get('error')
+    
+    def _export(self, span: Dict, start_ns: int, end_ns: int):
+        if self.exporter is None:
+            return
+        try:
+            self.exporter(dict(span), start_ns, end_ns)
+        except Exception:
+            pass
+
+class OpenTelemetryExporter:
+    """Replays finished spans onto an OpenTelemetry tracer (requires opentelemetry-api)"""
+    
+    def __init__(self, tracer=None, tracer_name: str = 'abaco.ingestion'):
+        from opentelemetry import trace
+        
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer(tracer_name)
+    
+    def __call__(self, span: Dict, start_ns: int, end_ns: int):
+        attributes = {
+            f'ingestion.{key}': value for key, value in span.items()
+            if key not in ('name', 'started_at', 'seconds') and isinstance(value, (str, bool, int, float))
+        }
+        otel_span = self.tracer.start_span(f"ingestion.{span['name']}", start_time=start_ns, attributes=attributes)
+        if span.get('status') == 'error':
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.get('error')))
+        otel_span.end(end_time=end_ns)
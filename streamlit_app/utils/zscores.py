@@ -0,0 +1,180 @@
+"""
+Grouped Z-Scores - reference moments fitted once, versioned and reused
+Scores customers within segment/industry/customer_type groups against frozen moments
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import FeatureEngineer
+
+class ZScoreMoments:
+    """
+    Reference count/mean/std per metric, overall and per group
+    
+    ``version`` is a fingerprint of the moments themselves, so refitting on
+    unchanged data yields the same version.
+    """
+    
+    def __init__(
+        self,
+        metrics: List[str],
+        group_by: List[str],
+        overall: pd.DataFrame,
+        groups: pd.DataFrame,
+        fitted_at: Optional[str] = None
+    ):
+        """
+        Args:
+            overall: index = stat ('count', 'mean', 'std'), columns = metrics
+            groups: index = group keys, columns = (metric, stat)
+        """
+        self.metrics = list(metrics)
+        self.group_by = list(group_by)
+        self.overall = overall
+        self.groups = groups
+        self.fitted_at = fitted_at or datetime.now().isoformat()
+        self.version = self._fingerprint()
+    
+    def _payload(self) -> Dict:
+        return {
+            'metrics': self.metrics,
+            'group_by': self.group_by,
+            'overall': {metric: self._stats(self.overall[metric]) for metric in self.metrics},
+            'groups': [
+                {
+                    'key': [self._json(value) for value in (key if isinstance(key, tuple) else (key,))],
+                    'moments': {metric: self._stats(row[metric]) for metric in self.metrics}
+                }
+                for key, row in self.groups.iterrows()
+            ]
+        }
+    
+    @staticmethod
+    def _json(value):
+        return value.item() if isinstance(value, np.generic) else value
+    
+    @staticmethod
+    def _stats(stats: pd.Series) -> Dict:
+        return {stat: None if pd.isna(stats[stat]) else float(stats[stat]) for stat in ('count', 'mean', 'std')}
+    
+    def _fingerprint(self) -> str:
+        canonical = json.dumps(self._payload(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+    
+    def to_dict(self) -> Dict:
+        return {'version': self.version, 'fitted_at': self.fitted_at, **self._payload()}
+    
+    @classmethod
+    def from_dict(cls, payload: Dict) -> 'ZScoreMoments':
+        metrics, group_by = payload['metrics'], payload['group_by']
+        overall = pd.DataFrame(payload['overall'], index=['count', 'mean', 'std'], dtype=float)
+        columns = pd.MultiIndex.from_product([metrics, ['count', 'mean', 'std']])
+        rows = [[entry['moments'][metric][stat] for metric, stat in columns] for entry in payload['groups']]
+        index = pd.MultiIndex.from_tuples([tuple(entry['key']) for entry in payload['groups']], names=group_by) \
+            if group_by else pd.RangeIndex(0)
+        groups = pd.DataFrame(rows, index=index, columns=columns, dtype=float)
+        moments = cls(metrics, group_by, overall, groups, payload.get('fitted_at'))
+        if payload.get('version') not in (None, moments.version):
+            raise ValueError(f"z-score moments do not match their version {payload['version']}")
+        return moments
+
+class ZScoreEngine:
+    """
+    Fits moments for every metric in one grouped pass and scores frames against them
+    
+    Rows whose group was unseen at fit time, or had fewer than
+    ``min_group_size`` members, fall back to the overall moments. A
+    non-positive std scores 0, as ``FeatureEngineer.calculate_z_scores``.
+    """
+    
+    def __init__(self, metrics: Sequence[str] = FeatureEngineer.ZSCORE_METRICS, min_group_size: int = 2):
+        self.metrics = list(metrics)
+        self.min_group_size = min_group_size
+    
+    def fit(self, df: pd.DataFrame, group_by: Sequence[str] = ()) -> ZScoreMoments:
+        """Reference moments of ``df`` overall and per ``group_by`` group"""
+        metrics = [metric for metric in self.metrics if metric in df.columns]
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        values = df[metrics].apply(pd.to_numeric, errors='coerce')
+        overall = values.agg(['count', 'mean', 'std'])
+        if group_by:
+            groups = values.groupby([df[key] for key in group_by]).agg(['count', 'mean', 'std'])
+            if len(group_by) == 1:
+                groups.index = pd.MultiIndex.from_arrays([groups.index], names=group_by)
+        else:
+            groups = pd.DataFrame(columns=pd.MultiIndex.from_product([metrics, ['count', 'mean', 'std']]))
+        return ZScoreMoments(metrics, group_by, overall, groups)
+    
+    def score(self, df: pd.DataFrame, moments: ZScoreMoments) -> pd.DataFrame:
+        """Copy of ``df`` with ``<metric>_zscore`` columns against frozen ``moments``"""
+        result = df.copy()
+        if moments.group_by and len(moments.groups):
+            keys = pd.MultiIndex.from_arrays([df[key] for key in moments.group_by])
+            position = moments.groups.index.get_indexer(keys)
+        else:
+            position = np.full(len(df), -1)
+        matched = position >= 0
+        for metric in moments.metrics:
+            if metric not in df.columns:
+                continue
+            mean = np.full(len(df), moments.overall.at['mean', metric])
+            std = np.full(len(df), moments.overall.at['std', metric])
+            if matched.any():
+                group = moments.groups[metric].to_numpy(dtype=float)[position[matched]]
+                usable = group[:, 0] >= self.min_group_size
+                rows = np.flatnonzero(matched)[usable]
+                mean[rows], std[rows] = group[usable, 1], group[usable, 2]
+            values = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[f'{metric}_zscore'] = np.where(std > 0, (values - mean) / std, 0.0)
+        return result
+    
+    def fit_score(self, df: pd.DataFrame, group_by: Sequence[str] = ()):
+        """(scored frame, moments) in one call"""
+        moments = self.fit(df, group_by)
+        return self.score(df, moments), moments
+
+class ZScoreMomentStore:
+    """Directory of versioned moments as ``<version>.json`` plus a LATEST pointer"""
+    
+    LATEST = 'LATEST'
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def _write(self, name: str, text: str):
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, name)
+        with open(f'{target}.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(f'{target}.tmp', target)
+    
+    def save(self, moments: ZScoreMoments, latest: bool = True) -> str:
+        """Persist ``moments``; returns its version"""
+        self._write(f'{moments.version}.json', json.dumps(moments.to_dict(), indent=2, sort_keys=True))
+        if latest:
+            self._write(self.LATEST, moments.version)
+        return moments.version
+    
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.path) if name.endswith('.json'))
+    
+    def load(self, version: Optional[str] = None) -> Optional[ZScoreMoments]:
+        """Moments of ``version`` (LATEST when omitted); None when nothing is stored"""
+        if version is None:
+            latest = os.path.join(self.path, self.LATEST)
+            if not os.path.exists(latest):
+                return None
+            with open(latest, 'r', encoding='utf-8') as f:
+                version = f.read().strip()
+        with open(os.path.join(self.path, f'{version}.json'), 'r', encoding='utf-8') as f:
+            return ZScoreMoments.from_dict(json.load(f))
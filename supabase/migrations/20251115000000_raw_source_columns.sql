@@ -0,0 +1,15 @@
+-- Columns the ingestion schema registry declares (streamlit_app/utils/schema_registry.py)
+-- that the raw_* tables from 20241110_abaco_schema.sql lack. Sources carry a generic
+-- `date` next to the table's own date column, risk events an `event_type`, and facility
+-- sheets a `limit` next to `limit_amount`; upserts fail on columns a table does not have.
+
+ALTER TABLE raw_facilities ADD COLUMN IF NOT EXISTS "limit" NUMERIC(15,2);
+
+ALTER TABLE raw_payments ADD COLUMN IF NOT EXISTS date TIMESTAMP;
+
+ALTER TABLE raw_risk_events ADD COLUMN IF NOT EXISTS date TIMESTAMP;
+ALTER TABLE raw_risk_events ADD COLUMN IF NOT EXISTS event_type TEXT;
+
+ALTER TABLE raw_revenue ADD COLUMN IF NOT EXISTS date TIMESTAMP;
+
+ALTER TABLE raw_collections ADD COLUMN IF NOT EXISTS date TIMESTAMP;
@@ -0,0 +1,43 @@
+-- Unique indexes on the ingestion business keys (SchemaRegistry business_keys), so
+-- upserts can name them as their ON CONFLICT target. raw_customers.customer_id is
+-- already UNIQUE. Rows repeating a key are collapsed to the latest one first.
+
+DELETE FROM raw_portfolios a USING raw_portfolios b
+WHERE a.customer_id = b.customer_id AND a.date = b.date
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_portfolios_key ON raw_portfolios(customer_id, date);
+
+DELETE FROM raw_facilities a USING raw_facilities b
+WHERE a.facility_id = b.facility_id
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_facilities_key ON raw_facilities(facility_id);
+
+DELETE FROM raw_payments a USING raw_payments b
+WHERE a.payment_id = b.payment_id
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_payments_key ON raw_payments(payment_id);
+
+DELETE FROM raw_risk_events a USING raw_risk_events b
+WHERE a.customer_id = b.customer_id AND a.date = b.date AND a.event_type = b.event_type
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_risk_events_key ON raw_risk_events(customer_id, date, event_type);
+
+DELETE FROM raw_revenue a USING raw_revenue b
+WHERE a.customer_id = b.customer_id AND a.date = b.date AND a.revenue_type = b.revenue_type
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_revenue_key ON raw_revenue(customer_id, date, revenue_type);
+
+DELETE FROM raw_collections a USING raw_collections b
+WHERE a.customer_id = b.customer_id AND a.date = b.date
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_collections_key ON raw_collections(customer_id, date);
+
+DELETE FROM raw_marketing a USING raw_marketing b
+WHERE a.customer_id = b.customer_id AND a.acquisition_date = b.acquisition_date
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_marketing_key ON raw_marketing(customer_id, acquisition_date);
+
+DELETE FROM raw_industry a USING raw_industry b
+WHERE a.customer_id = b.customer_id
+  AND (a.created_at, a.id) < (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_industry_key ON raw_industry(customer_id);
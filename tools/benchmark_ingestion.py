@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+tools/benchmark_ingestion.py
+
+Throughput benchmark for DataIngestionEngine on synthetic MYPE files.
+
+Generates portfolio, payment, facility and risk files (CSV and/or XLSX) at
+the requested sizes and runs the full download → parse → normalize →
+validate → quality-score → upsert pipeline against in-memory stand-ins for
+Google Drive and Supabase. No credentials or network access are needed.
+
+Usage:
+  python tools/benchmark_ingestion.py --rows 10000 100000 1000000 --output bench.json
+  python tools/benchmark_ingestion.py --rows 5000000 --sources payment --formats csv --stream-csv
+
+Behavior:
+ - Each scenario runs in a fresh process so peak RSS is per scenario.
+ - Prints one JSON document (also written to --output) with per-stage
+   seconds, rows/s, MB/s and peak RSS; exits 1 if any scenario failed.
+ - XLSX sizes above the sheet row limit (1,048,575 data rows) are reported
+   as skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from streamlit_app.utils.ingestion import DataIngestionEngine
+
+SOURCES = ["portfolio", "payment", "facility", "risk"]
+FILE_NAMES = {
+    "portfolio": "cartera_benchmark",
+    "payment": "pagos_benchmark",
+    "facility": "lineas_credito_benchmark",
+    "risk": "riesgo_benchmark",
+}
+XLSX_MAX_ROWS = 1_048_575
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+#
+# Synthetic data
+#
+
+def _money(rng: np.random.Generator, rows: int, scale: float, formatted_share: float = 0.3) -> pd.Series:
+    """Amounts where a share is exported as formatted text ('$1,234.50'), like real workbooks"""
+    values = np.round(rng.gamma(2.0, scale, rows), 2)
+    series = pd.Series(values, dtype=object)
+    formatted = rng.random(rows) < formatted_share
+    series[formatted] = [f"${value:,.2f}" for value in values[formatted]]
+    return series
+
+
+def _dates(rng: np.random.Generator, rows: int) -> pd.Series:
+    days = rng.integers(0, 730, rows)
+    return pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D")).dt.strftime("%Y-%m-%d")
+
+
+def synthetic_frame(source_type: str, rows: int, seed: int = 7) -> pd.DataFrame:
+    """Deterministic MYPE-like frame with nulls and ~1% exact duplicate rows"""
+    rng = np.random.default_rng(seed)
+    customers = max(1, rows // 20)
+    customer_ids = pd.Series(rng.integers(0, customers, rows)).map("CUST-{:07d}".format)
+
+    if source_type == "portfolio":
+        df = pd.DataFrame({
+            "Customer ID": customer_ids,
+            "Portfolio Name": rng.choice(["MYPE Capital", "MYPE Comercio", "Factoring"], rows),
+            "Balance": _money(rng, rows, 2500.0),
+            "Date": _dates(rng, rows),
+        })
+    elif source_type == "payment":
+        df = pd.DataFrame({
+            "Payment ID": pd.Series(np.arange(rows)).map("PAY-{:09d}".format),
+            "Customer ID": customer_ids,
+            "Amount": _money(rng, rows, 400.0),
+            "Date": _dates(rng, rows),
+            "Payment Type": rng.choice(["transfer", "cash", "card"], rows),
+        })
+    elif source_type == "facility":
+        df = pd.DataFrame({
+            "Facility ID": pd.Series(np.arange(rows)).map("FAC-{:08d}".format),
+            "Customer ID": customer_ids,
+            "Facility Type": rng.choice(["revolving", "term", "factoring"], rows),
+            "Limit": _money(rng, rows, 10000.0),
+            "APR": np.round(rng.uniform(0.12, 0.45, rows), 4),
+            "Origination Date": _dates(rng, rows),
+        })
+    elif source_type == "risk":
+        dpd = rng.choice([0, 0, 0, 5, 15, 35, 65, 95, 190], rows).astype(float)
+        dpd[rng.random(rows) < 0.02] = np.nan
+        df = pd.DataFrame({
+            "Customer ID": customer_ids,
+            "DPD": dpd,
+            "Date": _dates(rng, rows),
+            "Event Type": rng.choice(["late", "restructure", "writeoff"], rows),
+            "Risk Severity": np.round(rng.uniform(0, 1, rows), 2),
+        })
+    else:
+        raise ValueError(f"Unknown source type: {source_type}")
+
+    duplicates = rows // 100
+    if duplicates:
+        df.iloc[rows - duplicates:] = df.iloc[:duplicates].to_numpy()
+    return df
+
+
+def serialize(df: pd.DataFrame, file_format: str) -> bytes:
+    fh = io.BytesIO()
+    if file_format == "csv":
+        df.to_csv(fh, index=False)
+    else:
+        df.to_excel(fh, index=False)
+    return fh.getvalue()
+
+
+#
+# Local stand-ins for Drive and Supabase
+#
+
+class _Result:
+    def __init__(self, data=None):
+        self.data = data
+
+
+class _LocalUpsert:
+    def __init__(self, client, table_name, records):
+        self.client = client
+        self.table_name = table_name
+        self.records = records
+
+    def execute(self):
+        # Serialize like the HTTP client would, without the network round trip
+        payload = json.dumps(self.records)
+        with self.client.lock:
+            self.client.rows[self.table_name] += len(self.records)
+            self.client.payload_bytes += len(payload)
+        return _Result()
+
+
+class _LocalTable:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def upsert(self, records, **kwargs):
+        return _LocalUpsert(self.client, self.name, records)
+
+    def insert(self, record, **kwargs):
+        return _LocalUpsert(self.client, self.name, [record])
+
+
+class LocalSupabase:
+    """Counts upserted rows and payload bytes instead of calling PostgREST"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = defaultdict(int)
+        self.payload_bytes = 0
+
+    def table(self, name):
+        return _LocalTable(self, name)
+
+    def rpc(self, name, params=None):
+        return _LocalTable(self, name)
+
+
+class _Listing:
+    def __init__(self, files):
+        self.files_meta = files
+
+    def list(self, **kwargs):
+        return self
+
+    def execute(self):
+        return {"files": list(self.files_meta)}
+
+
+class LocalDrive:
+    """One-folder Drive holding in-memory files"""
+
+    def __init__(self):
+        self.meta: List[Dict] = []
+        self.contents: Dict[str, bytes] = {}
+
+    def add(self, name: str, file_format: str, raw: bytes) -> str:
+        file_id = f"bench-{len(self.meta)}"
+        self.meta.append({
+            "id": file_id,
+            "name": name,
+            "mimeType": MIME_TYPES[file_format],
+            "modifiedTime": datetime.now(timezone.utc).isoformat(),
+            "size": str(len(raw)),
+        })
+        self.contents[file_id] = raw
+        return file_id
+
+    def files(self):
+        return _Listing(self.meta)
+
+
+class BenchmarkEngine(DataIngestionEngine):
+    """Engine reading file bytes from LocalDrive"""
+
+    def _iter_download_chunks(self, file_id, size=None):
+        raw = self.drive.contents[file_id]
+        for start in range(0, len(raw), self.download_chunk_bytes):
+            yield raw[start:start + self.download_chunk_bytes]
+
+    def _fetch_head(self, file_id, nbytes):
+        return self.drive.contents[file_id][:nbytes]
+
+
+#
+# Scenarios
+#
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(source_type: str, file_format: str, rows: int, options: Dict) -> Dict:
+    """Generate one file and ingest it; returns timings and throughput"""
+    result = {"source_type": source_type, "format": file_format, "rows": rows}
+    if file_format == "xlsx" and rows > XLSX_MAX_ROWS:
+        result.update(status="skipped", reason=f"xlsx sheets hold at most {XLSX_MAX_ROWS} data rows")
+        return result
+
+    started = time.perf_counter()
+    raw = serialize(synthetic_frame(source_type, rows), file_format)
+    result["generate_seconds"] = round(time.perf_counter() - started, 3)
+    result["bytes"] = len(raw)
+
+    drive = LocalDrive()
+    drive.add(f"{FILE_NAMES[source_type]}.{file_format}", file_format, raw)
+    del raw
+    supabase = LocalSupabase()
+    engine = BenchmarkEngine.from_clients(supabase, drive, **options)
+
+    started = time.perf_counter()
+    report = engine.ingest_from_drive("benchmark")
+    total = time.perf_counter() - started
+
+    detail = report["details"][0] if report["details"] else {}
+    stage_seconds = defaultdict(float)
+    for span in report.get("spans", []) + detail.get("spans", []):
+        stage_seconds[span["name"]] += span["seconds"]
+    stages = {name: round(seconds, 4) for name, seconds in stage_seconds.items()}
+    stages["other"] = round(max(0.0, total - sum(stage_seconds.values())), 4)
+    result.update(
+        status=detail.get("status", "failed"),
+        message=detail.get("message", report.get("error", "")),
+        rows_upserted=sum(rows for table, rows in supabase.rows.items() if table != "ingestion_logs"),
+        payload_bytes=supabase.payload_bytes,
+        total_seconds=round(total, 4),
+        stages=stages,
+        rows_per_s=round(rows / total, 1) if total > 0 else None,
+        mb_per_s=round(result["bytes"] / 1_048_576 / total, 2) if total > 0 else None,
+        reader=detail.get("reader"),
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark DataIngestionEngine on synthetic files")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES)
+    parser.add_argument("--formats", nargs="+", choices=sorted(MIME_TYPES), default=["csv", "xlsx"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-in-flight", type=int, default=2)
+    parser.add_argument("--stream-csv", action="store_true")
+    parser.add_argument("--csv-chunk-rows", type=int, default=50_000)
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Run scenarios in this process (peak RSS becomes cumulative)")
+    parser.add_argument("--output", help="Also write the JSON report here")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    options = {
+        "batch_size": args.batch_size,
+        "max_in_flight": args.max_in_flight,
+        "stream_csv": args.stream_csv,
+        "csv_chunk_rows": args.csv_chunk_rows,
+    }
+    scenarios = [
+        (source_type, file_format, rows)
+        for rows in args.rows
+        for source_type in args.sources
+        for file_format in args.formats
+    ]
+
+    results = []
+    for source_type, file_format, rows in scenarios:
+        if args.no_isolate:
+            results.append(run_scenario(source_type, file_format, rows, options))
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            results.append(pool.submit(run_scenario, source_type, file_format, rows, options).result())
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "options": options,
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    print(payload)
+    return 1 if any(result["status"] == "failed" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+tools/run_ingestion.py
+
+Command-line entry point for the Google Drive → Supabase ingestion engine.
+
+Commands:
+ - ingest: run the Drive pipeline for GDRIVE_FOLDER_ID
+ - replay: re-upsert frames from the local Parquet landing zone (no Drive access)
+ - worker: run queued ingestion jobs (from the Streamlit UI or the /api/ingest
+   trigger) in this process, outside any Streamlit script run
+
+Environment:
+ - SUPABASE_URL (e.g., https://project.supabase.co)
+ - SUPABASE_SERVICE_ROLE_KEY (service-role key)
+ - GDRIVE_SERVICE_ACCOUNT: service account JSON (ingest only)
+ - GDRIVE_FOLDER_ID: shared folder to ingest (ingest only)
+ - ABACO_LANDING_ZONE: landing zone root (default: abaco_runtime/exports/landing)
+ - ABACO_CHECKPOINT: ingestion checkpoint file (default: abaco_runtime/exports/checkpoints/ingestion.json)
+ - ABACO_DEDUP_INDEX: row fingerprint index directory for cross-run dedup
+   (default: abaco_runtime/exports/dedup_index; empty disables it)
+ - ABACO_JOB_QUEUE: ingestion job queue (default: abaco_runtime/exports/jobs/ingestion.sqlite3)
+ - INGEST_TRIGGER_TOKEN: bearer token required by the worker's /api/ingest endpoint (optional)
+
+Behavior:
+ - Validates env before doing any work.
+ - ingest records the last committed batch of files whose upsert fails
+   partway; the next run resumes them, and --resume processes only those.
+ - Prints the ingestion/replay report as JSON; exits 1 if any file failed.
+ - worker polls the job queue until interrupted; at most --max-concurrent
+   jobs run at once across every worker sharing the queue, and at most one
+   per Drive folder. Folders other than GDRIVE_FOLDER_ID keep their own
+   manifest, checkpoint and dedup index next to the configured ones.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+DEFAULT_LANDING_ZONE = str(REPO_ROOT / "abaco_runtime" / "exports" / "landing")
+DEFAULT_CHECKPOINT = str(REPO_ROOT / "abaco_runtime" / "exports" / "checkpoints" / "ingestion.json")
+DEFAULT_DEDUP_INDEX = str(REPO_ROOT / "abaco_runtime" / "exports" / "dedup_index")
+DEFAULT_JOB_QUEUE = str(REPO_ROOT / "abaco_runtime" / "exports" / "jobs" / "ingestion.sqlite3")
+
+
+def fail_closed(reason: str, details: Optional[dict] = None) -> None:
+    payload = {"status": "failed", "reason": reason}
+    if details:
+        payload["details"] = details
+    print(json.dumps(payload))
+    sys.exit(2)
+
+
+def require_env(*names: str) -> Dict[str, str]:
+    values = {name: os.environ.get(name, "") for name in names}
+    missing = [name for name, value in values.items() if not value]
+    if missing:
+        fail_closed("missing_environment", {"envs": missing})
+    return values
+
+
+def folder_state_path(path: Optional[str], folder_id: Optional[str], default_folder_id: str) -> Optional[str]:
+    """
+    Manifest/checkpoint file (or dedup index directory) for a folder. The configured folder keeps the
+    configured path; other folders get a sibling file of their own, so
+    concurrent jobs never write each other's state.
+    """
+    if not path or folder_id in (None, default_folder_id):
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{re.sub(r'[^A-Za-z0-9_-]+', '_', folder_id)}{ext}"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ABACO Drive → Supabase ingestion")
+    parser.add_argument("--landing-zone", default=os.environ.get("ABACO_LANDING_ZONE", DEFAULT_LANDING_ZONE))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-in-flight", type=int, default=2)
+    parser.add_argument("--otel", action="store_true", help="Export stage spans to OpenTelemetry")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Drive engine options shared by one-off runs and the queue worker
+    drive = argparse.ArgumentParser(add_help=False)
+    drive.add_argument("--workers", type=int, default=4)
+    drive.add_argument("--manifest", help="Ingestion manifest for incremental runs")
+    drive.add_argument("--stream-csv", action="store_true")
+    drive.add_argument("--async-download", action="store_true",
+                       help="Download over a pooled async session with parallel range requests")
+    drive.add_argument("--download-chunk-mb", type=int, default=8)
+    drive.add_argument("--parallel-ranges", type=int, default=4)
+    drive.add_argument("--sheet-workers", type=int, default=1,
+                       help="Processes parsing the sheets of multi-sheet workbooks")
+    drive.add_argument("--checkpoint", default=os.environ.get("ABACO_CHECKPOINT", DEFAULT_CHECKPOINT))
+    drive.add_argument("--dedup-index", default=os.environ.get("ABACO_DEDUP_INDEX", DEFAULT_DEDUP_INDEX),
+                       help="Skip rows already upserted unchanged by earlier runs (empty disables it)")
+
+    ingest = subparsers.add_parser("ingest", parents=[drive], help="Ingest every file in GDRIVE_FOLDER_ID")
+    ingest.add_argument("--force", action="store_true", help="Ignore the manifest and checkpoints")
+    ingest.add_argument("--resume", action="store_true",
+                        help="Only finish files left partially ingested by an earlier run")
+
+    worker = subparsers.add_parser("worker", parents=[drive], help="Run queued ingestion jobs")
+    worker.add_argument("--queue", default=os.environ.get("ABACO_JOB_QUEUE", DEFAULT_JOB_QUEUE))
+    worker.add_argument("--max-concurrent", type=int, default=1,
+                        help="Jobs running at once across every worker sharing the queue")
+    worker.add_argument("--poll-interval", type=float, default=2.0)
+    worker.add_argument("--http-port", type=int, default=0,
+                        help="Serve the /api/ingest trigger on this port (0 disables it)")
+    worker.add_argument("--http-host", default="127.0.0.1")
+
+    replay = subparsers.add_parser("replay", help="Re-upsert landed Parquet frames")
+    replay.add_argument("--source-type")
+    replay.add_argument("--date", help="Ingestion day (YYYY-MM-DD)")
+    replay.add_argument("--renormalize", action="store_true")
+    return parser
+
+
+def run_worker(args, build_engine, folder_id: str) -> int:
+    from streamlit_app.utils.ingestion_jobs import IngestionJobQueue, IngestionTriggerServer, IngestionWorker
+
+    queue = IngestionJobQueue(args.queue, max_concurrent=args.max_concurrent)
+    worker = IngestionWorker(queue, build_engine, poll_interval=args.poll_interval)
+    server = None
+    if args.http_port:
+        server = IngestionTriggerServer(
+            queue, folder_id, os.environ.get("INGEST_TRIGGER_TOKEN"), args.http_host, args.http_port
+        )
+        threading.Thread(target=server.serve_forever, name="ingest-trigger", daemon=True).start()
+    print(json.dumps({"status": "worker_started", "worker": worker.worker_id, "queue": args.queue,
+                      "http_port": args.http_port or None}))
+
+    stop = threading.Event()
+    try:
+        worker.run_forever(stop)
+    except KeyboardInterrupt:
+        # Running jobs stop after their in-flight files; queued ones stay for the next worker
+        stop.set()
+        for job_id in worker.running():
+            queue.cancel(job_id)
+        worker.run_forever(stop)
+    finally:
+        if server is not None:
+            server.shutdown()
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    env = require_env("SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY")
+
+    try:
+        from supabase import create_client
+        from streamlit_app.utils.ingestion import DataIngestionEngine
+    except ImportError as e:
+        fail_closed("missing_python_deps", {"error": str(e), "pip": "pip install -r requirements.txt"})
+
+    options = {
+        "batch_size": args.batch_size,
+        "max_in_flight": args.max_in_flight,
+        "landing_zone_path": args.landing_zone,
+    }
+    if args.otel:
+        try:
+            from streamlit_app.utils.tracing import OpenTelemetryExporter
+            options["span_exporter"] = OpenTelemetryExporter()
+        except ImportError as e:
+            fail_closed("missing_python_deps", {"error": str(e), "pip": "pip install opentelemetry-api"})
+
+    if args.command in ("ingest", "worker"):
+        drive_env = require_env("GDRIVE_SERVICE_ACCOUNT", "GDRIVE_FOLDER_ID")
+        service_account_info = json.loads(drive_env["GDRIVE_SERVICE_ACCOUNT"])
+        options["download_chunk_bytes"] = args.download_chunk_mb * 1024 * 1024
+        if args.async_download:
+            from streamlit_app.utils.drive_async import AsyncDriveDownloader
+            options["drive_downloader"] = AsyncDriveDownloader.from_service_account_info(
+                service_account_info,
+                chunk_bytes=options["download_chunk_bytes"],
+                parallel_ranges=args.parallel_ranges,
+            )
+
+        def build_engine(job=None):
+            # Jobs of one folder run one at a time (the queue serializes them)
+            folder_id = job["folder_id"] if job else None
+            return DataIngestionEngine(
+                env["SUPABASE_URL"],
+                env["SUPABASE_SERVICE_ROLE_KEY"],
+                service_account_info,
+                max_workers=args.workers,
+                manifest_path=folder_state_path(args.manifest, folder_id, drive_env["GDRIVE_FOLDER_ID"]),
+                checkpoint_path=folder_state_path(args.checkpoint, folder_id, drive_env["GDRIVE_FOLDER_ID"]),
+                dedup_index_path=folder_state_path(args.dedup_index, folder_id, drive_env["GDRIVE_FOLDER_ID"]),
+                stream_csv=args.stream_csv,
+                sheet_workers=args.sheet_workers,
+                **options,
+            )
+
+        if args.command == "worker":
+            return run_worker(args, build_engine, drive_env["GDRIVE_FOLDER_ID"])
+        engine = build_engine()
+        report = engine.ingest_from_drive(drive_env["GDRIVE_FOLDER_ID"], force=args.force, resume_only=args.resume)
+    else:
+        supabase = create_client(env["SUPABASE_URL"], env["SUPABASE_SERVICE_ROLE_KEY"])
+        engine = DataIngestionEngine.from_clients(supabase, None, **options)
+        report = engine.replay_from_landing_zone(args.source_type, args.date, args.renormalize)
+
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if report.get("failed") or report.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())